@@ -1,5 +1,6 @@
 import time
 import os
+import sys
 import csv
 import re
 from datetime import datetime
@@ -9,12 +10,25 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import undetected_chromedriver as uc
 
-# Set up undetected Chrome driver
-options = uc.ChromeOptions()
-# options.add_argument("--headless")  # Uncomment to run headless
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-driver = uc.Chrome(options=options)
+# 🟢 BULLETPROOF IMPORT PATHING
+# Tells Python to look one folder up to find 'utils'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.snapshot_store import SnapshotStore
+
+# 🟢 Every results page is kept in data/snapshots/; `--from-snapshots` re-parses them from disk
+# without starting Chrome (e.g. after a parser change)
+FROM_SNAPSHOTS = "--from-snapshots" in sys.argv
+snapshots = SnapshotStore()
+RESULTS_URL_PREFIX = "https://www.watchathletics.com/page/"
+
+driver = None
+if not FROM_SNAPSHOTS:
+    # Set up undetected Chrome driver
+    options = uc.ChromeOptions()
+    # options.add_argument("--headless")  # Uncomment to run headless
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    driver = uc.Chrome(options=options)
 
 schedule_url = "https://www.watchathletics.com/schedule/cat/2"
 
@@ -29,7 +43,7 @@ def get_results_urls(schedule_url, driver):
     for a_tag in soup.find_all("a", href=True):
         text = a_tag.get_text(strip=True).lower()
         href = a_tag["href"]
-        if "results" in text and href.startswith("https://www.watchathletics.com/page/"):
+        if "results" in text and href.startswith(RESULTS_URL_PREFIX):
             results_links.append(href)
 
     print(f"✅ Found {len(results_links)} results pages.")
@@ -88,19 +102,32 @@ def match_event(label_text, gender):
     clean_label = re.sub(r"(?i)women's|men's|women|men", "", label_text).strip()
     return clean_label
 
-all_data_rows = []
+def load_results_pages():
+    """Yields (results_url, html): from the browser, or from the snapshot store with --from-snapshots."""
+    if FROM_SNAPSHOTS:
+        for results_url, _ in snapshots.urls(RESULTS_URL_PREFIX):
+            print(f"\n🗃️ Replaying snapshot: {results_url}")
+            yield results_url, snapshots.latest(results_url)
+        return
 
-for results_url in get_results_urls(schedule_url, driver):
-    print(f"\n⚜️ Loading page: {results_url}")
-    driver.get(results_url)
+    for results_url in get_results_urls(schedule_url, driver):
+        print(f"\n⚜️ Loading page: {results_url}")
+        driver.get(results_url)
 
-    try:
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "page-content")))
-    except:
-        print(f"❌ Timeout waiting for content on {results_url}")
-        continue
+        try:
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "page-content")))
+        except:
+            print(f"❌ Timeout waiting for content on {results_url}")
+            continue
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+        html = driver.page_source
+        snapshots.put(results_url, html)
+        yield results_url, html
+
+all_data_rows = []
+
+for results_url, html in load_results_pages():
+    soup = BeautifulSoup(html, "html.parser")
     content = soup.find("div", id="page-content")
     if not content:
         print(f"❌ Could not find content on page: {results_url}")
@@ -205,4 +232,5 @@ if all_data_rows:
 else:
     print("❌ No data found.")
 
-driver.quit()
+snapshots.close()
+if driver: driver.quit()
@@ -0,0 +1,190 @@
+import sys
+import os
+import re
+import csv
+import glob
+import time
+from datetime import datetime
+
+# 🟢 BULLETPROOF IMPORT PATHING
+# Tells Python to look one folder up to find 'utils'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.dates import parse_date, parse_date_range, to_iso_date, to_iso_dates, iso_date_ranges
+
+# ===========================
+# Checks the compiled/memoized parsers in utils/dates.py against the strptime
+# loops they replaced (frozen copies below) on every date column in the repo's
+# CSVs, and times both. A string the old parser rejected but the new one parses
+# fails the run too, unless it is listed in NEWLY_PARSED below. Run it after
+# touching any date rule: it must report 0 mismatches.
+# ===========================
+SPORTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Strings the new parser may accept where the old one returned nothing: one parser now
+# serves every column, so each path also takes the shapes the others already read
+NEWLY_PARSED = {
+    "Calendar ranges": {"2025-8-1", "27/08/2025"},            # results-page date shapes
+    "Results dates": set(),
+    "Birthdates": {"2025-8-1", "22-Aug-25", "27/08/2025"},    # results-page / calendar shapes
+}
+
+# --- WorldAthleticsEvents.py ---
+def reference_try_parse_date(text, default_year=None):
+    if not text or not isinstance(text, str):
+        return None
+    t = text.strip().replace("–", "-")
+    t = re.sub(r"\s+", " ", t)
+    if default_year and re.match(r"^\d{1,2}\s+[A-Za-z]{3}$", t, re.I):
+        t = f"{t} {default_year}"
+    t_norm = t.title()
+    for fmt in ("%d %b %Y", "%d-%b-%y", "%d %b %y"):
+        try:
+            return datetime.strptime(t_norm, fmt)
+        except ValueError:
+            continue
+    return None
+
+def reference_parse_wa_date_range(raw):
+    if not raw or not isinstance(raw, str):
+        return None, None
+    s = raw.strip().replace("–", "-")
+    s = re.sub(r"\s+", " ", s)
+    m = re.match(r"^(\d{1,2})\s*([A-Za-z]{3})\s*-\s*(\d{1,2})\s*([A-Za-z]{3})\s*(\d{4})$", s, re.I)
+    if m:
+        d1, mon1, d2, mon2, y = m.groups()
+        return reference_try_parse_date(f"{d1} {mon1} {y}"), reference_try_parse_date(f"{d2} {mon2} {y}")
+    m = re.match(r"^(\d{1,2})\s*-\s*(\d{1,2})\s*([A-Za-z]{3})\s*(\d{4})$", s, re.I)
+    if m:
+        d1, d2, mon, y = m.groups()
+        return reference_try_parse_date(f"{d1} {mon} {y}"), reference_try_parse_date(f"{d2} {mon} {y}")
+    if "-" in s:
+        parts = [p.strip() for p in s.split("-")]
+        if len(parts) == 2:
+            left, right = parts
+            end = reference_try_parse_date(right)
+            if not end:
+                return None, None
+            start = reference_try_parse_date(left, default_year=end.year)
+            if not start:
+                return None, None
+            return start, end
+    dt = reference_try_parse_date(s)
+    if dt:
+        return dt, dt
+    return None, None
+
+# --- WorldAthleticsResults.py ---
+def reference_parse_any_date_to_iso(date_str):
+    if not date_str or not isinstance(date_str, str): return None
+    s = date_str.strip().replace("–", "-")
+    s = re.sub(r"\s+", " ", s)
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%b-%y", "%d %b %Y", "%d %b %y"):
+        try: return datetime.strptime(s.title(), fmt).strftime("%Y-%m-%d")
+        except: continue
+    return None
+
+# --- AthleticsAthletes.py ---
+def reference_convert_date(date_str):
+    try:
+        return datetime.strptime(date_str, "%d %b %Y").strftime("%Y-%m-%d")
+    except Exception:
+        return None
+
+def _iso(value):
+    return value.strftime("%Y-%m-%d") if value else None
+
+def read_column(path, column):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [row[column] for row in csv.DictReader(f) if row.get(column)]
+
+def build_corpus():
+    """(calendar date strings, single date strings, DOB strings) from the repo's CSVs."""
+    calendar_files = glob.glob(os.path.join(SPORTS_DIR, "World Athletics Events", "*.csv"))
+    results_files = glob.glob(os.path.join(SPORTS_DIR, "World Athletics Events", "World Athletics Results", "*.csv"))
+
+    ranges = []
+    for path in calendar_files:
+        ranges += read_column(path, "Raw Date")
+    singles = []
+    for path in calendar_files:
+        singles += read_column(path, "Start Date") + read_column(path, "End Date")
+    for path in results_files:
+        singles += read_column(path, "Date")
+    singles += read_column(os.path.join(SPORTS_DIR, "Archive", "Athletics - Results", "results.csv"), "date")
+    dobs = []
+    for path in results_files:
+        dobs += read_column(path, "Birthdate")
+    # Rankings keep ISO birthdates; the athlete pages show them as "19 NOV 1997"
+    for path in glob.glob(os.path.join(SPORTS_DIR, "Athletics - Rankings", "*.csv")):
+        dobs += [datetime.strptime(d, "%Y-%m-%d").strftime("%d %b %Y").upper()
+                 for d in read_column(path, "dob") if re.match(r"^\d{4}-\d{2}-\d{2}$", d)]
+
+    extras = ["", "27 Aug", "27 Aug - 28 Aug 2025", "28 FEB-01 MAR 2025", "3-5 Oct 2025", "27 Aug 2025 – 28 Aug 2025",
+              "31 FEB 2025", "22-Aug-25", "27/08/2025", "2025-8-1", "TBC", "27 Sept 2025"]
+    return ranges + extras, singles + extras, dobs + extras
+
+def compare(label, corpus, reference, new):
+    mismatches, gained = [], 0
+    for value in sorted(set(corpus)):
+        expected, got = reference(value), new(value)
+        if expected == got: continue
+        if expected in (None, (None, None)) and value in NEWLY_PARSED[label]: gained += 1
+        else: mismatches.append((value, expected, got))
+    for value, expected, got in mismatches[:20]:
+        print(f"   ❌ {label} {value!r}: expected {expected!r}, got {got!r}")
+    print(f"🔍 {label}: {len(set(corpus))} distinct strings ({len(corpus)} total), "
+          f"{len(mismatches)} mismatches, {gained} newly parsed (allowed).")
+    return mismatches
+
+def bench(label, reference_loop, new_loop, clear):
+    start = time.perf_counter()
+    reference_loop()
+    t_ref = time.perf_counter() - start
+    clear()
+    start = time.perf_counter()
+    new_loop()
+    t_new = time.perf_counter() - start
+    print(f"⏱️ {label}: original {t_ref * 1000:.1f} ms | new {t_new * 1000:.1f} ms ({t_ref / max(t_new, 1e-9):.1f}x)")
+
+def run_audit():
+    ranges, singles, dobs = build_corpus()
+
+    mismatches = compare(
+        "Calendar ranges", ranges,
+        lambda v: tuple(_iso(d) for d in reference_parse_wa_date_range(v)),
+        lambda v: tuple(_iso(d) for d in parse_date_range(v)),
+    )
+    mismatches += compare("Results dates", singles, reference_parse_any_date_to_iso, to_iso_date)
+    mismatches += compare("Birthdates", dobs, reference_convert_date, to_iso_date)
+    # Column versions must agree row for row (allowed newly parsed strings must match the scalar parser)
+    for value, got in zip(singles, to_iso_dates(singles)):
+        expected = reference_parse_any_date_to_iso(value)
+        if value in NEWLY_PARSED["Results dates"] and expected is None: expected = to_iso_date(value)
+        if expected != got: mismatches.append((value, expected, got))
+    starts, ends = iso_date_ranges(ranges)
+    for value, got in zip(ranges, zip(starts, ends)):
+        expected = tuple(_iso(d) or "" for d in reference_parse_wa_date_range(value))
+        if value in NEWLY_PARSED["Calendar ranges"] and expected == ("", ""):
+            expected = tuple(_iso(d) or "" for d in parse_date_range(value))
+        if expected != got: mismatches.append((value, expected, got))
+    for value, got in zip(dobs, to_iso_dates(dobs)):
+        expected = reference_convert_date(value)
+        if value in NEWLY_PARSED["Birthdates"] and expected is None: expected = to_iso_date(value)
+        if expected != got: mismatches.append((value, expected, got))
+
+    def clear():
+        parse_date.cache_clear()
+        parse_date_range.cache_clear()
+
+    bench("Calendar ranges", lambda: [reference_parse_wa_date_range(v) for v in ranges], lambda: iso_date_ranges(ranges), clear)
+    bench("Results dates", lambda: [reference_parse_any_date_to_iso(v) for v in singles], lambda: to_iso_dates(singles), clear)
+    bench("Birthdates", lambda: [reference_convert_date(v) for v in dobs], lambda: to_iso_dates(dobs), clear)
+    bench("Birthdates (row by row)", lambda: [reference_convert_date(v) for v in dobs], lambda: [to_iso_date(v) for v in dobs], clear)
+
+    if mismatches:
+        print(f"❌ {len(mismatches)} mismatches.")
+        sys.exit(1)
+    print("✅ Identical output on the whole corpus.")
+
+if __name__ == "__main__":
+    run_audit()
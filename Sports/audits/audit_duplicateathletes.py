@@ -16,13 +16,15 @@ import re
 # 🟢 BULLETPROOF IMPORT PATHING
 # Tells Python to look one folder up to find 'utils'
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from utils.db_utils import supabase
+from utils.db_utils import supabase, iter_rows
+from utils.identity_index import IdentityIndex
 
 # ===========================
 # CONFIGURATION
 # ===========================
 # 🔴 Set to True ONLY after verifying the logs!
 COMMIT_CHANGES = True  
+DETAILS_CHUNK = 200  # ids per `details` lookup for grouped profiles
 
 # EVENT DICTIONARY (Mappings)
 EVENT_MAPPING = {
@@ -218,19 +220,19 @@ def analyze_group(driver, group):
 def run_auto_audit():
     print("🤖 Starting Best-Match Auditor...")
     print("⏳ Fetching profiles...")
-    all_rows = []
-    start = 0
-    while True:
-        res = supabase.table("entities").select("id,name,nationality,details").is_("name_audited", "false").range(start, start + 999).execute()
-        if not res.data: break
-        all_rows.extend(res.data)
-        start += 1000
+    # 🟢 Index id/name/nationality only; `details` is fetched just for rows that land in a group
+    index = IdentityIndex(expected_size=200000)
+    for row in iter_rows("entities", "id,name,nationality", apply=lambda q: q.is_("name_audited", "false")):
+        index.add(row["id"], row["name"], row["nationality"])
 
-    groups = collections.defaultdict(list)
-    for row in all_rows:
-        if row['name']: groups[row['name'].strip().lower()].append(row)
-    
-    duplicates = [g for g in groups.values() if len(g) > 1]
+    duplicates = [[index.record(p) for p in positions] for positions in index.groups("name")]
+    grouped_ids = [p['id'] for group in duplicates for p in group]
+    details = {}
+    for i in range(0, len(grouped_ids), DETAILS_CHUNK):
+        res = supabase.table("entities").select("id,details").in_("id", grouped_ids[i:i + DETAILS_CHUNK]).execute()
+        details.update((r['id'], r['details']) for r in res.data or [])
+    for group in duplicates:
+        for p in group: p['details'] = details.get(p['id'])
     print(f"🔍 Found {len(duplicates)} duplicate groups.")
 
     driver = setup_driver()
@@ -0,0 +1,117 @@
+import sys
+import os
+import re
+import csv
+import glob
+import time
+
+# 🟢 BULLETPROOF IMPORT PATHING
+# Tells Python to look one folder up to find 'utils'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.event_names import standardize_event_name, standardize_event_names
+
+# ===========================
+# Checks the compiled/memoized normalizer in utils/event_names.py against the
+# original standardize_event_name (frozen copy below) on every event label in
+# the repo's CSVs, plus the prefixes/suffixes result tables wrap them in.
+# Run it after touching any normalization rule: it must report 0 mismatches.
+# ===========================
+SPORTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def reference_standardize_event_name(name):
+    if not name: return ""
+    name = name.lower()
+    name = name.replace("short track", "")
+    name = name.replace("cross country", "XC")
+    name = re.sub(r"\b(women's|men's|women|men|final|heats|heat|semi-final|round \d+|qualification|group [a-z]|senior race|u20 race|race)\b", "", name)
+    name = re.sub(r"\s+", " ", name).strip()
+    slug_map = {
+        "sp": "Shot Put", "shotput": "Shot Put", "shot-put": "Shot Put",
+        "dt": "Discus", "discus": "Discus", "discus-throw": "Discus",
+        "jt": "Javelin", "javelin": "Javelin", "javelin-throw": "Javelin",
+        "ht": "Hammer Throw", "hammer": "Hammer Throw", "hammer-throw": "Hammer Throw",
+        "lj": "Long Jump", "longjump": "Long Jump", "long-jump": "Long Jump",
+        "tj": "Triple Jump", "triplejump": "Triple Jump", "triple-jump": "Triple Jump",
+        "hj": "High Jump", "highjump": "High Jump", "high-jump": "High Jump",
+        "pv": "Pole Vault", "polevault": "Pole Vault", "pole-vault": "Pole Vault",
+        "wt": "Weight Throw", "weightthrow": "Weight Throw", "weight-throw": "Weight Throw",
+        "dec": "Decathlon", "hep": "Heptathlon", "pen": "Pentathlon"
+    }
+    if name in slug_map:
+        return slug_map[name]
+    if "110m" in name and "hurdles" in name: return "110mH"
+    if "100m" in name and "hurdles" in name: return "100mH"
+    if "400m" in name and "hurdles" in name: return "400mH"
+    if "3000m" in name and "steeplechase" in name: return "3,000mSC"
+    if "2000m" in name and "steeplechase" in name: return "2,000mSC"
+    if "walk" in name:
+        if "20km" in name: return "20km Walk"
+        if "35km" in name: return "35km Walk"
+        if "50km" in name: return "50km Walk"
+        if "10000" in name: return "10,000m Walk"
+        return name.replace("walk", " Walk").title()
+    name = name.replace("metres", "m").replace("meters", "m")
+    name = re.sub(r"(\d)\s+m\b", r"\1m", name)
+    match = re.match(r"^(\d+)m$", name)
+    if match:
+        dist = int(match.group(1))
+        return f"{dist:,}m"
+    return name.title()
+
+def read_column(path, column):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [row[column] for row in csv.DictReader(f) if row.get(column)]
+
+def build_corpus():
+    labels = []
+    labels += read_column(os.path.join(SPORTS_DIR, "Archive", "Athletics - Results", "results.csv"), "event")
+    for path in glob.glob(os.path.join(SPORTS_DIR, "World Athletics Events", "World Athletics Results", "*.csv")):
+        labels += read_column(path, "Event")
+    for path in glob.glob(os.path.join(SPORTS_DIR, "World Athletics Events", "*.csv")):
+        labels += read_column(path, "Discipline")
+    # Rankings files are named <event-slug>_<gender>_rankings.csv
+    labels += [os.path.basename(p).rsplit("_", 2)[0] for p in glob.glob(os.path.join(SPORTS_DIR, "Athletics - Rankings", "*.csv"))]
+
+    # Result-table headings wrap the same labels: "Women's 100 Metres Hurdles Semi-Final", ...
+    base = sorted(set(labels))
+    spelled = [re.sub(r"(\d+)m\b", r"\1 Metres", b) for b in base]
+    variants = []
+    for b in base + spelled:
+        for prefix in ("", "Men's ", "Women's ", "Men ", "Women "):
+            for suffix in ("", " Final", " Heats", " Heat 2", " Semi-Final", " Round 1", " Qualification Group A", " Short Track", " Race"):
+                variants.append(f"{prefix}{b}{suffix}")
+                variants.append(f"{prefix}{b}{suffix}".upper())
+    extras = ["", "Cross Country Senior Race", "U20 Race", "20km Race Walk", "10000m Race Walk", "Mile Walk",
+              "3000m Steeplechase", "2000 Metres Steeplechase", "10000 m", "Decathlon 100m", "dec", "HEP", "pen"]
+    return labels + variants + extras
+
+def run_audit():
+    corpus = build_corpus()
+    distinct = sorted(set(corpus))
+    print(f"🔍 Checking {len(distinct)} distinct labels ({len(corpus)} total)...")
+
+    mismatches = [(l, reference_standardize_event_name(l), standardize_event_name(l))
+                  for l in distinct if reference_standardize_event_name(l) != standardize_event_name(l)]
+    column = standardize_event_names(corpus)
+    mismatches += [(l, reference_standardize_event_name(l), c)
+                   for l, c in zip(corpus, column) if reference_standardize_event_name(l) != c]
+
+    for label, expected, got in mismatches[:20]:
+        print(f"   ❌ {label!r}: expected {expected!r}, got {got!r}")
+
+    start = time.perf_counter()
+    [reference_standardize_event_name(l) for l in corpus]
+    t_ref = time.perf_counter() - start
+    standardize_event_name.cache_clear()
+    start = time.perf_counter()
+    standardize_event_names(corpus)
+    t_new = time.perf_counter() - start
+    print(f"⏱️ Original: {t_ref * 1000:.1f} ms | Column normalizer: {t_new * 1000:.1f} ms")
+
+    if mismatches:
+        print(f"❌ {len(mismatches)} mismatches.")
+        sys.exit(1)
+    print("✅ Identical output on the whole corpus.")
+
+if __name__ == "__main__":
+    run_audit()
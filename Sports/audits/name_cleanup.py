@@ -1,55 +1,38 @@
 import sys
 import os
-import collections
 
 # 🟢 BULLETPROOF IMPORT PATHING
 # Tells Python to look one folder up to find 'utils'
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from utils.db_utils import supabase
+from utils.db_utils import supabase, iter_rows
+from utils.identity_index import IdentityIndex
 
 def fetch_all_entities():
     print("⏳ Fetching ALL entities from database (this may take a moment)...")
-    
-    all_rows = []
-    start = 0
-    batch_size = 1000  # Max allowed by Supabase
-    
-    while True:
-        # Fetch range: 0-999, then 1000-1999, etc.
-        print(f"   -> Fetching rows {start} to {start + batch_size}...")
-        res = supabase.table("entities")\
-            .select("id,name,nationality")\
-            .range(start, start + batch_size - 1)\
-            .execute()
-        
-        rows = res.data
-        if not rows:
-            break  # Stop when no more data comes back
-            
-        all_rows.extend(rows)
-        start += batch_size
+    # 🟢 Streamed straight into the compact identity index instead of a list of row dicts
+    index = IdentityIndex(expected_size=200000)
+    for row in iter_rows("entities", "id,name,nationality"):
+        index.add(row["id"], row["name"], row["nationality"])
+        if len(index) % 10000 == 0:
+            print(f"   -> Indexed {len(index)} rows...")
 
-    print(f"✅ Total entities fetched: {len(all_rows)}")
-    return all_rows
+    print(f"✅ Total entities fetched: {len(index)} (~{index.memory_bytes() / 1e6:.0f} MB index)")
+    return index
 
-def group_duplicates(rows):
-    print(f"🔍 Analyzing {len(rows)} records for duplicates...")
-    groups = collections.defaultdict(list)
-    
-    for row in rows:
-        # Normalize name: remove extra spaces and lowercase
-        if not row['name']: continue
-        name_key = row['name'].strip().lower()
-        groups[name_key].append(row)
-        
-    # Return only names with > 1 entry
-    duplicates = {name: entries for name, entries in groups.items() if len(entries) > 1}
+def group_duplicates(index):
+    print(f"🔍 Analyzing {len(index)} records for duplicates...")
+    # Same key as always (name.strip().lower()), read from the index's "name" blocking key.
+    # Rows without a name never form a group.
+    duplicates = {}
+    for positions in index.groups("name"):
+        entries = [index.record(p) for p in positions]
+        duplicates[entries[0]['name'].strip().lower()] = entries
     return duplicates
 
 def perform_safe_merges():
     # 1. GET ALL DATA
-    rows = fetch_all_entities()
-    duplicates = group_duplicates(rows)
+    index = fetch_all_entities()
+    duplicates = group_duplicates(index)
 
     if not duplicates:
         print("🎉 No duplicates found!")
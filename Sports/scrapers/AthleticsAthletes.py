@@ -4,7 +4,6 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import undetected_chromedriver as uc
-from datetime import datetime
 from tqdm import tqdm
 import sys
 import os
@@ -13,13 +12,11 @@ import os
 # This tells Python to look one folder up (in the Sports folder) so it can find 'utils'
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from utils.db_utils import upsert_entity, standardize_event_name
-
-def convert_date(date_str):
-    try:
-        return datetime.strptime(date_str, "%d %b %Y").strftime("%Y-%m-%d")
-    except Exception:
-        return None
+from utils.db_utils import standardize_event_name, entity_cache_stats, count_result_rows, print_call_summary
+from utils.db_utils import use_write_hashes, write_stats
+from utils.write_hashes import WriteHashStore
+from utils.async_db_utils import aupsert_entities_bulk, db_runner
+from utils.dates import to_iso_date
 
 def format_name(raw_name):
     parts = raw_name.lstrip('. ').strip().split()
@@ -45,6 +42,10 @@ driver = uc.Chrome(options=options)
 wait = WebDriverWait(driver, 20)
 
 # --- CONFIG ---
+# 🟢 Skip athletes whose ranking data is unchanged since our last sync (hashes in data/write_hashes.sqlite)
+SKIP_UNCHANGED_WRITES = True
+if SKIP_UNCHANGED_WRITES: use_write_hashes(WriteHashStore())
+
 genders = [
     {
         "label": "women", "gender": "female",
@@ -57,6 +58,7 @@ genders = [
 ]
 
 total_synced = 0
+pending_writes = []
 
 try:
     for g in genders:
@@ -91,6 +93,7 @@ try:
                         print(f"⚠️ No rows found for {clean_event} page {page}")
                         break
 
+                    page_records = []
                     for row in rows:
                         cols = row.find_elements(By.TAG_NAME, "td")
                         if len(cols) >= 5:
@@ -103,7 +106,7 @@ try:
                                 points_txt = cols[4].text.strip()
                                 points = int(points_txt) if points_txt.isdigit() else 0
                                 
-                                dob = convert_date(dob_raw)
+                                dob = to_iso_date(dob_raw)
 
                                 # --- PREPARE DATA (With Clean Keys) ---
                                 entity_data = {
@@ -119,12 +122,14 @@ try:
                                         f"points_{clean_event}": points
                                     }
                                 }
-                                
-                                upsert_entity(entity_data)
-                                total_synced += 1
+                                page_records.append(entity_data)
                             except Exception as e:
                                 continue
 
+                    count_result_rows(len(page_records))
+                    # 🟢 One bulk upsert per rankings page, written in the background while the next page loads
+                    pending_writes.append(db_runner.submit(aupsert_entities_bulk(page_records)))
+
                     # Next Page
                     try:
                         next_btn = driver.find_element(By.CSS_SELECTOR, "a.btn--pag-next")
@@ -142,5 +147,10 @@ except KeyboardInterrupt:
 except Exception as e:
     print(f"\n❌ Critical Error: {e}")
 finally:
+    db_runner.drain()
+    total_synced = sum(len(f.result()) for f in pending_writes if not f.exception())
     print(f"\n✅ Sync Complete. {total_synced} athletes processed.")
+    print(f"🧠 Entity cache: {entity_cache_stats()}")
+    print_call_summary()
+    print(f"✍️ Writes: {write_stats.summary()}")
     driver.quit()
\ No newline at end of file
@@ -3,130 +3,60 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-import time
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 import csv
 import os
-from datetime import datetime
-import re
+import sys
+import time
+import queue
+import argparse
+import threading
+from datetime import date, datetime, timedelta
+
+# 🟢 BULLETPROOF IMPORT PATHING
+# Tells Python to look one folder up to find 'utils'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.meet_catalog import MeetCatalog, meet_key, GROUP_SEPARATOR
+from utils.results_parser import parse_html, Node
+from utils.dates import parse_date_range
 
 # =========================
-# Date parsing helpers
+# Date helpers
 # =========================
 
-def try_parse_date(text: str, default_year: int | None = None) -> datetime | None:
-    """
-    Parse a single date that may look like:
-      - '27 Aug 2025'
-      - '22-Aug-25'
-      - '27 Aug'  (year missing; use default_year if provided)
-    """
-    if not text or not isinstance(text, str):
-        return None
-
-    t = text.strip().replace("–", "-")
-    t = re.sub(r"\s+", " ", t)
-
-    # If missing year and we have a default year, append it
-    if default_year and re.match(r"^\d{1,2}\s+[A-Za-z]{3}$", t, re.I):
-        t = f"{t} {default_year}"
-
-    # Normalise case for month names
-    t_norm = t.title()
-
-    for fmt in ("%d %b %Y", "%d-%b-%y", "%d %b %y"):
-        try:
-            return datetime.strptime(t_norm, fmt)
-        except ValueError:
-            continue
-
-    return None
-
-
-def parse_wa_date_range(raw: str) -> tuple[datetime | None, datetime | None]:
-    """
-    Parse World Athletics calendar date strings that can be:
-      - '27 Aug 2025'
-      - '27 Aug 2025 - 28 Aug 2025'
-      - '27 Aug - 28 Aug 2025'            (left side missing year)
-      - '28 FEB-01 MAR 2025'              (compact uppercase cross-month)
-      - '03-05 OCT 2025'                  (same-month day range)
-      - '12-14 SEP 2025'
-    Returns (start_dt, end_dt) or (None, None).
-    """
-    if not raw or not isinstance(raw, str):
-        return None, None
-
-    s = raw.strip().replace("–", "-")
-    s = re.sub(r"\s+", " ", s)
-
-    # Case: "28 FEB-01 MAR 2025" (cross-month compact range)
-    m = re.match(
-        r"^(\d{1,2})\s*([A-Za-z]{3})\s*-\s*(\d{1,2})\s*([A-Za-z]{3})\s*(\d{4})$",
-        s, re.I
-    )
-    if m:
-        d1, mon1, d2, mon2, y = m.groups()
-        start = try_parse_date(f"{d1} {mon1} {y}")
-        end = try_parse_date(f"{d2} {mon2} {y}")
-        return start, end
-
-    # ✅ NEW Case: "03-05 OCT 2025" or "3-5 Oct 2025" (same-month range)
-    m = re.match(r"^(\d{1,2})\s*-\s*(\d{1,2})\s*([A-Za-z]{3})\s*(\d{4})$", s, re.I)
-    if m:
-        d1, d2, mon, y = m.groups()
-        start = try_parse_date(f"{d1} {mon} {y}")
-        end   = try_parse_date(f"{d2} {mon} {y}")
-        return start, end
-
-    # Standard range: "X - Y"
-    if "-" in s:
-        parts = [p.strip() for p in s.split("-")]
-        if len(parts) == 2:
-            left, right = parts
-
-            # Parse right first (usually includes year)
-            end = try_parse_date(right)
-            if not end:
-                return None, None
-
-            # Left may not include year
-            start = try_parse_date(left, default_year=end.year)
-            if not start:
-                return None, None
-
-            return start, end
-
-    # Single date
-    dt = try_parse_date(s)
-    if dt:
-        return dt, dt
-
-    return None, None
-
-
-def to_iso(dt: datetime | None) -> str:
+def to_iso(dt: date | None) -> str:
     return dt.strftime("%Y-%m-%d") if dt else ""
 
 
 # =========================
-# Setup browser
+# Settings
 # =========================
 
-options = Options()
-# options.add_argument("--headless")  # Uncomment to run without opening browser
-driver = webdriver.Chrome(options=options)
-wait = WebDriverWait(driver, 20)
-
-# --- Date range ---
-start_date = "2026-01-01"
-end_date = "2026-02-13"
+# --- Incremental sync (default; --start / --end harvest one explicit window instead) ---
+# Every run re-reads a rolling window around today (where results links appear, dates move and
+# meets get cancelled) plus the next SWEEP_CHUNK_DAYS of a slow sweep over the rest of the season.
+# The sweep cursor and the last sync date are kept in the meet catalog, so no dates to edit.
+ROLLING_BACK_DAYS = 14
+ROLLING_AHEAD_DAYS = 30
+SWEEP_CHUNK_DAYS = 31
+MAX_CATCHUP_DAYS = 90   # how far back a sync reaches after missed runs
 
-# --- Output folder and file ---
+# --- Output folder ---
 # 🟢 BULLETPROOF PATHING: Route output to the "data/" folder one level up
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 output_dir = os.path.abspath(os.path.join(BASE_DIR, "..", "data"))
-os.makedirs(output_dir, exist_ok=True)
-csv_filename = os.path.join(output_dir, f"world_athletics_events_{start_date}_to_{end_date}.csv")
+
+CALENDAR_URL = (
+    "https://worldathletics.org/competition/calendar-results"
+    "?isSearchReset=true&startDate={start}&endDate={end}"
+)
+ROWS_SELECTOR = "table[class*='ResultsTable_resultsTable'] tbody tr"
+NEXT_SELECTOR = "ul[class*='EventCalendar_pagination'] li.next a"
+
+# 🟢 HARVEST: the unfiltered calendar is paged once per window chunk (instead of once per group),
+# with up to HARVEST_WORKERS browsers each working through their own chunks at the same time
+WINDOW_CHUNK_DAYS = 31
+HARVEST_WORKERS = 2
 
 # --- Competition groups ---
 competition_groups = [
@@ -160,144 +90,287 @@ competition_groups = [
     "National Senior 10,000m Championships"
 ]
 
+
+def in_competition_groups(comp_group: str) -> bool:
+    """Client-side version of the site's Competition Group filter."""
+    return any(group in (comp_group or "") for group in competition_groups)
+
 # =========================
-# CSV setup
+# Calendar harvest
 # =========================
 
-with open(csv_filename, mode="w", newline="", encoding="utf-8-sig") as csvfile:
-    writer = csv.writer(csvfile)
-
-    # Added Raw Date for debugging + ISO outputs for Start/End
-    writer.writerow([
-        "Event Name",
-        "Raw Date",
-        "Start Date",   # ISO YYYY-MM-DD
-        "End Date",     # ISO YYYY-MM-DD
-        "Venue",
-        "Country",
-        "Discipline",
-        "Competition Group",
-        "Result Link"
-    ])
-
-    for group in competition_groups:
-        print(f"\n🔍 Searching for: {group}")
-
-        url = (
-            "https://worldathletics.org/competition/calendar-results"
-            f"?isSearchReset=true&startDate={start_date}&endDate={end_date}"
-        )
-        driver.get(url)
-
-        # Dismiss cookie popup
+def launch_browser():
+    options = Options()
+    # options.add_argument("--headless")  # Uncomment to run without opening browser
+    return webdriver.Chrome(options=options)
+
+def split_window(start: str, end: str, days: int = WINDOW_CHUNK_DAYS) -> list[tuple[str, str]]:
+    first = datetime.strptime(start, "%Y-%m-%d")
+    last = datetime.strptime(end, "%Y-%m-%d")
+    chunks = []
+    while first <= last:
+        chunk_end = min(first + timedelta(days=days - 1), last)
+        chunks.append((to_iso(first), to_iso(chunk_end)))
+        first = chunk_end + timedelta(days=1)
+    return chunks
+
+def parse_calendar_rows(html: str) -> list[dict]:
+    """Every calendar row of one page_source snapshot (no WebDriver call per cell)."""
+    table = parse_html(html).find("table", "ResultsTable_resultsTable")
+    if table is None:
+        return []
+
+    meets = []
+    for body in table.iter("tbody"):
+        for tr in body.iter("tr"):
+            cols = [c for c in tr.children if isinstance(c, Node) and c.tag == "td"]
+            if len(cols) < 8:
+                continue
+
+            raw_date = cols[0].text().strip().replace("–", "-")
+            start_dt, end_dt = parse_date_range(raw_date)
+
+            # Get result link
+            result_link = ""
+            for a_tag in tr.iter("a"):
+                href = a_tag.attrs.get("href") or ""
+                if "/results/" in href:
+                    result_link = href
+                    break
+            if result_link and not result_link.startswith("http"):
+                result_link = f"https://worldathletics.org{result_link}"
+
+            meets.append({
+                "name": cols[1].text().strip(),
+                "raw_date": raw_date,
+                "start_date": to_iso(start_dt),
+                "end_date": to_iso(end_dt),
+                "venue": cols[3].text().strip(),
+                "country": cols[4].text().strip(),
+                "discipline": cols[6].text().strip(),
+                "group": cols[7].text().strip(),
+                "result_url": result_link,
+            })
+    return meets
+
+def _first_row_text(driver):
+    try:
+        return driver.find_element(By.CSS_SELECTOR, ROWS_SELECTOR).text
+    except WebDriverException:
+        return None
+
+def dismiss_cookies(driver):
+    try:
+        WebDriverWait(driver, 5).until(
+            EC.element_to_be_clickable((By.ID, "CybotCookiebotDialogBodyButtonDecline"))
+        ).click()
+    except:
+        pass
+
+def sync_windows(catalog, today: datetime | None = None) -> tuple[list[tuple[str, str]], tuple[str, str], str]:
+    """
+    (window chunks to harvest, the sweep chunk among them, next sweep cursor) for this run:
+    the rolling window (stretched back to the last sync after missed runs) plus one sweep chunk.
+    """
+    today = (today or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    back = today - timedelta(days=ROLLING_BACK_DAYS)
+    last_sync = catalog.get_state("last_sync")
+    if last_sync:
+        missed = datetime.strptime(last_sync, "%Y-%m-%d") - timedelta(days=ROLLING_BACK_DAYS)
+        back = max(min(back, missed), today - timedelta(days=MAX_CATCHUP_DAYS))
+    ahead = today + timedelta(days=ROLLING_AHEAD_DAYS)
+    windows = split_window(to_iso(back), to_iso(ahead))
+
+    season_start, season_end = datetime(today.year, 1, 1), datetime(today.year, 12, 31)
+    cursor = catalog.get_state("sweep_cursor")
+    cursor = datetime.strptime(cursor, "%Y-%m-%d") if cursor else season_start
+    if not season_start <= cursor <= season_end:
+        cursor = season_start
+    sweep_end = min(cursor + timedelta(days=SWEEP_CHUNK_DAYS - 1), season_end)
+    sweep = (to_iso(cursor), to_iso(sweep_end))
+    next_cursor = sweep_end + timedelta(days=1)
+    if next_cursor > season_end:
+        next_cursor = season_start
+    # A sweep chunk inside the rolling window is already covered
+    if not (back <= cursor and sweep_end <= ahead):
+        windows.append(sweep)
+    return windows, sweep, to_iso(next_cursor)
+
+def harvest_window(driver, start: str, end: str) -> tuple[list[dict], int, bool]:
+    """
+    Pages the unfiltered calendar for one window. Returns (rows, pages read, complete): a window
+    that came back empty or stopped paging early is not complete.
+    """
+    driver.get(CALENDAR_URL.format(start=start, end=end))
+    dismiss_cookies(driver)
+
+    rows, page = [], 0
+    while True:
         try:
-            decline_btn = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.ID, "CybotCookiebotDialogBodyButtonDecline"))
-            )
-            decline_btn.click()
-        except:
-            pass
-
-        # Open and select group
+            WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, ROWS_SELECTOR)))
+        except TimeoutException:
+            if not page:
+                print(f"⚠️ No results found for {start} -> {end}")
+            return rows, page, bool(page)
+        page += 1
+        page_rows = parse_calendar_rows(driver.page_source)
+        print(f"📄 {start} -> {end}, page {page}: {len(page_rows)} events")
+        rows.extend(page_rows)
+
+        # Go to next page: wait for the table to change instead of a fixed sleep
         try:
-            comp_group_button = wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//button[text()='Competition Group']"))
-            )
-            comp_group_button.click()
-            time.sleep(2)
-        except:
-            print(f"⚠️ Could not open Competition Group filter for: {group}")
-            continue
-
+            next_btn = driver.find_element(By.CSS_SELECTOR, NEXT_SELECTOR)
+        except NoSuchElementException:
+            return rows, page, True
+        if "aria-disabled=\"true\"" in (next_btn.get_attribute("outerHTML") or ""):
+            return rows, page, True
+        before = _first_row_text(driver)
+        driver.execute_script("arguments[0].click();", next_btn)
         try:
-            group_option = wait.until(EC.element_to_be_clickable((
-                By.XPATH,
-                f"//li[contains(@class, 'Filter_filterOption')][.//span[contains(text(),\"{group}\")]]"
-            )))
-            driver.execute_script("arguments[0].scrollIntoView(true);", group_option)
-            time.sleep(0.5)
-            driver.execute_script("arguments[0].click();", group_option)
-            time.sleep(4)
-        except:
-            print(f"⚠️ Could not find filter for: {group}")
+            WebDriverWait(driver, 15).until(lambda d: _first_row_text(d) not in (None, before))
+        except TimeoutException:
+            print(f"⚠️ Page {page + 1} of {start} -> {end} did not load")
+            return rows, page, False
+
+def merge_meets(merged: dict, rows: list[dict]) -> None:
+    """Dedupes by result link (or name|start|venue without one), merging competition groups."""
+    for row in rows:
+        key = meet_key(row)
+        if key in merged:
+            merged[key]["groups"].add(row["group"])
             continue
+        merged[key] = {**row, "groups": {row["group"]}}
 
-        # --- Pagination ---
-        page = 1
-
-        while True:
-            try:
-                wait.until(EC.presence_of_element_located((
-                    By.CSS_SELECTOR,
-                    "table.ResultsTable_resultsTable__JBH1Y tbody"
-                )))
-                time.sleep(1)
-
-                rows = driver.find_elements(
-                    By.CSS_SELECTOR,
-                    "table.ResultsTable_resultsTable__JBH1Y tbody tr"
-                )
-                print(f"📄 Page {page}: {len(rows)} events")
-
-                for row in rows:
-                    cols = row.find_elements(By.TAG_NAME, "td")
-                    if len(cols) < 8:
-                        continue
-
-                    raw_date = cols[0].text.strip().replace("–", "-")
-                    start_dt, end_dt = parse_wa_date_range(raw_date)
-
-                    start_date_iso = to_iso(start_dt)
-                    end_date_iso = to_iso(end_dt)
-
-                    name = cols[1].text.strip()
-                    venue = cols[3].text.strip()
-                    country = cols[4].text.strip()
-                    discipline = cols[6].text.strip()
-                    comp_group = cols[7].text.strip()
-
-                    # Get result link
-                    result_link = ""
-                    for col in cols:
-                        try:
-                            a_tag = col.find_element(By.TAG_NAME, "a")
-                            href = a_tag.get_attribute("href")
-                            if href and "/results/" in href:
-                                result_link = href
-                                break
-                        except:
-                            continue
-
-                    if result_link and not result_link.startswith("http"):
-                        result_link = f"https://worldathletics.org{result_link}"
-
-                    writer.writerow([
-                        name,
-                        raw_date,
-                        start_date_iso,
-                        end_date_iso,
-                        venue,
-                        country,
-                        discipline,
-                        comp_group,
-                        result_link
-                    ])
-
-                # Go to next page
+def harvest(chunks: list[tuple[str, str]], workers: int = HARVEST_WORKERS) -> tuple[list[dict], dict]:
+    """
+    Harvests the calendar for each (start, end) chunk and keeps the rows in competition_groups.
+    Returns (deduped meets, stats); stats["complete"] lists the chunks that were read in full.
+    """
+    windows = queue.Queue()
+    for window in chunks:
+        windows.put(window)
+    merged, stats = {}, {"pages": 0, "rows": 0, "kept": 0, "complete": []}
+    lock = threading.Lock()
+
+    def work():
+        driver = launch_browser()
+        try:
+            while True:
                 try:
-                    next_btn = driver.find_element(By.CSS_SELECTOR, "ul.EventCalendar_pagination__SLTyn li.next a")
-                    if "aria-disabled=\"true\"" in (next_btn.get_attribute("outerHTML") or ""):
-                        break
-                    driver.execute_script("arguments[0].click();", next_btn)
-                    page += 1
-                    time.sleep(2)
-                except:
-                    break
+                    window = windows.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    rows, pages, complete = harvest_window(driver, *window)
+                except Exception as e:
+                    print(f"⚠️ Failed {window[0]} -> {window[1]}: {e}")
+                    continue
+                kept = [row for row in rows if in_competition_groups(row["group"])]
+                with lock:
+                    stats["pages"] += pages
+                    stats["rows"] += len(rows)
+                    stats["kept"] += len(kept)
+                    if complete: stats["complete"].append(window)
+                    merge_meets(merged, kept)
+        finally:
+            driver.quit()
+
+    threads = [threading.Thread(target=work) for _ in range(max(1, min(workers, windows.qsize())))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    meets = []
+    for meet in sorted(merged.values(), key=lambda m: (m["start_date"], m["name"])):
+        groups = meet.pop("groups")
+        meets.append({**meet, "group": GROUP_SEPARATOR.join(sorted(g for g in groups if g))})
+    stats["meets"] = len(meets)
+    return meets, stats
 
-            except:
-                print(f"⚠️ No results found or failed to load page {page} for: {group}")
-                break
+# =========================
+# Output
+# =========================
 
-# --- Done ---
-driver.quit()
-print(f"\n✅ Saved CSV: {csv_filename}")
\ No newline at end of file
+def save_csv(meets: list[dict], csv_filename: str) -> None:
+    with open(csv_filename, mode="w", newline="", encoding="utf-8-sig") as csvfile:
+        writer = csv.writer(csvfile)
+
+        # Added Raw Date for debugging + ISO outputs for Start/End
+        writer.writerow([
+            "Event Name",
+            "Raw Date",
+            "Start Date",   # ISO YYYY-MM-DD
+            "End Date",     # ISO YYYY-MM-DD
+            "Venue",
+            "Country",
+            "Discipline",
+            "Competition Group",
+            "Result Link"
+        ])
+        for meet in meets:
+            writer.writerow([
+                meet["name"], meet["raw_date"], meet["start_date"], meet["end_date"], meet["venue"],
+                meet["country"], meet["discipline"], meet["group"], meet["result_url"]
+            ])
+
+def save_changes_csv(changes: list[tuple], csv_filename: str) -> None:
+    """Only what a sync found new, changed or cancelled (for downstream scraping / upcoming upserts)."""
+    with open(csv_filename, mode="w", newline="", encoding="utf-8-sig") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow([
+            "Change", "Changed Fields", "Event Name", "Raw Date", "Start Date", "End Date", "Venue",
+            "Country", "Discipline", "Competition Group", "Result Link"
+        ])
+        for change, _, fields, meet in changes:
+            writer.writerow([
+                change, ",".join(fields), meet.get("name"), meet.get("raw_date"), meet.get("start_date"),
+                meet.get("end_date"), meet.get("venue"), meet.get("country"), meet.get("discipline"),
+                meet.get("group"), meet.get("result_url")
+            ])
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the World Athletics calendar into the meet catalog.")
+    parser.add_argument("--start", help="harvest one explicit window from this date (YYYY-MM-DD) instead of syncing")
+    parser.add_argument("--end", help="end of the explicit window (YYYY-MM-DD, default: --start)")
+    parser.add_argument("--workers", type=int, default=HARVEST_WORKERS, help="browsers harvesting window chunks at once")
+    args = parser.parse_args()
+
+    started = time.time()
+    # 🟢 The meet catalog (data/meet_catalog.sqlite) merges all pulls and keeps the sync watermarks;
+    # WorldAthleticsResults.py picks its work from it
+    catalog = MeetCatalog()
+    if args.start:
+        windows, sweep, next_cursor = split_window(args.start, args.end or args.start), None, None
+    else:
+        windows, sweep, next_cursor = sync_windows(catalog)
+        print(f"🔄 Sync: {len(windows)} chunks from {windows[0][0]}, season sweep at {sweep[0]} -> {sweep[1]}")
+    meets, stats = harvest(windows, args.workers)
+
+    # Only chunks read in full can tell us a meet disappeared
+    changes = catalog.sync(meets, stats["complete"])
+    if not args.start:
+        today = datetime.now().strftime("%Y-%m-%d")
+        if sweep in stats["complete"] or sweep not in windows: catalog.set_state("sweep_cursor", next_cursor)
+        if len(stats["complete"]) == len(windows): catalog.set_state("last_sync", today)
+
+    os.makedirs(output_dir, exist_ok=True)
+    if args.start:
+        csv_filename = os.path.join(output_dir, f"world_athletics_events_{args.start}_to_{args.end or args.start}.csv")
+        save_csv(meets, csv_filename)
+        print(f"\n✅ Saved CSV: {csv_filename}")
+    if changes:
+        changes_filename = os.path.join(output_dir, f"world_athletics_changes_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.csv")
+        save_changes_csv(changes, changes_filename)
+        print(f"✅ Saved changes: {changes_filename}")
+
+    counts = {kind: sum(1 for c in changes if c[0] == kind) for kind in ("new", "changed", "cancelled")}
+    print(f"📊 {stats['pages']} pages, {stats['rows']} rows, {stats['kept']} in our groups, "
+          f"{stats['meets']} unique meets in {time.time() - started:.0f}s")
+    print(f"🔀 {counts['new']} new, {counts['changed']} changed, {counts['cancelled']} cancelled "
+          f"({len(stats['complete'])}/{len(windows)} chunks complete)")
+    print(f"📅 Meet catalog: {catalog.summary()}")
+    catalog.close()
+
+if __name__ == "__main__":
+    main()
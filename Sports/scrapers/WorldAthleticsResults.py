@@ -1,158 +1,40 @@
 import sys
 import os
 import time
-import re
-import pandas as pd
-from datetime import datetime, timedelta
+import queue
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor, Future
+from datetime import datetime
 
 # 🟢 BULLETPROOF IMPORT PATHING
 # Tells Python to look one folder up to find 'utils'
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from utils.db_utils import upsert_entity, upsert_event, supabase, standardize_event_name
+from utils.db_utils import upsert_entities_bulk, upsert_event, supabase, standardize_event_name, create_slug
+from utils.db_utils import warm_entity_cache, entity_cache_stats, EventBuffer, count_result_rows, print_call_summary
+from utils.db_utils import use_write_hashes, write_stats, RateLimiter
+from utils.write_journal import WriteJournal
+from utils.write_hashes import WriteHashStore
+from utils.results_parser import parse_meet_page, meet_days
+from utils.results_fetcher import ResultsFetcher
+from utils.scrape_progress import ScrapeProgress
+from utils.combined_events import link_combined_events
+from utils.dates import to_iso_date
+from utils.pipeline import Pipeline, timed_call
+from utils.snapshot_store import SnapshotStore
+from utils.meet_catalog import MeetCatalog
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
 import undetected_chromedriver as uc
 from tqdm import tqdm
 
 
 # ==========================================
-# 🔧 PART 2: ENTITY DETAILS UPDATER
+# 🚀 PART 2: MAIN SCRAPER
 # ==========================================
-def update_entity_details(entity_id, discipline_clean):
-    if not entity_id or not discipline_clean: return
-    # Basic key cleaning for DB column compatibility
-    disc_key = discipline_clean.lower().replace(" ", "").replace("shorttrack", "").replace(",", "")
-    try:
-        res = supabase.table("entities").select("details").eq("id", entity_id).single().execute()
-        if not res.data: return
-        current_details = res.data.get("details") or {}
-        updates = {}
-        # Only initialize N/A if missing; do not overwrite existing data
-        if f"points_{disc_key}" not in current_details: updates[f"points_{disc_key}"] = "N/A"
-        if f"ranking_{disc_key}" not in current_details: updates[f"ranking_{disc_key}"] = "N/A"
-        if updates:
-            supabase.table("entities").update({"details": {**current_details, **updates}}).eq("id", entity_id).execute()
-    except Exception as e: pass
-
-# ==========================================
-# 🔧 PART 3: POST-PROCESSING FIX LOGIC
-# ==========================================
-def normalize_str(s):
-    if not s: return ""
-    s = s.lower().replace("short track", "").replace("shorttrack", "").replace(",", "")
-    return s.replace(" ", "").strip()
-
-def run_combined_events_fix():
-    print("\n🧹 Running Post-Scrape Cleanup (Linking Combined Events)...")
-    
-    SUB_EVENT_whitelist = {
-        'Decathlon': ['100m', '400m', '1,500m', '110mH', 'Long Jump', 'High Jump', 'Pole Vault', 'Shot Put', 'Discuss', 'Javelin'],
-        'Heptathlon': ['100mH', '200m', '800m', 'High Jump', 'Shot Put', 'Long Jump', 'Javelin', '60mH'],
-        'Pentathlon': ['60mH', '800m', 'High Jump', 'Shot Put', 'Long Jump']
-    }
-
-    res = supabase.table("events").select("entity_id, start_time, result, event_key, title").or_("event_key.ilike.%Decathlon%,event_key.ilike.%Heptathlon%,event_key.ilike.%Pentathlon%").execute()
-    triggers = res.data
-    if not triggers: return
-
-    targets = {}
-    for t in triggers:
-        if not t['start_time']: continue
-        date_str = t['start_time'][:10]
-        key = (t['entity_id'], date_str)
-        raw_str = str(t.get('result', {}))
-        evt_key = str(t.get('event_key', ''))
-        
-        if "Decathlon" in raw_str or "Decathlon" in evt_key: c_type = "Decathlon"
-        elif "Heptathlon" in raw_str or "Heptathlon" in evt_key: c_type = "Heptathlon"
-        else: c_type = "Pentathlon"
-        
-        current_title = t.get('title', '')
-        if key not in targets:
-            targets[key] = {'type': c_type, 'meet_name': current_title}
-        elif targets[key]['meet_name'] in ['Decathlon', 'Heptathlon', 'Pentathlon'] and current_title not in ['Decathlon', 'Heptathlon', 'Pentathlon']:
-            targets[key]['meet_name'] = current_title
-
-    count = 0
-    for (entity_id, date_str), info in targets.items():
-        c_type = info['type']
-        all_events = supabase.table("events").select("*").eq("entity_id", entity_id).execute().data
-        dt_start = datetime.strptime(date_str, "%Y-%m-%d")
-        dt_end = dt_start + timedelta(days=3)
-        meet_events = [e for e in all_events if e['start_time'] and dt_start <= datetime.strptime(e['start_time'][:10], "%Y-%m-%d") < dt_end]
-        
-        if len(meet_events) < 2: continue
-
-        real_meet_name = info['meet_name']
-        if real_meet_name in ['Decathlon', 'Heptathlon', 'Pentathlon']:
-            for child in meet_events:
-                if child['title'] not in ['Decathlon', 'Heptathlon', 'Pentathlon']:
-                    real_meet_name = child['title']; break
-
-        parent_rows = [e for e in meet_events if e.get('is_parent') is True]
-        if parent_rows:
-            parent_id = parent_rows[0]['id']
-            if parent_rows[0]['title'] in ['Decathlon', 'Heptathlon', 'Pentathlon'] and real_meet_name != parent_rows[0]['title']:
-                supabase.table("events").update({"title": real_meet_name}).eq("id", parent_id).execute()
-        else:
-            parent_key = f"{c_type}|Overall|{real_meet_name}"
-            supabase.table("events").upsert({
-                "entity_id": entity_id, "title": real_meet_name, "start_time": meet_events[0]['start_time'],
-                "category": "Athletics", "status": "completed", "is_parent": True,
-                "event_key": parent_key, "result": {"status": "Aggregated"} 
-            }, on_conflict="entity_id,event_key").execute()
-            
-            p_fetch = supabase.table("events").select("id").eq("entity_id", entity_id).eq("event_key", parent_key).execute()
-            if not p_fetch.data: continue
-            parent_id = p_fetch.data[0]['id']
-
-        valid_subs = SUB_EVENT_whitelist[c_type]
-        for child in meet_events:
-            if child['id'] == parent_id or child.get('parent_event_id'): continue 
-            norm_raw = normalize_str(child.get('result', {}).get('event_name_raw', ''))
-            norm_disc = normalize_str(child.get('result', {}).get('discipline_clean', ''))
-            norm_type = normalize_str(c_type)
-            is_sub = (norm_type in normalize_str(child.get('event_key', '')) or norm_type in norm_raw)
-            if not is_sub:
-                for sub in valid_subs:
-                    if sub.lower() in norm_disc or sub.lower() in norm_raw: is_sub = True; break
-            
-            if is_sub:
-                if norm_disc == norm_type:
-                    supabase.table("events").update({"result": child['result']}).eq("id", parent_id).execute()
-                    supabase.table("events").delete().eq("id", child['id']).execute()
-                else:
-                    supabase.table("events").update({"parent_event_id": parent_id}).eq("id", child['id']).execute()
-        count += 1
-    print(f"✅ Cleanup Complete. Processed {count} groups.")
-
-# ==========================================
-# 🚀 PART 4: MAIN SCRAPER
-# ==========================================
-
-def parse_any_date_to_iso(date_str: str) -> str | None:
-    if not date_str or not isinstance(date_str, str): return None
-    s = date_str.strip().replace("–", "-")
-    s = re.sub(r"\s+", " ", s)
-    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%b-%y", "%d %b %Y", "%d %b %y"):
-        try: return datetime.strptime(s.title(), fmt).strftime("%Y-%m-%d")
-        except: continue
-    return None
-
-def normalize_meta_label(txt: str) -> str:
-    return re.sub(r"\s+", " ", txt).strip() if txt else ""
-
-def extract_round_from_table(table) -> str:
-    try:
-        strong = table.find_element(By.XPATH, "./ancestor::div[contains(@class,'EventResults_tableWrap')]/preceding-sibling::span[contains(@class,'EventResults_eventMeta')][1]//strong")
-        return normalize_meta_label(strong.text)
-    except: pass
-    try:
-        strong = table.find_element(By.XPATH, "./ancestor::section[contains(@class,'EventResults_eventResult')]//span[contains(@class,'EventResults_eventMeta')]//strong")
-        return normalize_meta_label(strong.text)
-    except: return ""
 
 def build_event_key(event_name_raw: str, round_label: str, meet_name: str) -> str:
     base = (event_name_raw or "").strip()
@@ -164,155 +46,555 @@ def build_event_key(event_name_raw: str, round_label: str, meet_name: str) -> st
 # 🟢 PATH FIXES: Look in the 'data/' folder
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 data_dir = os.path.abspath(os.path.join(BASE_DIR, "..", "data"))
-log_file = os.path.join(data_dir, "scraped_log.txt")
 
 # 🟢 TOGGLE THIS to FORCE RESCRAPE
 FORCE_RESCRAPE = False
-
-print("🚀 Launching Browser...")
-options = uc.ChromeOptions()
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-prefs = {"profile.managed_default_content_settings.images": 2}
-options.add_experimental_option("prefs", prefs)
-options.page_load_strategy = "eager"
-
-# 🟢 FIX: Force version 144 to match your browser
-driver = uc.Chrome(options=options, version_main=144)
-wait = WebDriverWait(driver, 10)
-
-processed_urls = set()
-if os.path.exists(log_file) and not FORCE_RESCRAPE:
-    with open(log_file, "r") as f: processed_urls = set(line.strip() for line in f)
-    print(f"🔄 Resuming... Found {len(processed_urls)} scraped events.")
-
-df = None
-try:
-    if not os.path.exists(data_dir): 
-        os.makedirs(data_dir, exist_ok=True)
-        
-    csv_files = [f for f in os.listdir(data_dir) if f.startswith("world_athletics_events") and f.endswith(".csv")]
-    
-    if not csv_files:
-        print(f"⚠️ No CSV files found in {data_dir}. Run WorldAthleticsEvents.py first.")
-        driver.quit()
-        exit()
-        
-    latest_file = max(csv_files, key=lambda f: os.path.getmtime(os.path.join(data_dir, f)))
-    df = pd.read_csv(os.path.join(data_dir, latest_file))
-    print(f"📂 Loaded {len(df)} meets from {latest_file}.")
-except Exception as e:
-    print(f"❌ Error loading CSV: {e}")
-    driver.quit()
-    exit()
-
-link_to_date = {}
-if df is not None:
-    for _, row in df.iterrows():
-        rl = row.get("Result Link")
-        if not isinstance(rl, str) or not rl.strip(): continue
-        key = rl.replace("https://worldathletics.org", "").strip()
-        start_date_val = row.get("Start Date")
-        iso_date = parse_any_date_to_iso(str(start_date_val)) if start_date_val else None
-        link_to_date[key] = iso_date or ""
-
-links_to_scrape = []
-if df is not None:
-    links_to_scrape = [url for url in df.get("Result Link", pd.Series()).dropna() if isinstance(url, str)]
-
-try:
-    for base_url in tqdm(links_to_scrape, desc="Scraping Meets", unit="meet"):
-        full_url = base_url if base_url.startswith("http") else f"https://worldathletics.org{base_url}"
-        if not FORCE_RESCRAPE and full_url in processed_urls: continue
-
-        key = full_url.replace("https://worldathletics.org", "")
-        iso_date = link_to_date.get(key, "") or None
-
-        tqdm.write(f"🔄 Opening: {full_url}")
-        driver.get(full_url)
-        try: WebDriverWait(driver, 2).until(EC.element_to_be_clickable((By.ID, "CybotCookiebotDialogBodyButtonDecline"))).click()
-        except: pass
-
-        if not iso_date:
-            try: iso_date = parse_any_date_to_iso(driver.find_element(By.CLASS_NAME, "competitions-header__date").text.strip())
-            except: iso_date = datetime.now().strftime("%Y-%m-%d")
-
-        days = ["1"]
+# 🟢 TOGGLE THIS to preload every athlete before scraping (fewer reads on big backfills)
+WARM_ENTITY_CACHE = False
+# 🟢 TOGGLE THIS to write nothing to the DB while scraping: every entity/event write goes to
+# data/write_journal.jsonl instead. Apply it later with `python -m utils.write_journal replay`.
+JOURNAL_WRITES = False
+# 🟢 TOGGLE THIS to skip event/entity writes whose content is unchanged since our last write
+# (hashes in data/write_hashes.sqlite): a FORCE_RESCRAPE of unchanged meets sends nothing.
+SKIP_UNCHANGED_WRITES = True
+
+# 🟢 PIPELINE: navigate (N browsers) -> parse -> normalize -> write (one DB writer thread), with a
+# bounded queue between each stage so a slow stage holds the ones before it back.
+# Politeness cap: page loads per second across ALL workers together.
+MAX_PAGE_LOADS_PER_SECOND = 1.0
+MAX_MEET_ATTEMPTS = 3  # a meet whose browser crashes is retried on a fresh browser this many times
+# 🟢 TOGGLE THIS to fetch results pages over plain HTTP first (Chrome only when that fails)
+HTTP_FIRST = True
+# 🟢 TOGGLE THIS to keep every fetched page body in data/snapshots/ (gzip, content-addressed), so
+# a parser change can be replayed offline: `--from-snapshots` re-parses and re-ingests from disk
+SNAPSHOT_PAGES = True
+STAGE_QUEUE_SIZE = 16  # messages (meet-days) waiting between two stages
+# 🟢 TOGGLE THIS to parse in N processes: the tree build is pure Python, so in a thread it shares
+# one core with every other stage
+PARSE_PROCESSES = 0
+
+def launch_browser():
+    options = uc.ChromeOptions()
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    prefs = {"profile.managed_default_content_settings.images": 2}
+    options.add_experimental_option("prefs", prefs)
+    options.page_load_strategy = "eager"
+    # 🟢 FIX: Force version 144 to match your browser
+    return uc.Chrome(options=options, version_main=144)
+
+def load_meets(progress, since=None, until=None):
+    """
+    Returns [(full_url, iso_date or None)] from the meet catalog: meets with results that ended in
+    [since, until] (until defaults to today) and are not fully scraped yet, or changed in the
+    calendar since. None if it is empty.
+    """
+    catalog = MeetCatalog()
+    # Calendar CSVs from before the catalog (or from other machines) are merged in once
+    if catalog.import_csvs(data_dir): print(f"📂 Catalog: {catalog.summary()}")
+    if not catalog.summary():
+        print(f"⚠️ The meet catalog is empty. Run WorldAthleticsEvents.py first.")
+        catalog.close()
+        return None
+
+    meets = catalog.pending(
+        since=since, until=until or datetime.now().strftime("%Y-%m-%d"),
+        progress_path=None if FORCE_RESCRAPE else progress.path, max_attempts=MAX_MEET_ATTEMPTS
+    )
+    catalog.close()
+    # Meets the calendar sync saw change after we scraped them start over
+    rescrape = [url for url, _, again in meets if again]
+    for url in rescrape: progress.reset(url)
+    print(f"📂 {len(meets)} catalogued meets still to scrape ({len(rescrape)} changed since their scrape).")
+    return [(url, start_date or None) for url, start_date, _ in meets]
+
+class BrowserWorker(threading.Thread):
+    """
+    Navigation stage: loads meet-days (plain HTTP first, its own browser only for days HTTP can't
+    read) and passes the raw HTML on. The browser starts on first need; a crashed browser is
+    replaced and the meet retried.
+    """
+    def __init__(self, number, meet_queue, page_queue, page_limiter, stop, progress, stage, snapshots=None):
+        super().__init__(name=f"browser-{number}", daemon=True)
+        self.progress = progress
+        self.snapshots = snapshots
+        self.meet_queue = meet_queue
+        self.page_queue = page_queue
+        self.page_limiter = page_limiter
+        self.stop = stop
+        self.stage = stage
+        self.driver = None
+        self.fetcher = ResultsFetcher(page_limiter=page_limiter) if HTTP_FIRST else None
+
+    def get(self, url):
+        wait = self.page_limiter.reserve()
+        if wait: time.sleep(wait)
+        self.driver.get(url)
+
+    def restart_browser(self):
+        self.quit_browser()
+        self.driver = launch_browser()
+
+    def quit_browser(self):
+        if self.driver is None: return
+        try: self.driver.quit()
+        except Exception: pass
+        self.driver = None
+
+    def emit(self, kind, full_url, payload):
+        # Blocks while the parse stage is behind (bounded queue = backpressure)
+        self.stage.put(self.page_queue, (kind, full_url, payload))
+
+    def run(self):
         try:
-            day_select = driver.find_elements(By.CSS_SELECTOR, "select[name='day-select'] option")
-            if day_select: days = [opt.get_attribute("value") for opt in day_select if opt.get_attribute("value")]
-        except: pass
-
-        try: meet_name_text = driver.find_element(By.TAG_NAME, "h1").text.strip()
-        except: meet_name_text = "Unknown Meet"
+            while not self.stop.is_set():
+                try: full_url, iso_date, attempt = self.stage.get(self.meet_queue, timeout=1)
+                except queue.Empty: continue
+                try:
+                    self.scrape_meet(full_url, iso_date, attempt)
+                except Exception as e:
+                    # Browser crashed / hung: fresh browser, meet goes back in the queue
+                    self.quit_browser()
+                    if attempt + 1 < MAX_MEET_ATTEMPTS:
+                        tqdm.write(f"   ♻️ {self.name} restarting after error on {full_url}: {e}")
+                        # Sent before the re-queue, so the writer drops this attempt's failures first
+                        self.emit("restart", full_url, {"attempt": attempt + 1})
+                        self.meet_queue.put((full_url, iso_date, attempt + 1))
+                    else:
+                        self.emit("failed", full_url, {"error": str(e)})
+                finally:
+                    self.meet_queue.task_done()
+        finally:
+            self.quit_browser()
+            if self.fetcher: self.fetcher.close()
+
+    def scrape_meet(self, full_url, iso_date, attempt):
+        tqdm.write(f"🔄 [{self.name}] Opening: {full_url}")
+        with self.stage.work():
+            first = self.load_day(full_url, None)
+        days = meet_days(first) or ["1"]
+        # 🟢 Checkpoints: finished days are not even loaded, finished tables are not rewritten
+        done_units = self.progress.done_units(full_url)
 
         for day in days:
+            if (day, "") in done_units: continue
             if len(days) > 1 or day != "1":
-                driver.get(f"{full_url}?day={day}")
-                time.sleep(1.5)
-
+                try:
+                    with self.stage.work(): html = self.load_day(full_url, day)
+                except Exception as e:
+                    if self.driver is not None and not _browser_alive(self.driver): raise
+                    tqdm.write(f"   ⚠️ Error Day {day}: {e}")
+                    self.emit("day_failed", full_url, {"day": day, "error": str(e)})
+                    continue
+            else:
+                html = first
+            if self.snapshots: self.snapshots.put(full_url, html, day=day, meet_date=iso_date)
+            self.emit("page", full_url, {"day": day, "html": html, "iso_date": iso_date, "done_units": done_units})
+        self.emit("done", full_url, {"iso_date": iso_date, "attempt": attempt})
+
+    def load_day(self, full_url, day):
+        """Raw HTML of one meet-day: over HTTP when it carries the results, else from the browser."""
+        if self.fetcher:
+            html = self.fetcher.fetch_day_html(full_url, day)
+            if html: return html
+        return self.browser_day(full_url, day)
+
+    def browser_day(self, full_url, day):
+        if self.driver is None: self.restart_browser()
+        driver = self.driver
+        self.get(f"{full_url}?day={day}" if day else full_url)
+        if day:
+            time.sleep(1.5)
+        else:
+            try: WebDriverWait(driver, 2).until(EC.element_to_be_clickable((By.ID, "CybotCookiebotDialogBodyButtonDecline"))).click()
+            except (TimeoutException, WebDriverException):
+                # Banner already dismissed in this browser (or not shown): the page itself is fine
+                self.stage.skip("cookie banners not found")
+        # 🟢 One page_source snapshot per day, parsed by the next stage (no WebDriver call per cell)
+        return driver.page_source
+
+class SnapshotReader(threading.Thread):
+    """
+    Navigation stage for --from-snapshots: feeds the newest stored page of every meet-day into the
+    pipeline instead of fetching it. Every table is re-parsed and re-written (no checkpoint skips);
+    the write-hash sidecar still drops rows whose content did not change.
+    """
+    def __init__(self, meet_queue, page_queue, stop, stage, snapshots):
+        super().__init__(name="snapshot-reader", daemon=True)
+        self.meet_queue = meet_queue
+        self.page_queue = page_queue
+        self.stop = stop
+        self.stage = stage
+        self.snapshots = snapshots
+
+    def run(self):
+        while not self.stop.is_set():
+            try: full_url, iso_date, attempt = self.stage.get(self.meet_queue, timeout=1)
+            except queue.Empty: continue
             try:
-                results_tables = driver.find_elements(By.TAG_NAME, "table")
-                for table in results_tables:
-                    try: event_name_raw = table.find_element(By.XPATH, "./preceding::h2[1]").text.strip()
-                    except: continue
-                    if "4x" in event_name_raw.lower() or "relay" in event_name_raw.lower(): continue
-
-                    # 🟢 USE SHARED STANDARDIZATION LOGIC
-                    clean_disc_name = standardize_event_name(event_name_raw)
-                    
-                    gender = "male" if "men" in event_name_raw.lower() else "female"
-                    
-                    combined_context = None
-                    raw_lower = event_name_raw.lower()
-                    for c_type in ["Decathlon", "Heptathlon", "Pentathlon"]:
-                        if c_type.lower() in raw_lower:
-                            is_summary = (clean_disc_name == c_type) 
-                            combined_context = {'type': c_type, 'is_child': not is_summary}
-                            break
-
-                    round_label = extract_round_from_table(table)
-                    event_key = build_event_key(event_name_raw, round_label, meet_name_text)
-
-                    for row in table.find_elements(By.CSS_SELECTOR, "tbody tr"):
-                        cols = row.find_elements(By.TAG_NAME, "td")
-                        if len(cols) < 5: continue
-                        try:
-                            place = cols[0].text.strip()
-                            if place.lower() == "pos": continue
-                            name = cols[1].text.strip().split("\n")[0].strip()
-                            nationality = cols[3].text.strip()
-                            mark = cols[4].text.strip()
-
-                            entity_id = upsert_entity({
-                                "name": name, "nationality": nationality, "gender": gender, "category": "Sport"
-                            }, discipline=clean_disc_name)
-                            
-                            update_entity_details(entity_id, clean_disc_name)
-
-                            if entity_id:
-                                upsert_event(entity_id, {
-                                    "meet_name": meet_name_text, "event_name": event_name_raw,
-                                    "event_key": event_key, "date": iso_date, "status": "completed",
-                                    "result_data": {
-                                        "place": place, "mark": mark, "discipline_clean": clean_disc_name,
-                                        "round_label": round_label, "event_name_raw": event_name_raw
-                                    }
-                                }, combined_context=combined_context)
-                        except: continue
-            except Exception as e: tqdm.write(f"   ⚠️ Error Day {day}: {e}")
-
-        with open(log_file, "a") as f:
-            f.write(full_url + "\n")
-            processed_urls.add(full_url)
-
-except KeyboardInterrupt:
-    tqdm.write("\n🛑 Stopped by user.")
-except Exception as e:
-    tqdm.write(f"\n❌ Critical Error: {e}")
-finally:
+                for day, digest in self.snapshots.latest_days(full_url).items():
+                    with self.stage.work(): html = self.snapshots.read(digest)
+                    self.stage.put(self.page_queue, ("page", full_url, {
+                        "day": day, "html": html, "iso_date": iso_date, "done_units": set()
+                    }))
+                self.stage.put(self.page_queue, ("done", full_url, {"iso_date": iso_date, "attempt": attempt}))
+            except Exception as e:
+                self.stage.put(self.page_queue, ("failed", full_url, {"error": f"snapshot: {e}"}))
+            finally:
+                self.meet_queue.task_done()
+
+def _browser_alive(driver):
     try:
-        if driver.service.process: driver.quit()
-    except: pass
-    
-    run_combined_events_fix()
\ No newline at end of file
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+class StageThread(threading.Thread):
+    """
+    One pipeline stage between two bounded queues. Runs `handle(payload) -> (kind, payload)` on
+    the messages of its own `kind` and passes every other message (day_failed / restart / done /
+    failed / stop) on untouched, so each meet's messages reach the writer in the order the browser sent
+    them. `close()` runs once the stage stops.
+    """
+    def __init__(self, stage, in_queue, out_queue, kind, handle, close=None):
+        super().__init__(name=stage.name, daemon=True)
+        self.stage = stage
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.kind = kind
+        self.handle = handle
+        self.close = close or (lambda: None)
+
+    def run(self):
+        try:
+            while True:
+                kind, full_url, payload = self.stage.get(self.in_queue)
+                if kind == self.kind:
+                    try: kind, payload = self.handle(payload)
+                    except Exception as e:
+                        self.stage.skip("days failed")
+                        kind, payload = "day_failed", {"day": payload["day"], "error": f"{self.stage.name}: {e}"}
+                self.stage.put(self.out_queue, (kind, full_url, payload))
+                if kind == "stop": break
+        finally:
+            self.close()
+
+class ParseStage(StageThread):
+    """Raw HTML -> parse_meet_page() record (or the future of one, with a process pool)."""
+    def __init__(self, stage, in_queue, out_queue, processes=0):
+        super().__init__(stage, in_queue, out_queue, "page", self.parse, self.shutdown)
+        self.pool = ProcessPoolExecutor(max_workers=processes) if processes else None
+
+    def parse(self, payload):
+        html = payload.pop("html")
+        if self.pool:
+            payload["page"] = self.pool.submit(timed_call, parse_meet_page, html)
+        else:
+            with self.stage.work(): payload["page"] = parse_meet_page(html)
+        return "parsed", payload
+
+    def shutdown(self):
+        if self.pool: self.pool.shutdown()
+
+def normalize_tables(page, meet_name_text, iso_date, day, done_units):
+    """
+    The writes one parsed meet-day turns into, per results table not checkpointed yet:
+    {"event_key", "results", "entities": [entity records], "events": [(slug, event_data)], "combined_context"}.
+    """
+    tables = []
+    for table in page["tables"]:
+        event_name_raw = table["event_name_raw"]
+        if "4x" in event_name_raw.lower() or "relay" in event_name_raw.lower(): continue
+
+        # 🟢 USE SHARED STANDARDIZATION LOGIC
+        clean_disc_name = standardize_event_name(event_name_raw)
+
+        gender = "male" if "men" in event_name_raw.lower() else "female"
+
+        combined_context = None
+        raw_lower = event_name_raw.lower()
+        for c_type in ["Decathlon", "Heptathlon", "Pentathlon"]:
+            if c_type.lower() in raw_lower:
+                is_summary = (clean_disc_name == c_type)
+                combined_context = {'type': c_type, 'is_child': not is_summary}
+                break
+
+        round_label = table["round_label"]
+        event_key = build_event_key(event_name_raw, round_label, meet_name_text)
+        if (day, event_key) in done_units: continue
+
+        rows = [row for row in table["rows"] if row[1]]
+        tables.append({
+            "event_key": event_key,
+            "results": len(table["rows"]),
+            # "discipline" adds the points_/ranking_ N/A placeholders in the same entity write
+            "entities": [
+                {"name": name, "nationality": nationality, "gender": gender, "category": "Sport",
+                 "discipline": clean_disc_name}
+                for _, name, nationality, _ in rows
+            ],
+            "events": [
+                (create_slug(name, nationality), {
+                    "meet_name": meet_name_text, "event_name": event_name_raw,
+                    "event_key": event_key, "date": iso_date, "status": "completed",
+                    "result_data": {
+                        "place": place, "mark": mark, "discipline_clean": clean_disc_name,
+                        "round_label": round_label, "event_name_raw": event_name_raw
+                    }
+                })
+                for place, name, nationality, mark in rows
+            ],
+            "combined_context": combined_context,
+        })
+    return tables
+
+class NormalizeStage(StageThread):
+    """Parsed page -> the entity records and event rows the writer sends."""
+    def __init__(self, stage, in_queue, out_queue, parse_stage):
+        super().__init__(stage, in_queue, out_queue, "parsed", self.normalize)
+        self.parse_stage = parse_stage
+
+    def normalize(self, payload):
+        page = payload["page"]
+        if isinstance(page, Future):
+            page, seconds = page.result()
+            self.parse_stage.record(1, seconds)
+        with self.stage.work():
+            iso_date = payload["iso_date"] or to_iso_date(page["date_text"] or "") or datetime.now().strftime("%Y-%m-%d")
+            meet_name_text = page["meet_name"] or "Unknown Meet"
+            return "tables", {
+                "day": payload["day"], "date": iso_date,
+                "tables": normalize_tables(page, meet_name_text, iso_date, payload["day"], payload["done_units"]),
+            }
+
+def write_tables(tables, journal, stage=None):
+    """
+    Sends one day's normalized tables (runs on the writer thread only).
+    Returns {event_key: (rows written, error or None)}; rows that could not be sent are also
+    counted on `stage`.
+    """
+    outcomes = {}
+    for table in tables:
+        event_key = table["event_key"]
+        count_result_rows(table["results"])
+        if journal:
+            # Journal mode: same writes, recorded instead of sent
+            for record in table["entities"]: journal.entity(record)
+            for slug, event_data in table["events"]: journal.event(slug, event_data, table["combined_context"])
+            outcomes[event_key] = (len(table["events"]), None)
+            continue
+
+        # 🟢 One bulk entity upsert per table instead of one per row.
+        try:
+            slug_to_id = upsert_entities_bulk(table["entities"])
+        except Exception as e:
+            outcomes[event_key] = (0, e)
+            continue
+
+        written, missing, errors = 0, 0, []
+        for slug, event_data in table["events"]:
+            entity_id = slug_to_id.get(slug)
+            if not entity_id:
+                missing += 1
+                continue
+            try:
+                upsert_event(entity_id, event_data, combined_context=table["combined_context"])
+                written += 1
+            except Exception as e:
+                errors.append(e)
+        problems = []
+        if missing: problems.append(f"{missing} rows without an athlete id")
+        if errors: problems.append(f"{len(errors)} event upserts failed (first: {errors[0]})")
+        if stage is not None:
+            if missing: stage.skip("rows without an athlete id", missing)
+            if errors: stage.skip("event upserts failed", len(errors))
+        outcomes[event_key] = (written, "; ".join(problems) or None)
+    return outcomes
+
+class MeetWriter(threading.Thread):
+    """
+    Write stage, the single DB writer: drains the normalized tables into batched upserts and records
+    checkpoints. A meet with failed units goes back into the meet queue (completed units are
+    skipped there) until MAX_MEET_ATTEMPTS; `finished` is set once every meet is settled.
+    """
+    def __init__(self, write_queue, meet_queue, progress, journal, bar, total, stage):
+        super().__init__(name="db-writer")
+        self.stage = stage
+        self.write_queue = write_queue
+        self.meet_queue = meet_queue
+        self.progress = progress
+        self.journal = journal
+        self.bar = bar
+        self.remaining = total
+        self.failed_units = {}  # url -> failed units in the current attempt
+        self.dates = set()      # meet dates written this run (the combined-events linker's scope)
+        self.finished = threading.Event()
+        if not total: self.finished.set()
+
+    def run(self):
+        # 🟢 Event writes are queued and flushed in bulk (also on Ctrl+C / crash)
+        with EventBuffer() as event_buffer:
+            while True:
+                kind, full_url, payload = self.stage.get(self.write_queue)
+                if kind == "stop": break
+                # Never let one bad item kill the writer: the browsers would block on a full queue
+                try:
+                    if kind == "tables":
+                        with self.stage.work(): self.write_day(event_buffer, full_url, payload)
+                    elif kind == "day_failed": self.fail_unit(full_url, payload["day"], "", payload["error"])
+                    elif kind == "done": self.finish_meet(full_url, payload)
+                    elif kind == "restart": self.failed_units.pop(full_url, None)
+                    elif kind == "failed": self.settle(full_url, "failed", payload["error"])
+                except Exception as e:
+                    tqdm.write(f"   ⚠️ Error writing {full_url}: {e}")
+
+    def write_day(self, event_buffer, full_url, payload):
+        day = payload["day"]
+        outcomes = write_tables(payload["tables"], self.journal, self.stage)
+        if outcomes: self.dates.add(payload["date"])
+        # A table only counts as done once its events have left the buffer
+        failed_before = len(event_buffer.failed_rows)
+        event_buffer.flush()
+        for row in event_buffer.failed_rows[failed_before:]:
+            written, _ = outcomes.get(row["event_key"], (0, None))
+            outcomes[row["event_key"]] = (written, "event upsert failed")
+
+        day_ok = True
+        for event_key, (rows, error) in outcomes.items():
+            if error:
+                day_ok = False
+                self.fail_unit(full_url, day, event_key, error)
+            else:
+                self.progress.mark_unit(full_url, day, event_key, "done", rows=rows)
+        if day_ok:
+            self.progress.mark_unit(full_url, day, "", "done", rows=sum(r for r, _ in outcomes.values()))
+
+    def fail_unit(self, full_url, day, unit, error):
+        self.progress.mark_unit(full_url, day, unit, "failed", error=error)
+        self.failed_units[full_url] = self.failed_units.get(full_url, 0) + 1
+
+    def finish_meet(self, full_url, payload):
+        failures = self.failed_units.pop(full_url, 0)
+        if not failures:
+            self.settle(full_url, "done")
+            return
+        error = f"{failures} day/table units failed"
+        if payload["attempt"] + 1 < MAX_MEET_ATTEMPTS:
+            self.progress.mark_failed(full_url, error)
+            tqdm.write(f"   🔁 Re-queueing {full_url}: {error}")
+            self.meet_queue.put((full_url, payload["iso_date"], payload["attempt"] + 1))
+        else:
+            self.settle(full_url, "failed", error)
+
+    def settle(self, full_url, status, error=None):
+        self.failed_units.pop(full_url, None)
+        if status == "done":
+            self.progress.mark_done(full_url)
+        else:
+            self.progress.mark_failed(full_url, error)
+            tqdm.write(f"   ❌ Giving up on {full_url}: {error}")
+        self.bar.update(1)
+        self.remaining -= 1
+        if self.remaining <= 0: self.finished.set()
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape World Athletics meet results into the database.")
+    parser.add_argument("--workers", type=int, default=1, help="browsers scraping meets in parallel")
+    parser.add_argument("--max-page-rate", type=float, default=MAX_PAGE_LOADS_PER_SECOND,
+                        help="page loads per second across all workers (politeness cap)")
+    parser.add_argument("--parse-processes", type=int, default=PARSE_PROCESSES,
+                        help="parse pages in this many processes (0: in the parse thread)")
+    parser.add_argument("--from-snapshots", action="store_true",
+                        help="re-parse and re-ingest the stored page snapshots (no network)")
+    parser.add_argument("--since", help="first meet date of the window (YYYY-MM-DD; catalog: end date)")
+    parser.add_argument("--until", help="last meet date of the window (YYYY-MM-DD; catalog default: today)")
+    args = parser.parse_args()
+
+    journal = WriteJournal() if JOURNAL_WRITES else None
+    if SKIP_UNCHANGED_WRITES: use_write_hashes(WriteHashStore())
+    if WARM_ENTITY_CACHE and not journal: warm_entity_cache()
+
+    progress = ScrapeProgress()
+    if FORCE_RESCRAPE: progress.reset()
+
+    snapshots = SnapshotStore() if SNAPSHOT_PAGES or args.from_snapshots else None
+    if args.from_snapshots:
+        meets = snapshots.urls("https://worldathletics.org", since=args.since, until=args.until)
+        print(f"🗃️ Replaying {len(meets)} meets from {snapshots.root} (no network).")
+    else:
+        # Done meets (and ones that failed MAX_MEET_ATTEMPTS times) are left out by the catalog query
+        if not FORCE_RESCRAPE: print(f"🔄 Resuming... Progress so far: {progress.summary()}")
+        meets = load_meets(progress, args.since, args.until)
+        if meets is None: return
+
+    meet_queue = queue.Queue()
+    for full_url, iso_date in meets: meet_queue.put((full_url, iso_date, 0))
+    # Backpressure: each stage waits when the next one falls behind
+    page_queue, parsed_queue, write_queue = (queue.Queue(maxsize=STAGE_QUEUE_SIZE) for _ in range(3))
+    stop = threading.Event()
+    page_limiter = RateLimiter(args.max_page_rate)
+    bar = tqdm(total=len(meets), desc="Scraping Meets", unit="meet")
+
+    workers_count = 1 if args.from_snapshots else max(1, min(args.workers, len(meets) or 1))
+    print(f"🚀 Starting {workers_count} worker(s)...")
+    pipeline = Pipeline()
+    navigate = pipeline.stage("read" if args.from_snapshots else "navigate", workers_count, in_queue=meet_queue)
+    parse = pipeline.stage("parse", args.parse_processes or 1, in_queue=page_queue)
+    normalize = pipeline.stage("normalize", in_queue=parsed_queue)
+    write = pipeline.stage("write", in_queue=write_queue)
+
+    if args.from_snapshots:
+        workers = [SnapshotReader(meet_queue, page_queue, stop, navigate, snapshots)]
+    else:
+        workers = [
+            BrowserWorker(i + 1, meet_queue, page_queue, page_limiter, stop, progress, navigate, snapshots)
+            for i in range(workers_count)
+        ]
+    stages = [
+        ParseStage(parse, page_queue, parsed_queue, args.parse_processes),
+        NormalizeStage(normalize, parsed_queue, write_queue, parse),
+    ]
+    writer = MeetWriter(write_queue, meet_queue, progress, journal, bar, len({url for url, _ in meets}), write)
+    writer.start()
+    for t in stages + workers: t.start()
+
+    try:
+        while not writer.finished.wait(timeout=1):
+            bar.set_postfix_str(f"queues {pipeline.brief()}")
+    except KeyboardInterrupt:
+        tqdm.write("\n🛑 Stopped by user.")
+        stop.set()
+    except Exception as e:
+        tqdm.write(f"\n❌ Critical Error: {e}")
+        stop.set()
+    finally:
+        stop.set()
+        for w in workers: w.join()
+        # The stop message drains every stage behind it before the writer exits
+        page_queue.put(("stop", None, None))
+        writer.join()
+        bar.close()
+
+        if journal:
+            journal.close()
+            tqdm.write(f"📓 Journaled up to #{journal.last_seq}. Replay it, then link combined events:")
+            if writer.dates:
+                tqdm.write(f"   python audits/fix_combined_events.py --start {min(writer.dates)} --end {max(writer.dates)}")
+        else:
+            tqdm.write(f"🧠 Entity cache: {entity_cache_stats()}")
+            tqdm.write("\n🧹 Running Post-Scrape Cleanup (Linking Combined Events)...")
+            tqdm.write(f"✅ Cleanup Complete: {link_combined_events(dates=writer.dates)}")
+        tqdm.write(f"📍 Progress: {progress.summary()}")
+        if snapshots:
+            tqdm.write(f"🗃️ Snapshots: {snapshots.stats()}")
+            snapshots.close()
+        if HTTP_FIRST and not args.from_snapshots:
+            tqdm.write(f"🌐 Meet-days over HTTP: {sum(w.fetcher.stats['http'] for w in workers)}, "
+                       f"browser fallbacks: {sum(w.fetcher.stats['fallback'] for w in workers)}")
+        pipeline.print_summary(tqdm.write)
+        print_call_summary(tqdm.write)
+        tqdm.write(f"✍️ Writes: {write_stats.summary()}")
+
+if __name__ == "__main__":
+    main()
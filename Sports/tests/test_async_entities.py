@@ -0,0 +1,44 @@
+import asyncio
+
+from utils import async_db_utils, db_utils
+from utils.storage_backends import SQLiteBackend
+
+def test_only_one_chunk_claims_a_shared_unk_row(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "db.sqlite"), storage_dir=str(tmp_path / "storage"))
+    db_utils.use_backend(backend)
+    try:
+        backend.table("entities").insert({"slug": "sam-kendricks-unk", "name": "Sam Kendricks", "category": "Sport",
+                                          "subcategory": "Athletics", "gender": "male", "details": {}}).execute()
+        records = [{"name": "Sam Kendricks", "nationality": "USA"}, {"name": "Other Athlete", "nationality": "USA"},
+                   {"name": "Sam Kendricks", "nationality": "CAN"}]
+
+        slug_to_id = asyncio.run(async_db_utils.aupsert_entities_bulk(records, chunk_size=1))
+
+        rows = {r["slug"]: r for r in backend.table("entities").select("*").execute().data}
+        assert "sam-kendricks-unk" not in rows
+        assert rows["sam-kendricks-usa"]["nationality"] == "USA"
+        assert rows["sam-kendricks-can"]["id"] != rows["sam-kendricks-usa"]["id"]
+        assert slug_to_id["sam-kendricks-can"] == rows["sam-kendricks-can"]["id"]
+        assert len(rows) == 3
+    finally:
+        db_utils.use_backend(None)
+
+def test_each_event_loop_gets_its_own_client_and_locks(tmp_path):
+    first = SQLiteBackend(str(tmp_path / "first.sqlite"), storage_dir=str(tmp_path / "storage"))
+    second = SQLiteBackend(str(tmp_path / "second.sqlite"), storage_dir=str(tmp_path / "storage"))
+
+    async def two_pages(names):
+        # Concurrent calls contend for the entity lock and the request semaphore
+        return await asyncio.gather(*(async_db_utils.aupsert_entities_bulk([{"name": n, "nationality": "USA"}])
+                                      for n in names))
+    try:
+        db_utils.use_backend(first)
+        asyncio.run(two_pages(["Noah Lyles", "Fred Kerley"]))
+        db_utils.use_backend(second)
+        asyncio.run(two_pages(["Kenny Bednarek", "Erriyon Knighton"]))
+    finally:
+        db_utils.use_backend(None)
+
+    slugs = lambda backend: {r["slug"] for r in backend.table("entities").select("slug").execute().data}
+    assert slugs(first) == {"noah-lyles-usa", "fred-kerley-usa"}
+    assert slugs(second) == {"kenny-bednarek-usa", "erriyon-knighton-usa"}
@@ -0,0 +1,64 @@
+import threading
+import time
+
+from utils import db_utils
+from utils.db_utils import CircuitBreaker
+
+COOLDOWN = 0.2
+
+def tripped():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=COOLDOWN)
+    breaker.record_failure()
+    assert breaker.acquire() == 0.0
+    breaker.record_failure()
+    return breaker
+
+def test_waits_out_the_cooldown():
+    breaker = tripped()
+    assert 0 < breaker.acquire() <= COOLDOWN
+    assert breaker.trips == 1
+
+def test_half_open_lets_exactly_one_probe_through():
+    breaker = tripped()
+    time.sleep(COOLDOWN)
+    assert breaker.acquire() == 0.0
+    assert breaker.acquire() == breaker.PROBE_POLL_SECONDS
+    assert breaker.acquire() == breaker.PROBE_POLL_SECONDS
+
+def test_probe_success_closes_the_breaker():
+    breaker = tripped()
+    time.sleep(COOLDOWN)
+    breaker.acquire()
+    breaker.record_success()
+    assert [breaker.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+def test_probe_failure_reopens_for_another_cooldown():
+    breaker = tripped()
+    time.sleep(COOLDOWN)
+    breaker.acquire()
+    breaker.record_failure()
+    assert breaker.trips == 2
+    assert 0 < breaker.acquire() <= COOLDOWN
+
+def test_only_the_probe_reaches_the_backend(monkeypatch):
+    breaker = tripped()
+    monkeypatch.setattr(db_utils, "circuit_breaker", breaker)
+    time.sleep(COOLDOWN)
+
+    in_flight, peak, lock = [0], [0], threading.Lock()
+    def call():
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.3)
+        with lock: in_flight[0] -= 1
+        return "ok"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(db_utils.execute_request(call))) for _ in range(5)]
+    for t in threads: t.start()
+    time.sleep(0.15)
+    assert peak[0] == 1  # the rest wait for the probe
+    for t in threads: t.join()
+    assert results == ["ok"] * 5
+    assert breaker.opened_at is None
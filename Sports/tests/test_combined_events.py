@@ -0,0 +1,27 @@
+import pytest
+
+from utils.combined_events import SUB_EVENT_WHITELIST, _is_sub_event
+from utils.event_names import standardize_event_name
+
+# Discipline labels as the results pages and slugs spell them
+DISCIPLINES = {
+    "Decathlon": ["100 Metres", "Long Jump", "Shot Put", "High Jump", "400 Metres", "110 Metres Hurdles",
+                  "Discus Throw", "Pole Vault", "Javelin Throw", "1500 Metres",
+                  "100m", "long-jump", "sp", "hj", "400m", "110m hurdles", "dt", "pv", "jt", "1500m"],
+    "Heptathlon": ["100 Metres Hurdles", "High Jump", "Shot Put", "200 Metres", "Long Jump", "Javelin Throw", "800 Metres",
+                   "100m hurdles", "hj", "sp", "200m", "lj", "jt", "800m"],
+    "Pentathlon": ["60 Metres Hurdles", "High Jump", "Shot Put", "Long Jump", "800 Metres",
+                   "60m hurdles", "hj", "sp", "lj", "800m"],
+}
+
+def child(discipline):
+    return {"event_key": "weltklasse-zurich|2025-08-28", "result": {"discipline_clean": discipline}}
+
+@pytest.mark.parametrize("c_type,raw", [(t, raw) for t, names in DISCIPLINES.items() for raw in names])
+def test_whitelist_covers_every_normalized_discipline(c_type, raw):
+    assert _is_sub_event(child(standardize_event_name(raw)), c_type)
+
+@pytest.mark.parametrize("c_type", list(SUB_EVENT_WHITELIST))
+def test_unrelated_events_are_not_linked(c_type):
+    for raw in ("3000m Steeplechase", "Triple Jump", "Hammer Throw", "20km Walk"):
+        assert not _is_sub_event(child(standardize_event_name(raw)), c_type)
@@ -0,0 +1,80 @@
+import pytest
+
+from utils import db_utils
+from utils.db_utils import EventBuffer, use_backend, use_write_hashes
+from utils.write_hashes import WriteHashStore
+
+class RejectedRow(Exception):
+    """Stands in for a PostgREST 400 (e.g. a check constraint violation): not retryable."""
+    code = "23514"
+
+class Unavailable(Exception):
+    status_code = 503
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+class _Upsert:
+    def __init__(self, backend, rows):
+        self.backend, self.rows = backend, rows
+
+    def execute(self):
+        self.backend.calls.append(len(self.rows))
+        if self.backend.down: raise Unavailable("service unavailable")
+        if any(row["event_key"] in self.backend.bad_keys for row in self.rows): raise RejectedRow("check constraint")
+        return _Response([dict(row, id=i) for i, row in enumerate(self.rows, 1)])
+
+class _Table:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def upsert(self, rows, on_conflict=""):
+        return _Upsert(self.backend, rows)
+
+class FakeBackend:
+    def __init__(self, bad_keys=(), down=False):
+        self.bad_keys, self.down, self.calls = set(bad_keys), down, []
+
+    def table(self, name):
+        return _Table(self)
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_utils, "RETRY_ATTEMPTS", 3)
+    monkeypatch.setattr(db_utils, "_backoff_seconds", lambda exc, attempt: 0)
+    monkeypatch.setattr(db_utils.circuit_breaker, "failure_threshold", 10 ** 6)
+    def make(**kwargs):
+        fake = FakeBackend(**kwargs)
+        use_backend(fake)
+        use_write_hashes(WriteHashStore(str(tmp_path / "hashes.sqlite")))
+        return fake
+    yield make
+    use_backend(None)
+    db_utils.circuit_breaker.record_success()
+
+def rows(n):
+    return [{"entity_id": 1, "event_key": f"k{i}", "title": "100m", "details": {}} for i in range(n)]
+
+def test_rejected_rows_are_bisected_without_extra_retries(backend):
+    fake = backend(bad_keys={"k5"})
+    buffer = EventBuffer(chunk_size=8, flush_interval=0)
+    for row in rows(8): buffer.add(row)
+    buffer.flush()
+
+    # 8 -> [k0-k3] + [k4-k7] -> [k4 k5] -> k4 + k5, then [k6 k7]: one request per split, none repeated
+    assert fake.calls == [8, 4, 4, 2, 1, 1, 2]
+    assert [r["event_key"] for r in buffer.failed_rows] == ["k5"]
+    assert buffer.stats["written"] == 7
+    assert buffer._hashes == {}
+
+def test_unavailable_backend_fails_the_chunk_without_bisecting(backend):
+    fake = backend(down=True)
+    buffer = EventBuffer(chunk_size=4, flush_interval=0)
+    for row in rows(4): buffer.add(row)
+    buffer.flush()
+
+    # Only execute_request's own retries, then the chunk is given up as a whole
+    assert fake.calls == [4, 4, 4]
+    assert len(buffer.failed_rows) == 4
+    assert buffer._hashes == {}
@@ -0,0 +1,57 @@
+from utils.meet_catalog import MeetCatalog
+from utils.scrape_progress import ScrapeProgress
+
+URL = "https://worldathletics.org/competition/calendar-results/results/1"
+
+def meet(**overrides):
+    return {"result_url": URL, "name": "Meet", "raw_date": "01 JAN 2025", "start_date": "2025-01-01",
+            "end_date": "2025-01-01", "venue": "Venue", "country": "X", "discipline": "Track and Field",
+            "group": "G", **overrides}
+
+def setup(tmp_path):
+    catalog = MeetCatalog(str(tmp_path / "catalog.sqlite"))
+    progress = ScrapeProgress(str(tmp_path / "progress.sqlite"), legacy_log=None)
+    catalog.sync([meet()], [("2025-01-01", "2025-01-31")])
+    return catalog, progress
+
+def reset_flagged(progress, pending):
+    # Same rule as load_meets() in scrapers/WorldAthleticsResults.py
+    for url, _, rescrape in pending:
+        if rescrape: progress.reset(url)
+
+def test_failed_unchanged_meet_keeps_units_and_attempts(tmp_path):
+    catalog, progress = setup(tmp_path)
+    progress.mark_unit(URL, "1", "", "done", rows=12)
+    progress.mark_failed(URL, "day 2 timed out")
+    progress._conn.execute("UPDATE meets SET updated_at = '2999-01-01T00:00:00+00:00'")
+
+    pending = catalog.pending(progress_path=progress.path, max_attempts=3)
+    assert pending == [(URL, "2025-01-01", 0)]
+    reset_flagged(progress, pending)
+    assert progress.done_units(URL) == {("1", "")}
+    assert progress.meet_states()[URL] == ("failed", 1)
+
+def test_meet_changed_after_its_scrape_is_flagged(tmp_path):
+    catalog, progress = setup(tmp_path)
+    progress.mark_unit(URL, "1", "", "done", rows=12)
+    progress.mark_done(URL)
+    progress._conn.execute("UPDATE meets SET updated_at = '2000-01-01T00:00:00+00:00'")
+
+    changes = catalog.sync([meet(end_date="2025-01-02")], [("2025-01-01", "2025-01-31")])
+    assert [(c[0], c[2]) for c in changes] == [("changed", ["end_date"])]
+    pending = catalog.pending(progress_path=progress.path, max_attempts=3)
+    assert pending == [(URL, "2025-01-01", 1)]
+    reset_flagged(progress, pending)
+    assert progress.done_units(URL) == set()
+
+def test_done_unchanged_meet_is_not_pending(tmp_path):
+    catalog, progress = setup(tmp_path)
+    progress.mark_done(URL)
+    progress._conn.execute("UPDATE meets SET updated_at = '2999-01-01T00:00:00+00:00'")
+    assert catalog.pending(progress_path=progress.path) == []
+
+def test_exhausted_meet_is_not_pending(tmp_path):
+    catalog, progress = setup(tmp_path)
+    for _ in range(3): progress.mark_failed(URL, "boom")
+    progress._conn.execute("UPDATE meets SET updated_at = '2999-01-01T00:00:00+00:00'")
+    assert catalog.pending(progress_path=progress.path, max_attempts=3) == []
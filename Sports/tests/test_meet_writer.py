@@ -0,0 +1,53 @@
+import queue
+
+import pytest
+
+from utils.pipeline import StageStats
+
+results = pytest.importorskip("scrapers.WorldAthleticsResults")
+
+URL = "https://worldathletics.org/competition/calendar-results/results/7190000"
+
+class FakeProgress:
+    def __init__(self):
+        self.calls = []
+
+    def mark_unit(self, url, day, unit, status, **kwargs):
+        self.calls.append(("unit", day, unit, status))
+
+    def mark_done(self, url):
+        self.calls.append(("done", url))
+
+    def mark_failed(self, url, error):
+        self.calls.append(("failed", url, error))
+
+class FakeBar:
+    def update(self, n):
+        pass
+
+def run_writer(messages):
+    write_queue, meet_queue, progress = queue.Queue(), queue.Queue(), FakeProgress()
+    writer = results.MeetWriter(write_queue, meet_queue, progress, None, FakeBar(), 1, StageStats("write"))
+    for message in messages + [("stop", None, None)]:
+        write_queue.put(message)
+    writer.run()
+    return writer, meet_queue, progress
+
+def test_clean_retry_after_a_crash_settles_the_meet():
+    writer, meet_queue, progress = run_writer([
+        ("day_failed", URL, {"day": "1", "error": "timeout"}),   # attempt 0, then the browser crashed
+        ("restart", URL, {"attempt": 1}),
+        ("done", URL, {"iso_date": "2025-08-28", "attempt": 1}),  # the retry wrote everything
+    ])
+    assert meet_queue.empty()
+    assert progress.calls[-1] == ("done", URL)
+    assert writer.finished.is_set() and not writer.failed_units
+
+def test_failures_of_the_current_attempt_still_requeue():
+    writer, meet_queue, progress = run_writer([
+        ("restart", URL, {"attempt": 1}),
+        ("day_failed", URL, {"day": "2", "error": "timeout"}),
+        ("done", URL, {"iso_date": "2025-08-28", "attempt": 1}),
+    ])
+    assert meet_queue.get_nowait() == (URL, "2025-08-28", 2)
+    assert not writer.finished.is_set()
@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from utils import async_db_utils, db_utils
+from utils.db_utils import ParentEventResolver, _parent_event_key
+from utils.storage_backends import SQLiteBackend, SQLiteQuery
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_placeholder_never_overwrites_a_card_written_after_the_select(tmp_path, monkeypatch, mode):
+    backend = SQLiteBackend(str(tmp_path / "db.sqlite"), storage_dir=str(tmp_path / "storage"))
+    db_utils.use_backend(backend)
+    db_utils.parent_resolver.clear()
+    try:
+        entity_id = backend.table("entities").insert({"slug": "kevin-mayer-fra", "name": "Kevin Mayer", "category": "Sport",
+                                                      "subcategory": "Athletics", "gender": "male"}).execute().data[0]["id"]
+        key = _parent_event_key("Decathlon", "Weltklasse Zürich")
+        upsert = SQLiteQuery.upsert
+
+        def racing_upsert(query, *args, **kwargs):
+            # Another writer stores the real summary card between our lookup and our upsert
+            monkeypatch.setattr(SQLiteQuery, "upsert", upsert)
+            backend.table("events").insert({"entity_id": entity_id, "event_key": key, "title": "Decathlon",
+                                            "is_parent": True, "result": {"points": 8512}}).execute()
+            return upsert(query, *args, **kwargs)
+        monkeypatch.setattr(SQLiteQuery, "upsert", racing_upsert)
+
+        request = (entity_id, "Weltklasse Zürich", "2025-08-28", "Decathlon")
+        if mode == "sync": resolved = ParentEventResolver().resolve_many([request]).get((entity_id, key))
+        else: resolved = asyncio.run(async_db_utils._aresolve_parent(*request))
+
+        rows = backend.table("events").select("*").execute().data
+        assert len(rows) == 1 and rows[0]["result"] == {"points": 8512}
+        assert resolved == rows[0]["id"]
+    finally:
+        db_utils.parent_resolver.clear()
+        db_utils.use_backend(None)
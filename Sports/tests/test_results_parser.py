@@ -0,0 +1,71 @@
+import os
+import re
+
+import pytest
+
+from utils.results_parser import parse_results_page, parse_meet_page, meet_days, has_results, extract_next_data
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+EXPECTED_TABLES = [
+    {"event_name_raw": "Men's 100 Metres", "round_label": "Final", "rows": [
+        ("1", "Noah LYLES", "USA", "9.81"),
+        ("2", "Kishane THOMPSON", "JAM", "9.85 SB"),
+        ("3", "Letsile TEBOGO", "BOT", "9.92"),
+        ("DNF", "Ferdinand OMANYALA", "KEN", ""),
+    ]},
+    {"event_name_raw": "Women's 400 Metres Hurdles", "round_label": "Heat 1", "rows": [
+        ("1", "Femke BOL", "NED", "52.11 MR"),
+        ("2", "Dalilah MUHAMMAD", "USA", "53.60"),
+    ]},
+    {"event_name_raw": "Women's 400 Metres Hurdles", "round_label": "Heat 2", "rows": [
+        ("1", "Sydney MCLAUGHLIN-LEVRONE", "USA", "52.46"),
+        ("2", "Anna COCKRELL", "USA", "53.01 PB"),
+    ]},
+    # Meta span not next to the table wrapper: found through the enclosing section
+    {"event_name_raw": "Men's Decathlon", "round_label": "Final", "rows": [
+        ("1", "Leo NEUGEBAUER", "GER", "8961"),
+        ("2", "Damian WARNER", "CAN", "8804"),
+    ]},
+]
+
+def test_saved_page_tables():
+    assert parse_results_page(fixture("results_day.html")) == EXPECTED_TABLES
+
+def test_saved_page_header():
+    page = parse_meet_page(fixture("results_day.html"))
+    assert page["meet_name"] == "Weltklasse Zürich"
+    assert page["date_text"] == "27 - 28 AUG 2025"
+    assert page["days"] == ["1", "2"]
+    assert page["tables"] == EXPECTED_TABLES
+
+def test_next_data_page_gives_the_same_records():
+    # The embedded payload labels differ from the rendered text ("Final A", "HEAT 2", ...)
+    plain, embedded = fixture("results_day.html"), fixture("results_day_next_data.html")
+    assert extract_next_data(embedded) is not None
+    assert parse_meet_page(embedded) == parse_meet_page(plain)
+    assert meet_days(embedded) == meet_days(plain) == ["1", "2"]
+    assert has_results(embedded) and has_results(plain)
+
+def test_next_data_page_gives_the_same_event_keys():
+    results = pytest.importorskip("scrapers.WorldAthleticsResults")
+    def keys(html):
+        page = parse_meet_page(html)
+        return [results.build_event_key(t["event_name_raw"], t["round_label"], page["meet_name"]) for t in page["tables"]]
+    assert keys(fixture("results_day_next_data.html")) == keys(fixture("results_day.html"))
+
+def test_page_with_only_embedded_rows_goes_to_the_browser():
+    html = re.sub(r"<main>.*</main>", "<main></main>", fixture("results_day_next_data.html"), flags=re.S)
+    assert not has_results(html)
+    assert parse_meet_page(html)["tables"] == []
+
+def test_payload_only_fills_missing_header_fields():
+    html = re.sub(r"<h1.*?</h1>|<select.*?</select>", "", fixture("results_day_next_data.html"), flags=re.S)
+    page = parse_meet_page(html)
+    assert (page["meet_name"], page["days"]) == ("Weltklasse Zurich", ["1", "2"])
+    assert meet_days(html) == ["1", "2"]
+    assert page["tables"] == parse_meet_page(fixture("results_day.html"))["tables"]
@@ -0,0 +1,72 @@
+from utils.storage_backends import SQLiteBackend, sync_to_remote
+
+def backend(tmp_path, name):
+    return SQLiteBackend(str(tmp_path / f"{name}.sqlite"), storage_dir=str(tmp_path / f"{name}_storage"))
+
+def entity(slug, **fields):
+    return {"slug": slug, "name": slug, "category": "Sport", "subcategory": "Athletics", "nationality": "USA",
+            "gender": "male", **fields}
+
+def test_sync_merges_into_existing_remote_entities(tmp_path):
+    local, remote = backend(tmp_path, "local"), backend(tmp_path, "remote")
+    remote.table("entities").insert(entity(
+        "grant-holloway-usa", details={"points_110mh": 1463, "ranking_110mh": 1, "club": "Florida"},
+        date_of_birth="1997-11-19", name_audited=True, image_source="wiki"
+    )).execute()
+    local.table("entities").insert([
+        entity("grant-holloway-usa", details={"points_110mh": "N/A", "ranking_110mh": "N/A",
+                                              "points_60mh": "N/A", "ranking_60mh": 3}),
+        entity("new-athlete-usa", details={"points_100m": "N/A"}),
+    ]).execute()
+
+    stats = sync_to_remote(local, remote)
+    assert stats["entities"] == 2
+
+    rows = {r["slug"]: r for r in remote.table("entities").select("*").execute().data}
+    merged = rows["grant-holloway-usa"]
+    assert merged["details"] == {"points_110mh": 1463, "ranking_110mh": 1, "club": "Florida",
+                                 "points_60mh": "N/A", "ranking_60mh": 3}
+    assert merged["date_of_birth"] == "1997-11-19"
+    assert merged["name_audited"] and merged["image_source"] == "wiki"
+    assert rows["new-athlete-usa"]["details"] == {"points_100m": "N/A"}
+
+def test_sync_maps_events_onto_remote_entity_ids(tmp_path):
+    local, remote = backend(tmp_path, "local"), backend(tmp_path, "remote")
+    remote.table("entities").insert(entity("other-usa")).execute()
+    remote.table("entities").insert(entity("grant-holloway-usa")).execute()
+    local_id = local.table("entities").insert(entity("grant-holloway-usa")).execute().data[0]["id"]
+    local.table("events").insert({"entity_id": local_id, "event_key": "k", "title": "110mH"}).execute()
+
+    sync_to_remote(local, remote)
+    remote_id = remote.table("entities").select("id").eq("slug", "grant-holloway-usa").execute().data[0]["id"]
+    assert [e["entity_id"] for e in remote.table("events").select("*").execute().data] == [remote_id]
+
+def test_sync_never_changes_remote_gender_or_dob(tmp_path):
+    local, remote = backend(tmp_path, "local"), backend(tmp_path, "remote")
+    remote.table("entities").insert(entity("mondo-duplantis-swe", gender="female", date_of_birth="1990-01-01",
+                                           nationality=None, details={})).execute()
+    local.table("entities").insert(entity("mondo-duplantis-swe", gender="male", date_of_birth="1991-02-02",
+                                          nationality="SWE", details={})).execute()
+
+    sync_to_remote(local, remote)
+
+    row = remote.table("entities").select("*").eq("slug", "mondo-duplantis-swe").execute().data[0]
+    assert row["gender"] == "female" and row["date_of_birth"] == "1990-01-01"
+    assert row["nationality"] == "SWE"
+
+def test_sync_keeps_remote_parent_links_of_unlinked_local_children(tmp_path):
+    local, remote = backend(tmp_path, "local"), backend(tmp_path, "remote")
+    remote_entity = remote.table("entities").insert(entity("kevin-mayer-fra")).execute().data[0]["id"]
+    parent = remote.table("events").insert({"entity_id": remote_entity, "event_key": "dec", "title": "Decathlon",
+                                            "is_parent": True}).execute().data[0]["id"]
+    remote.table("events").insert({"entity_id": remote_entity, "event_key": "lj", "title": "Long Jump",
+                                   "parent_event_id": parent}).execute()
+    local_entity = local.table("entities").insert(entity("kevin-mayer-fra")).execute().data[0]["id"]
+    local.table("events").insert([{"entity_id": local_entity, "event_key": "lj", "title": "Long Jump"},
+                                  {"entity_id": local_entity, "event_key": "hj", "title": "High Jump"}]).execute()
+
+    sync_to_remote(local, remote)
+
+    rows = {r["event_key"]: r for r in remote.table("events").select("*").execute().data}
+    assert rows["lj"]["parent_event_id"] == parent
+    assert rows["hj"]["parent_event_id"] is None
@@ -0,0 +1,29 @@
+import pytest
+
+from utils import db_utils
+from utils.identity_index import IdentityIndex
+from utils.storage_backends import BackendError, SQLiteBackend
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "db.sqlite"), storage_dir=str(tmp_path / "storage"))
+    db_utils.use_backend(backend)
+    db_utils.attach_identity_index(IdentityIndex())  # empty: rules every athlete out
+    yield backend
+    db_utils.use_backend(None)
+
+def test_stale_index_falls_back_to_the_existing_row(backend):
+    existing = backend.table("entities").insert({"slug": "faith-kipyegon-ken", "name": "Faith Kipyegon", "category": "Sport",
+                                                 "subcategory": "Athletics", "nationality": "KEN", "gender": "female",
+                                                 "details": {}}).execute().data[0]["id"]
+    assert db_utils.upsert_entity({"name": "Faith Kipyegon", "nationality": "KEN", "gender": "female"}) == existing
+
+def test_other_insert_errors_are_not_swallowed(backend, monkeypatch):
+    calls = []
+    def unavailable(record):
+        calls.append(record["target_slug"])
+        raise BackendError("database is locked", code="PGRST000")
+    monkeypatch.setattr(db_utils, "_insert_entity", unavailable)
+    with pytest.raises(BackendError):
+        db_utils.upsert_entity({"name": "Faith Kipyegon", "nationality": "KEN", "gender": "female"})
+    assert calls == ["faith-kipyegon-ken"]  # no lookups and second insert behind a real failure
@@ -0,0 +1,250 @@
+import asyncio
+import threading
+import weakref
+
+from utils import db_utils
+from utils.db_utils import (
+    aexecute_request, QueryTagger, unwrap_query, tracked_operation, db_operation,
+    ENTITY_BULK_CHUNK, ENTITY_COLUMNS, entity_cache, parent_resolver,
+    create_slug, build_event_payload, _parent_event_key, _remember_parent_rows,
+    _collapse_entity_records, _cached_entity_rows, _plan_entity_writes,
+    _entity_update_rows, _cache_entity_writes, _athlete_image_payload,
+    _skip_unchanged_entities, _count_entity_writes, _unchanged_event, _event_hash, _count_event_writes, write_stats
+)
+
+# --- 1. ASYNC CLIENT & CONCURRENCY LIMIT ---
+# Max PostgREST requests in flight at once (per event loop)
+MAX_CONCURRENCY = 8
+
+class _LoopState:
+    """The AsyncClient and asyncio locks of one event loop (neither can be used from another loop)."""
+    def __init__(self):
+        self.client = None
+        self.backend = None  # the db_utils client `client` was built for
+        self.client_lock = asyncio.Lock()
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        self.entity_lock = asyncio.Lock()
+
+# A loop's state goes away with the loop (asyncio.run per call, test loops, db_runner's loop)
+_loop_states = weakref.WeakKeyDictionary()
+
+def _state():
+    loop = asyncio.get_running_loop()
+    state = _loop_states.get(loop)
+    if state is None: state = _loop_states[loop] = _LoopState()
+    return state
+
+async def get_async_client():
+    """
+    Lazily builds one AsyncClient (pooled httpx connections) for the running loop,
+    rebuilt when db_utils.use_backend() switches the backend.
+    """
+    state = _state()
+    async with state.client_lock:
+        backend = db_utils.get_client()
+        if state.client is None or state.backend is not backend:
+            state.client = None
+            if db_utils.client_is_local():
+                from utils.storage_backends import AsyncBackendAdapter
+                state.client = AsyncBackendAdapter(backend.client)
+            else:
+                if db_utils.OFFLINE_MODE:
+                    raise RuntimeError("db_utils is in offline mode: no database client is available.")
+                from supabase import acreate_client
+                state.client = await acreate_client(*db_utils.get_credentials())
+            state.backend = backend
+    return state.client
+
+async def run_query(build):
+    """
+    Executes one request under the concurrency limit and the shared retry / breaker / rate policy.
+    `build` receives the AsyncClient and returns a query builder, e.g.
+        await run_query(lambda db: db.table("events").select("id").eq("entity_id", 5))
+    """
+    client = await get_async_client()
+    query, tag = unwrap_query(build(QueryTagger(client)))
+    async with _state().semaphore:
+        return await aexecute_request(query.execute, tag=tag)
+
+# --- 2. PAGINATION HELPERS ---
+
+async def aiter_rows(table, columns="*", page_size=1000, order="id", apply=None):
+    """Async twin of db_utils.iter_rows."""
+    start = 0
+    while True:
+        def page(db, start=start):
+            query = db.table(table).select(columns)
+            if apply: query = apply(query)
+            return query.order(order).range(start, start + page_size - 1)
+        with db_operation(db_utils._operation.get() or "aiter_rows"):
+            rows = (await run_query(page)).data or []
+        for row in rows:
+            yield row
+        if len(rows) < page_size: break
+        start += page_size
+
+async def afetch_all_rows(table, columns="*", page_size=1000, order="id", apply=None):
+    return [row async for row in aiter_rows(table, columns, page_size, order, apply)]
+
+# --- 3. ENTITIES ---
+
+@tracked_operation()
+async def aupsert_entities_bulk(records, chunk_size=ENTITY_BULK_CHUNK):
+    """
+    Async twin of db_utils.upsert_entities_bulk.
+    Chunks of one call run concurrently (a slug, or an '-unk' row two athletes could claim, only
+    appears in one chunk), but separate calls take turns: two pages inserting the same new athlete
+    at once would overwrite each other's details.
+    """
+    pending, slug_to_id = _skip_unchanged_entities(_collapse_entity_records(records))
+    chunks = _chunk_by_fallback(pending, chunk_size)
+    async with _state().entity_lock:
+        for part in await asyncio.gather(*(_aupsert_entity_chunk(c) for c in chunks)):
+            slug_to_id.update(part)
+    return slug_to_id
+
+def _chunk_by_fallback(records, chunk_size):
+    """
+    Splits records into chunks of about chunk_size, keeping every record that touches the same
+    '-unk' row in one chunk, where _plan_entity_writes lets only the first of them rename it.
+    """
+    groups = {}
+    for record in records:
+        groups.setdefault(record["fallback_slug"], []).append(record)
+    chunks, current = [], []
+    for group in groups.values():
+        if current and len(current) + len(group) > chunk_size:
+            chunks.append(current)
+            current = []
+        current += group
+    if current: chunks.append(current)
+    return chunks
+
+async def _aupsert_entity_chunk(chunk):
+    by_slug, lookup = _cached_entity_rows(chunk)
+    if lookup:
+        try:
+            res = await run_query(lambda db: db.table("entities").select(ENTITY_COLUMNS).in_("slug", list(lookup)))
+        except Exception as e:
+            print(f"Error querying Supabase: {e}")
+            return {}
+        for row in res.data or []:
+            by_slug[row["slug"]] = row
+            entity_cache.put(row)
+
+    updates, inserts, slug_to_id = _plan_entity_writes(chunk, by_slug)
+    try:
+        if updates:
+            await run_query(lambda db: db.table("entities").upsert(_entity_update_rows(updates), on_conflict="id"))
+        inserted = []
+        if inserts:
+            inserted = (await run_query(lambda db: db.table("entities").upsert(inserts, on_conflict="slug"))).data
+        _cache_entity_writes(updates, inserted, slug_to_id)
+        _count_entity_writes(chunk, updates, inserted, slug_to_id)
+    except Exception as e:
+        print(f"Error bulk upserting entities: {e}")
+    return slug_to_id
+
+@tracked_operation()
+async def aupsert_entity(data_or_name, nationality=None, discipline=None):
+    """
+    Async twin of db_utils.upsert_entity.
+    Runs as a one-record bulk upsert: target and '-unk' slugs are looked up in a single query.
+    """
+    if not isinstance(data_or_name, dict):
+        data_or_name = {"name": data_or_name, "nationality": nationality}
+    if discipline: data_or_name = {**data_or_name, "discipline": data_or_name.get("discipline") or discipline}
+    slug_to_id = await aupsert_entities_bulk([data_or_name])
+    return slug_to_id.get(create_slug(data_or_name.get("name"), data_or_name.get("nationality")))
+
+# --- 4. EVENTS & IMAGES ---
+
+async def _aresolve_parent(entity_id, meet_name, date_iso, combined_type):
+    key = (entity_id, _parent_event_key(combined_type, meet_name))
+    resolved, missing = parent_resolver.split([(entity_id, meet_name, date_iso, combined_type)])
+    existing = lambda db: db.table("events").select("id, entity_id, event_key").eq("entity_id", entity_id).eq("event_key", key[1])
+    if missing:
+        parent_resolver.absorb((await run_query(existing)).data, missing, resolved)
+    if missing:
+        # Never overwrite a card written since the select: a skipped duplicate is looked up again
+        ins = await run_query(lambda db: db.table("events").upsert(
+            list(missing.values()), on_conflict="entity_id,event_key", ignore_duplicates=True))
+        parent_resolver.absorb(ins.data, missing, resolved)
+    if missing:
+        parent_resolver.absorb((await run_query(existing)).data, missing, resolved)
+    return resolved.get(key)
+
+@tracked_operation()
+async def aupsert_event(entity_id, event_data, combined_context=None):
+    """Async twin of db_utils.upsert_event."""
+    payload = build_event_payload(entity_id, event_data, combined_context, defer_parent=True)
+    if _unchanged_event(payload):
+        write_stats.add("events", "skipped")
+        return
+    try:
+        content = dict(payload)
+        if "_parent" in payload:
+            payload["parent_event_id"] = await _aresolve_parent(*payload.pop("_parent"))
+        res = await run_query(lambda db: db.table("events").upsert(payload, on_conflict="entity_id,event_key"))
+        _remember_parent_rows(res.data)
+        _count_event_writes([{**payload, "_hash": _event_hash(content)}])
+    except Exception as e:
+        print(f"Error upserting event: {e}")
+
+@tracked_operation()
+async def aupsert_athlete_image(entity_id, public_url):
+    try:
+        await run_query(lambda db: db.table("entity_images").upsert(
+            _athlete_image_payload(entity_id, public_url), on_conflict="entity_id"))
+    except Exception as e:
+        print(f"   ❌ Database update failed: {e}")
+
+# --- 5. SYNC BRIDGE ---
+
+class AsyncDBRunner:
+    """
+    Runs the coroutines above on a background event loop so sync scripts never block on the DB:
+
+        future = db_runner.submit(aupsert_entities_bulk(rows))   # returns immediately
+        ...                                                      # next page load overlaps the write
+        db_runner.drain()                                        # wait before exiting
+    """
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._futures = set()
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+                self._thread.start()
+
+    def submit(self, coro):
+        """Schedules a coroutine; returns a concurrent.futures.Future."""
+        self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        with self._lock: self._futures.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future):
+        with self._lock: self._futures.discard(future)
+
+    def drain(self, timeout=None):
+        """Blocks until every submitted coroutine has finished."""
+        with self._lock: pending = list(self._futures)
+        for future in pending:
+            try: future.result(timeout=timeout)
+            except Exception as e: print(f"Error in background DB write: {e}")
+
+    def close(self):
+        self.drain()
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+db_runner = AsyncDBRunner()
@@ -0,0 +1,231 @@
+from datetime import date, datetime, timedelta
+
+from utils.db_utils import supabase, iter_rows, parent_resolver, tracked_operation, db_operation, forget_event_writes
+
+# ==========================================
+# 🏅 COMBINED-EVENTS LINKER
+# ==========================================
+# Groups Decathlon / Heptathlon / Pentathlon results under one summary ("parent") card per
+# athlete and meet. Works on a set of meet dates (the ones a scrape just touched) or an explicit
+# date window, never on the whole table:
+#   1. the events in the window (+ the multi-day tail) are read in paged, projected queries
+#   2. parent / child assignments are worked out in memory
+#   3. missing parents are created in one bulk upsert, changed rows are written back in bulk
+#      upserts on "id" and merged summary rows are deleted with one `in` filter per chunk
+#
+#   link_combined_events(dates={"2025-08-01", "2025-08-02"})
+#   link_combined_events(start="2025-01-01", end="2025-06-30", dry_run=True)
+#   python audits/fix_combined_events.py --start 2025-01-01 --end 2025-06-30
+
+COMBINED_TYPES = ("Decathlon", "Heptathlon", "Pentathlon")
+# Events up to this many days after a combined-event date still belong to that meet
+MEET_SPAN_DAYS = 3
+EVENT_COLUMNS = "id,entity_id,title,start_time,category,status,result,event_key,parent_event_id,is_parent"
+WRITE_CHUNK = 500
+
+# Space-insensitive: compared against normalize_str() of the discipline / raw event name
+SUB_EVENT_WHITELIST = {
+    'Decathlon': [
+        '100m', '400m', '1500m', '110mh', '110mhurdles',
+        'longjump', 'highjump', 'polevault', 'shotput', 'discus', 'javelin',
+        '100metres', '400metres', '1500metres', '110metreshurdles'
+    ],
+    'Heptathlon': [
+        '100mh', '100mhurdles', '200m', '800m',
+        'highjump', 'shotput', 'longjump', 'javelin',
+        '60m', '1000m', '60mh', '60mhurdles', 'polevault',
+        '100metreshurdles', '200metres', '800metres', '60metres'
+    ],
+    'Pentathlon': [
+        '60mh', '60mhurdles', '800m',
+        'highjump', 'shotput', 'longjump',
+        '60metreshurdles', '800metres'
+    ]
+}
+
+def normalize_str(s):
+    if not s: return ""
+    s = s.lower().replace("short track", "").replace("shorttrack", "").replace(",", "")
+    return s.replace(" ", "").strip()
+
+def _day(value):
+    return value if isinstance(value, date) else datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+def _windows(days):
+    """Merges meet dates into as few [start, end) load windows as possible."""
+    windows = []
+    for d in sorted(days):
+        end = d + timedelta(days=MEET_SPAN_DAYS)
+        if windows and d <= windows[-1][1]: windows[-1][1] = max(windows[-1][1], end)
+        else: windows.append([d, end])
+    return windows
+
+def load_events(windows, page_size=1000):
+    """{id: row} of every event starting inside the windows."""
+    rows = {}
+    for start, end in windows:
+        apply = lambda q, s=start, e=end: q.gte("start_time", s.isoformat()).lt("start_time", e.isoformat())
+        for row in iter_rows("events", EVENT_COLUMNS, page_size=page_size, apply=apply):
+            if row.get("start_time"): rows[row["id"]] = row
+    return rows
+
+def _combined_type(row):
+    raw_str = str(row.get("result") or {})
+    evt_key = str(row.get("event_key") or "")
+    found = [t for t in COMBINED_TYPES if t in raw_str or t in evt_key]
+    if not found: return None
+    return found[0]
+
+def find_targets(rows, days):
+    """{(entity_id, date): {"type", "meet_name"}} for every combined-event row on one of `days`."""
+    targets = {}
+    for row in sorted(rows.values(), key=lambda r: r["id"]):
+        c_type = _combined_type(row)
+        if not c_type: continue
+        day = _day(row["start_time"])
+        if day not in days: continue
+        key = (row["entity_id"], day)
+        current_title = row.get("title") or ""
+        if key not in targets:
+            targets[key] = {"type": c_type, "meet_name": current_title}
+        elif targets[key]["meet_name"] in COMBINED_TYPES and current_title not in COMBINED_TYPES:
+            # Prefer a real meet name (e.g. "World Championships") over "Decathlon"
+            targets[key]["meet_name"] = current_title
+    return targets
+
+def _is_sub_event(child, c_type):
+    result = child.get("result") or {}
+    norm_raw = normalize_str(result.get("event_name_raw", ""))
+    norm_disc = normalize_str(result.get("discipline_clean", ""))
+    norm_type = normalize_str(c_type)
+    if norm_type in normalize_str(child.get("event_key", "")) or norm_type in norm_raw: return True
+    return any(sub in norm_disc or sub in norm_raw for sub in SUB_EVENT_WHITELIST[c_type])
+
+class LinkPlan:
+    """What the linker will change, worked out without touching the DB."""
+    def __init__(self):
+        self.new_parents = {}   # (entity_id, event_key) -> parent payload
+        self.updates = {}       # id -> row with its changes applied
+        self.deletes = {}       # id -> merged summary row to delete
+        self.links = []         # (child row, parent ref): ref is an id or an (entity_id, event_key) to create
+        self.groups = 0
+
+    def update(self, row, **changes):
+        self.updates[row["id"]] = {**self.updates.get(row["id"], row), **changes}
+
+    def summary(self):
+        return {
+            "groups": self.groups, "parents_created": len(self.new_parents), "linked": len(self.links),
+            "merged": len(self.deletes), "updated": len(self.updates),
+        }
+
+def plan_links(rows, targets):
+    """Parent / child assignments for every target group, from the loaded rows alone."""
+    plan = LinkPlan()
+    by_entity = {}
+    for row in rows.values():
+        by_entity.setdefault(row["entity_id"], []).append(row)
+    for entity_rows in by_entity.values():
+        entity_rows.sort(key=lambda r: (r["start_time"], r["id"]))
+    parents_by_key = {(r["entity_id"], r["event_key"]): r for r in rows.values() if r.get("is_parent") is True}
+    linked = set()
+
+    for (entity_id, day), info in sorted(targets.items(), key=lambda item: (item[0][0], item[0][1])):
+        c_type = info["type"]
+        end = day + timedelta(days=MEET_SPAN_DAYS)
+        meet_events = [
+            r for r in by_entity.get(entity_id, ())
+            if day <= _day(r["start_time"]) < end and r["id"] not in plan.deletes
+        ]
+        if len(meet_events) < 2: continue
+        plan.groups += 1
+
+        real_meet_name = info["meet_name"]
+        if real_meet_name in COMBINED_TYPES:
+            for child in meet_events:
+                if child.get("title") not in COMBINED_TYPES:
+                    real_meet_name = child.get("title"); break
+
+        parent_rows = [e for e in meet_events if e.get("is_parent") is True]
+        if parent_rows:
+            parent = plan.updates.get(parent_rows[0]["id"], parent_rows[0])
+            parent_ref = parent["id"]
+            if parent.get("title") in COMBINED_TYPES and real_meet_name != parent.get("title"):
+                plan.update(parent, title=real_meet_name)
+        else:
+            key = (entity_id, f"{c_type}|Overall|{real_meet_name}")
+            parent_ref = parents_by_key[key]["id"] if key in parents_by_key else key
+            if key not in parents_by_key and key not in plan.new_parents:
+                plan.new_parents[key] = {
+                    "entity_id": entity_id, "title": real_meet_name, "start_time": meet_events[0]["start_time"],
+                    "category": "Athletics", "status": "completed", "is_parent": True,
+                    "event_key": key[1], "result": {"status": "Aggregated"}
+                }
+
+        norm_type = normalize_str(c_type)
+        for child in meet_events:
+            if child["id"] == parent_ref or child.get("parent_event_id") or child["id"] in linked: continue
+            if child.get("is_parent") is True: continue
+            if not _is_sub_event(child, c_type): continue
+            if normalize_str((child.get("result") or {}).get("discipline_clean", "")) == norm_type:
+                # The overall score row: its result becomes the parent's, the row itself goes
+                if isinstance(parent_ref, tuple): plan.new_parents[parent_ref]["result"] = child["result"]
+                else: plan.update(rows[parent_ref], result=child["result"])
+                plan.deletes[child["id"]] = child
+            else:
+                plan.links.append((child, parent_ref))
+            linked.add(child["id"])
+    return plan
+
+def _chunks(items, size=WRITE_CHUNK):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _create_parents(new_parents):
+    """{(entity_id, event_key): id} for the new parent cards (one upsert per chunk)."""
+    ids = {}
+    for chunk in _chunks(new_parents.values()):
+        res = supabase.table("events").upsert(chunk, on_conflict="entity_id,event_key").execute()
+        for row in res.data or []:
+            ids[(row["entity_id"], row["event_key"])] = row["id"]
+            parent_resolver.remember(row["entity_id"], row["event_key"], row["id"])
+    return ids
+
+def apply_plan(plan):
+    parent_ids = _create_parents(plan.new_parents) if plan.new_parents else {}
+    for child, parent_ref in plan.links:
+        parent_id = parent_ids.get(parent_ref) if isinstance(parent_ref, tuple) else parent_ref
+        if parent_id is None: continue
+        plan.update(child, parent_event_id=parent_id)
+
+    columns = EVENT_COLUMNS.split(",")
+    updates = [row for row_id, row in plan.updates.items() if row_id not in plan.deletes]
+    for chunk in _chunks(updates):
+        # Full projected rows, so the upsert never needs missing NOT NULL columns
+        supabase.table("events").upsert([{c: row.get(c) for c in columns} for row in chunk], on_conflict="id").execute()
+    for chunk in _chunks(plan.deletes):
+        supabase.table("events").delete().in_("id", chunk).execute()
+    # These rows were changed behind the write-hash sidecar's back
+    forget_event_writes(updates + list(plan.deletes.values()))
+
+@tracked_operation()
+def link_combined_events(dates=None, start=None, end=None, dry_run=False):
+    """
+    Links the combined events on the given meet dates, or on every date in [start, end].
+    Returns the plan summary (groups, parents_created, linked, merged, updated).
+    """
+    if dates is not None:
+        days = {_day(d) for d in dates if d}
+    else:
+        first, last = _day(start), _day(end or datetime.now().date())
+        days = {first + timedelta(days=i) for i in range((last - first).days + 1)}
+    if not days: return LinkPlan().summary()
+
+    with db_operation("link_combined_events.load"):
+        rows = load_events(_windows(days))
+    plan = plan_links(rows, find_targets(rows, days))
+    if not dry_run:
+        with db_operation("link_combined_events.write"):
+            apply_plan(plan)
+    return plan.summary()
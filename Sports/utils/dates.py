@@ -0,0 +1,135 @@
+import re
+from datetime import date
+from functools import lru_cache
+
+# ==========================================
+# 📆 DATE PARSING
+# ==========================================
+# One parser for the date strings the scrapers read: calendar dates and ranges, results-page
+# meet dates, athlete birthdates. Each shape is recognised by a regex compiled once at import
+# time (no strptime format loop with exceptions as control flow). The same few hundred calendar
+# and DOB strings repeat thousands of times, so the scalar entry points are memoized and the
+# column versions parse each distinct string only once. audits/audit_dates.py checks the output
+# against the parsers this replaced and benchmarks both on the repo's CSV date columns.
+#
+#   parse_date("27 Aug 2025")            # date(2025, 8, 27)  also "22-Aug-25", "2025-08-27", "27/08/2025"
+#   parse_date("27 Aug", default_year=2025)
+#   parse_date_range("28 FEB-01 MAR 2025")   # (date(2025, 2, 28), date(2025, 3, 1))
+#   to_iso_date("17 NOV 1995")           # "1995-11-17" (None if unparseable)
+#   to_iso_dates(df["Birthdate"])        # column version (Series in, Series out)
+
+_MONTHS = {m: i for i, m in enumerate(("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"), 1)}
+
+_WHITESPACE = re.compile(r"\s+")
+# Single dates
+_ISO = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+_DMY_SLASH = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+_DAY_MONTH_YEAR = re.compile(r"(\d{1,2})([ -])([A-Za-z]{3})\2(\d{4}|\d{2})")
+_DAY_MONTH = re.compile(r"(\d{1,2}) ([A-Za-z]{3})")
+# Ranges: "28 FEB-01 MAR 2025" (cross-month) and "03-05 OCT 2025" (same month)
+_CROSS_MONTH = re.compile(r"(\d{1,2})\s*([A-Za-z]{3})\s*-\s*(\d{1,2})\s*([A-Za-z]{3})\s*(\d{4})")
+_SAME_MONTH = re.compile(r"(\d{1,2})\s*-\s*(\d{1,2})\s*([A-Za-z]{3})\s*(\d{4})")
+
+def _clean(text):
+    return _WHITESPACE.sub(" ", text.strip().replace("–", "-"))
+
+def _year(text):
+    # Two-digit years follow strptime's %y: 69-99 -> 19xx, 00-68 -> 20xx
+    year = int(text)
+    if len(text) == 2: year += 1900 if year >= 69 else 2000
+    return year
+
+def _build(year, month, day):
+    if not month: return None
+    try:
+        return date(year, month, int(day))
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=8192)
+def parse_date(text, default_year=None):
+    """
+    One date in any of the shapes the sites use, as a date (None if unparseable):
+    '27 Aug 2025', '22-Aug-25', '27 Aug 25', '2025-08-27', '27/08/2025',
+    '27 Aug' (needs default_year).
+    """
+    if not text or not isinstance(text, str): return None
+    s = _clean(text)
+
+    m = _DAY_MONTH_YEAR.fullmatch(s)
+    if m: return _build(_year(m.group(4)), _MONTHS.get(m.group(3).upper()), m.group(1))
+    m = _ISO.fullmatch(s)
+    if m: return _build(int(m.group(1)), int(m.group(2)), m.group(3))
+    m = _DMY_SLASH.fullmatch(s)
+    if m: return _build(int(m.group(3)), int(m.group(2)), m.group(1))
+    if default_year:
+        m = _DAY_MONTH.fullmatch(s)
+        if m: return _build(default_year, _MONTHS.get(m.group(2).upper()), m.group(1))
+    return None
+
+@lru_cache(maxsize=8192)
+def parse_date_range(raw):
+    """
+    World Athletics calendar dates as (start, end) dates, or (None, None):
+      '27 Aug 2025', '27 Aug 2025 - 28 Aug 2025', '27 Aug - 28 Aug 2025' (left side missing year),
+      '28 FEB-01 MAR 2025' (cross-month), '03-05 OCT 2025' (same month)
+    """
+    if not raw or not isinstance(raw, str): return None, None
+    s = _clean(raw)
+
+    m = _CROSS_MONTH.fullmatch(s)
+    if m:
+        d1, mon1, d2, mon2, y = m.groups()
+        return parse_date(f"{d1} {mon1} {y}"), parse_date(f"{d2} {mon2} {y}")
+
+    m = _SAME_MONTH.fullmatch(s)
+    if m:
+        d1, d2, mon, y = m.groups()
+        return parse_date(f"{d1} {mon} {y}"), parse_date(f"{d2} {mon} {y}")
+
+    # Standard range: "X - Y" (the right side carries the year)
+    parts = s.split("-")
+    if len(parts) == 2:
+        end = parse_date(parts[1].strip())
+        start = parse_date(parts[0].strip(), default_year=end.year) if end else None
+        return (start, end) if start else (None, None)
+
+    single = parse_date(s)
+    return single, single
+
+def to_iso_date(text):
+    """parse_date as 'YYYY-MM-DD' (None if unparseable)."""
+    parsed = parse_date(text)
+    return parsed.isoformat() if parsed else None
+
+def to_iso_dates(values):
+    """
+    Column version of to_iso_date.
+    A pandas Series comes back as a Series on the same index (unparseable/missing -> None),
+    any other iterable as a list. Each distinct string is parsed once.
+    """
+    if hasattr(values, "map") and hasattr(values, "unique"):
+        mapping = {v: to_iso_date(v) for v in values.dropna().unique()}
+        column = values.map(mapping, na_action="ignore")
+        return column.astype(object).where(column.notna(), None)
+    values = list(values)
+    mapping = {v: to_iso_date(v) for v in set(values) if v is not None}
+    return [mapping.get(v) if v is not None else None for v in values]
+
+def iso_date_ranges(values):
+    """
+    Column version of parse_date_range: (starts, ends) as 'YYYY-MM-DD' strings ("" if unparseable),
+    two Series for a pandas Series, two lists otherwise. Each distinct string is parsed once.
+    """
+    def iso_pair(raw):
+        start, end = parse_date_range(raw)
+        return (start.isoformat() if start else "", end.isoformat() if end else "")
+
+    if hasattr(values, "map") and hasattr(values, "unique"):
+        pairs = {v: iso_pair(v) for v in values.dropna().unique()}
+        starts = values.map({v: p[0] for v, p in pairs.items()}, na_action="ignore").fillna("")
+        ends = values.map({v: p[1] for v, p in pairs.items()}, na_action="ignore").fillna("")
+        return starts, ends
+    values = list(values)
+    pairs = {v: iso_pair(v) for v in set(values) if v is not None}
+    return ([pairs.get(v, ("", ""))[0] for v in values], [pairs.get(v, ("", ""))[1] for v in values])
@@ -1,24 +1,518 @@
 import os
 import re
-from dotenv import load_dotenv
-from supabase import create_client, Client
+import time
+import random
+import sys
+import threading
+import inspect
+import functools
+import contextvars
+from contextlib import contextmanager
+from collections import OrderedDict, defaultdict
+# Re-exported: scripts import the event-name helpers from here
+from utils.event_names import standardize_event_name, standardize_event_names
+from utils.write_hashes import content_hash
 
 # --- 1. SETUP & CONNECTION ---
 # 🟢 BULLETPROOF .ENV PATHING (Forces it to look one folder up)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 env_path = os.path.abspath(os.path.join(BASE_DIR, "..", ".env"))
-load_dotenv(dotenv_path=env_path)
 
-url = os.getenv("SUPABASE_URL")
-key = os.getenv("SUPABASE_KEY")
+# 🟢 Nothing connects at import time: the client is built on first use, so the pure helpers
+# (create_slug, standardize_event_name, ...) import cheaply in tests, tools and worker processes.
+# Offline mode (SUPABASE_OFFLINE=1 or set_offline_mode()) makes any DB access fail fast instead.
+OFFLINE_MODE = os.getenv("SUPABASE_OFFLINE", "").lower() in ("1", "true", "yes")
 
-if not url or not key:
-    raise ValueError(f"Missing SUPABASE_URL or SUPABASE_KEY. Please check your .env file at {env_path}")
+# 🟢 Storage backend: "supabase" (default) or "sqlite" (local staging DB + local folder for buckets,
+# see utils/storage_backends.py). SQLITE_DB_PATH / LOCAL_STORAGE_DIR override the default locations.
+DB_BACKEND = os.getenv("DB_BACKEND", "supabase").lower()
 
-supabase: Client = create_client(url, key)
+_client = None
+_client_is_local = False
+_client_lock = threading.Lock()
+
+def set_offline_mode(enabled=True):
+    global OFFLINE_MODE
+    OFFLINE_MODE = enabled
+
+def get_credentials():
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=env_path)
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_KEY")
+    if not url or not key:
+        raise ValueError(f"Missing SUPABASE_URL or SUPABASE_KEY. Please check your .env file at {env_path}")
+    return url, key
+
+def _create_backend():
+    global _client_is_local
+    if DB_BACKEND == "sqlite":
+        from utils.storage_backends import SQLiteBackend, DEFAULT_SQLITE_PATH, DEFAULT_STORAGE_DIR
+        _client_is_local = True
+        return SQLiteBackend(os.getenv("SQLITE_DB_PATH", DEFAULT_SQLITE_PATH), os.getenv("LOCAL_STORAGE_DIR", DEFAULT_STORAGE_DIR))
+    if OFFLINE_MODE:
+        raise RuntimeError("db_utils is in offline mode: no database client is available.")
+    from supabase import create_client
+    _client_is_local = False
+    return create_client(*get_credentials())
+
+def get_client():
+    """Returns the shared (managed) client, creating it on first call."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ManagedClient(_create_backend())
+    return _client
+
+def use_backend(backend):
+    """
+    Points db_utils at any object with the supabase Client surface, e.g. SQLiteBackend(":memory:").
+    Pass None to go back to the configured backend on next use. Run-scoped caches are reset.
+    """
+    global _client, _client_is_local
+    with _client_lock:
+        _client = ManagedClient(backend) if backend is not None else None
+        _client_is_local = backend is not None
+    entity_cache.clear()
+    parent_resolver.clear()
+    attach_identity_index(None)
+    use_write_hashes(None)
+
+def client_is_local():
+    """True when the current client is not the Supabase one (SQLite staging, fakes)."""
+    get_client()
+    return _client_is_local
+
+class _LazyClient:
+    """Stands in for the client until first use; `from utils.db_utils import supabase` keeps working."""
+    def __getattr__(self, name):
+        return getattr(get_client(), name)
+
+supabase = _LazyClient()
+
+# --- 1b. SHARED REQUEST EXECUTOR ---
+# Every table / RPC / storage call made through `supabase` below goes through execute_request():
+# transient failures (429, 5xx, timeouts) are retried with jittered exponential backoff, a circuit
+# breaker pauses all writers while the backend is unhealthy, and a token bucket caps the request rate.
+RETRY_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30.0
+MAX_REQUESTS_PER_SECOND = float(os.getenv("SUPABASE_MAX_RPS", "25"))
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN_SECONDS = 30.0
+
+# Postgres codes worth retrying: statement timeout, serialization failure, deadlock, too many connections
+_RETRYABLE_PG_CODES = {"57014", "40001", "40P01", "53300", "08000", "08003", "08006"}
+_RETRYABLE_EXC_NAMES = {"ConnectError", "ConnectTimeout", "ReadError", "ReadTimeout", "WriteError", "WriteTimeout",
+                        "PoolTimeout", "RemoteProtocolError", "NetworkError", "TimeoutException", "TimeoutError",
+                        "ConnectionError", "ConnectionResetError"}
+_RETRYABLE_MESSAGES = ("timed out", "timeout", "too many requests", "rate limit", "bad gateway",
+                       "service unavailable", "gateway time", "connection reset", "server disconnected")
+
+def _error_status(exc):
+    """Best-effort HTTP status / Postgres code from postgrest, storage and httpx errors."""
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None) or getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    if status: return str(status)
+    code = getattr(exc, "code", None)
+    if code is None and exc.args and isinstance(exc.args[0], dict):
+        code = exc.args[0].get("code") or exc.args[0].get("statusCode")
+    return str(code) if code is not None else None
+
+def is_retryable_error(exc):
+    if type(exc).__name__ in _RETRYABLE_EXC_NAMES: return True
+    status = _error_status(exc)
+    if status:
+        if status in _RETRYABLE_PG_CODES: return True
+        if status.isdigit() and len(status) == 3:
+            return status in ("408", "425", "429") or status.startswith("5")
+    message = str(exc).lower()
+    return any(m in message for m in _RETRYABLE_MESSAGES)
+
+def is_unique_violation(exc):
+    """True for a duplicate-key insert (Postgres 23505 / HTTP 409 Conflict)."""
+    return _error_status(exc) in ("23505", "409")
+
+def _retry_after_seconds(exc):
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try: return float(headers.get("Retry-After"))
+    except (TypeError, ValueError): return None
+
+class RateLimiter:
+    """Token bucket shared by every thread (and the async layer)."""
+    def __init__(self, rate_per_second, burst=None):
+        self.rate = rate_per_second
+        self.capacity = burst or max(1.0, rate_per_second)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Takes one token; returns how long the caller must wait before using it."""
+        if not self.rate: return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+class CircuitBreaker:
+    """
+    Opens after N consecutive transient failures. While open, every caller waits out the
+    cool-down instead of hammering the backend. Then it is half-open: exactly one caller goes
+    through as a probe while the rest keep waiting; the probe's success closes the breaker,
+    its failure re-opens it for another cool-down.
+    """
+    PROBE_POLL_SECONDS = 0.25
+
+    def __init__(self, failure_threshold, cooldown_seconds):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        0.0 if the caller may send its request now (possibly as the probe), otherwise how long
+        to sleep before asking again.
+        """
+        with self._lock:
+            if self.opened_at is None: return 0.0
+            now = time.monotonic()
+            remaining = self.opened_at + self.cooldown_seconds - now
+            if remaining > 0: return remaining
+            # A probe that never reported back (e.g. its thread died) is replaced after a cool-down
+            if self.probe_started_at is None or now - self.probe_started_at >= self.cooldown_seconds:
+                self.probe_started_at = now
+                return 0.0
+            return self.PROBE_POLL_SECONDS
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_started_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            probe_failed = self.probe_started_at is not None
+            if probe_failed or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self.probe_started_at = None
+                self.trips += 1
+                print(f"⛔ Supabase unhealthy ({self.failures} failures in a row). Pausing writers for {self.cooldown_seconds:.0f}s...")
+
+rate_limiter = RateLimiter(MAX_REQUESTS_PER_SECOND)
+circuit_breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN_SECONDS)
+
+def _backoff_seconds(exc, attempt):
+    retry_after = _retry_after_seconds(exc)
+    if retry_after is not None: return min(BACKOFF_MAX_SECONDS, retry_after)
+    # Full jitter: spreads retries from parallel writers apart
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+def execute_request(call, attempts=None, tag=None):
+    """
+    Runs `call()` (one HTTP request) under the retry / breaker / rate policy.
+    `tag` is (kind, table) for the call stats, e.g. ("upsert", "events").
+    """
+    attempts = attempts or RETRY_ATTEMPTS
+    started = time.perf_counter()
+    operation = current_operation()
+    for attempt in range(attempts):
+        pause = circuit_breaker.acquire()
+        while pause:
+            time.sleep(pause)
+            pause = circuit_breaker.acquire()
+        wait = rate_limiter.reserve()
+        if wait: time.sleep(wait)
+        try:
+            result = call()
+        except Exception as e:
+            retryable = is_retryable_error(e)
+            # Any non-transient answer (a 4xx) still means the backend is up
+            if retryable: circuit_breaker.record_failure()
+            else: circuit_breaker.record_success()
+            if not retryable or attempt == attempts - 1:
+                call_stats.record(operation, tag, time.perf_counter() - started, attempt + 1, ok=False)
+                raise
+            time.sleep(_backoff_seconds(e, attempt))
+            continue
+        circuit_breaker.record_success()
+        call_stats.record(operation, tag, time.perf_counter() - started, attempt + 1)
+        return result
+
+async def aexecute_request(call, attempts=None, tag=None):
+    """Async twin of execute_request; `call()` returns an awaitable."""
+    import asyncio
+    attempts = attempts or RETRY_ATTEMPTS
+    started = time.perf_counter()
+    operation = current_operation()
+    for attempt in range(attempts):
+        pause = circuit_breaker.acquire()
+        while pause:
+            await asyncio.sleep(pause)
+            pause = circuit_breaker.acquire()
+        wait = rate_limiter.reserve()
+        if wait: await asyncio.sleep(wait)
+        try:
+            result = await call()
+        except Exception as e:
+            retryable = is_retryable_error(e)
+            # Any non-transient answer (a 4xx) still means the backend is up
+            if retryable: circuit_breaker.record_failure()
+            else: circuit_breaker.record_success()
+            if not retryable or attempt == attempts - 1:
+                call_stats.record(operation, tag, time.perf_counter() - started, attempt + 1, ok=False)
+                raise
+            await asyncio.sleep(_backoff_seconds(e, attempt))
+            continue
+        circuit_breaker.record_success()
+        call_stats.record(operation, tag, time.perf_counter() - started, attempt + 1)
+        return result
+
+# Builder methods that decide what a query does (the rest are filters / modifiers)
+_QUERY_KINDS = {"select", "insert", "upsert", "update", "delete"}
+
+class _ManagedQuery:
+    """
+    Wraps a postgrest builder chain so .execute() goes through execute_request().
+    Also remembers the table and the kind of call (select, upsert, rpc, ...) for the call stats.
+    """
+    def __init__(self, query, table=None, kind="query"):
+        self._query = query
+        self.tag = (kind, table)
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if not callable(attr): return attr
+        kind = name if name in _QUERY_KINDS else self.tag[0]
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return _ManagedQuery(result, self.tag[1], kind) if hasattr(result, "execute") else result
+        return chained
+
+    def execute(self):
+        return execute_request(self._query.execute, tag=self.tag)
+
+class _ManagedBucket:
+    # get_public_url only formats a string; everything else is an HTTP call
+    _LOCAL_METHODS = {"get_public_url"}
+
+    def __init__(self, bucket, bucket_id="storage"):
+        self._bucket = bucket
+        self._bucket_id = bucket_id
+
+    def __getattr__(self, name):
+        attr = getattr(self._bucket, name)
+        if not callable(attr) or name in self._LOCAL_METHODS: return attr
+        tag = (f"storage.{name}", self._bucket_id)
+        return lambda *args, **kwargs: execute_request(lambda: attr(*args, **kwargs), tag=tag)
+
+class _ManagedStorage(_ManagedBucket):
+    def from_(self, bucket_id):
+        return _ManagedBucket(self._bucket.from_(bucket_id), bucket_id)
+
+class ManagedClient:
+    """Drop-in for the supabase Client: same .table() / .rpc() / .storage surface, managed execution."""
+    def __init__(self, client):
+        self.client = client
+
+    @property
+    def storage(self):
+        return _ManagedStorage(self.client.storage)
+
+    def table(self, name):
+        return _ManagedQuery(self.client.table(name), name)
+
+    def from_(self, name):
+        return self.table(name)
+
+    def rpc(self, fn, params=None, **kwargs):
+        return _ManagedQuery(self.client.rpc(fn, params or {}, **kwargs), fn, "rpc")
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+class QueryTagger:
+    """
+    Hands out the same tagged builders as ManagedClient for a client whose .execute() is run
+    elsewhere (the async layer): build a query through it, then execute `query.unwrap()` yourself.
+    """
+    def __init__(self, client):
+        self.client = client
+
+    def table(self, name):
+        return _ManagedQuery(self.client.table(name), name)
+
+    def rpc(self, fn, params=None, **kwargs):
+        return _ManagedQuery(self.client.rpc(fn, params or {}, **kwargs), fn, "rpc")
+
+def unwrap_query(query):
+    """Returns (the raw builder, its stats tag) for a query built through QueryTagger."""
+    if isinstance(query, _ManagedQuery): return query._query, query.tag
+    return query, ("query", None)
+
+# --- 1c. CALL INSTRUMENTATION ---
+# execute_request() records every call it runs: how many, how long (incl. retries), how many retries
+# and failures, per (operation, kind, table). The operation is the db_utils function that made the
+# call (see @tracked_operation) or, for direct `supabase` use elsewhere, the calling function's name.
+#
+#   print_call_summary()                          # end-of-run table with p50 / p95 per operation
+#   with call_budget(3): upsert_entity(...)       # AssertionError if the block makes > 3 calls
+_operation = contextvars.ContextVar("db_operation", default=None)
+_INSTRUMENTED_FILES = {os.path.abspath(__file__), os.path.join(BASE_DIR, "async_db_utils.py")}
+
+@contextmanager
+def db_operation(name):
+    """Tags every call made inside the block with `name` (the innermost tag wins)."""
+    token = _operation.set(name)
+    try:
+        yield
+    finally:
+        _operation.reset(token)
+
+def tracked_operation(name=None):
+    """Decorator form of db_operation(); defaults to the function's own name. Works on coroutines too."""
+    def decorate(fn):
+        label = name or fn.__name__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def awrapper(*args, **kwargs):
+                with db_operation(label): return await fn(*args, **kwargs)
+            return awrapper
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with db_operation(label): return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def current_operation():
+    name = _operation.get()
+    if name: return name
+    # Untagged: name the first function outside the db layer (e.g. a scraper's update_entity_details)
+    frame = sys._getframe(1)
+    while frame is not None and os.path.abspath(frame.f_code.co_filename) in _INSTRUMENTED_FILES:
+        frame = frame.f_back
+    return frame.f_code.co_name if frame is not None else "?"
+
+def _percentile(sorted_values, pct):
+    if not sorted_values: return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))]
+
+class CallStats:
+    """Thread-safe counters + latency samples per (operation, kind, table)."""
+    def __init__(self):
+        self.result_rows = 0
+        self._calls = defaultdict(lambda: {"calls": 0, "attempts": 0, "errors": 0, "latencies": []})
+        self._lock = threading.Lock()
+
+    def record(self, operation, tag, seconds, attempts=1, ok=True):
+        kind, table = tag or ("query", None)
+        with self._lock:
+            entry = self._calls[(operation or "?", kind, table or "-")]
+            entry["calls"] += 1
+            entry["attempts"] += attempts
+            if not ok: entry["errors"] += 1
+            entry["latencies"].append(seconds)
+
+    def count_result_rows(self, n=1):
+        """Call once per scraped result row so the summary can report calls per row."""
+        with self._lock:
+            self.result_rows += n
+
+    def total(self, operation=None, kind=None, table=None):
+        with self._lock:
+            return sum(e["calls"] for (op, k, t), e in self._calls.items()
+                       if (operation is None or op == operation) and (kind is None or k == kind)
+                       and (table is None or t == table))
+
+    def reset(self):
+        with self._lock:
+            self._calls.clear()
+            self.result_rows = 0
+
+    def summary(self):
+        """One dict per (operation, kind, table), busiest first. Latencies are in milliseconds."""
+        with self._lock:
+            items = [(key, dict(e, latencies=sorted(e["latencies"]))) for key, e in self._calls.items()]
+            rows = self.result_rows
+        out = []
+        for (operation, kind, table), e in sorted(items, key=lambda item: -item[1]["calls"]):
+            lat = e["latencies"]
+            out.append({
+                "operation": operation, "kind": kind, "table": table,
+                "calls": e["calls"], "retries": e["attempts"] - e["calls"], "errors": e["errors"],
+                "p50_ms": round(_percentile(lat, 50) * 1000, 1), "p95_ms": round(_percentile(lat, 95) * 1000, 1),
+                "total_s": round(sum(lat), 2),
+                "calls_per_row": round(e["calls"] / rows, 3) if rows else None,
+            })
+        return out
+
+call_stats = CallStats()
+
+def count_result_rows(n=1):
+    call_stats.count_result_rows(n)
+
+def call_summary():
+    return call_stats.summary()
+
+def print_call_summary(printer=print):
+    lines = call_stats.summary()
+    if not lines:
+        printer("📊 No database calls made.")
+        return
+    total = sum(line["calls"] for line in lines)
+    rows = call_stats.result_rows
+    per_row = f", {total / rows:.2f} per result row" if rows else ""
+    printer(f"📊 {total} database calls{per_row}:")
+    printer(f"   {'operation':<28} {'kind':<16} {'table':<16} {'calls':>7} {'/row':>6} {'p50 ms':>8} {'p95 ms':>8} {'retries':>7} {'errors':>6}")
+    for line in lines:
+        per = f"{line['calls_per_row']:.2f}" if line["calls_per_row"] is not None else "-"
+        printer(f"   {line['operation'][:28]:<28} {line['kind'][:16]:<16} {line['table'][:16]:<16} {line['calls']:>7} {per:>6} "
+                f"{line['p50_ms']:>8} {line['p95_ms']:>8} {line['retries']:>7} {line['errors']:>6}")
+
+@contextmanager
+def call_budget(max_calls, operation=None, kind=None, table=None):
+    """
+    Test helper: fails if the block makes more than `max_calls` matching DB calls.
+
+        use_backend(SQLiteBackend(":memory:"))
+        with call_budget(2, table="entities"):
+            upsert_entity({"name": "Kishane THOMPSON", "nationality": "JAM"})
+    """
+    before = call_stats.total(operation, kind, table)
+    yield
+    used = call_stats.total(operation, kind, table) - before
+    if used > max_calls:
+        scope = ", ".join(f"{k}={v}" for k, v in (("operation", operation), ("kind", kind), ("table", table)) if v)
+        raise AssertionError(f"DB call budget exceeded{f' ({scope})' if scope else ''}: {used} calls > {max_calls}")
 
 # --- 2. HELPER FUNCTIONS ---
 
+def iter_rows(table, columns="*", page_size=1000, order="id", apply=None):
+    """
+    Streams every row of a table in range() pages (Supabase caps a response at 1000 rows).
+    `apply` can add filters to the query, e.g. lambda q: q.eq("gender", "male").
+    """
+    start = 0
+    while True:
+        query = supabase.table(table).select(columns)
+        if apply: query = apply(query)
+        # A generator can't hold a tag across yields: name each page fetch instead (callers' tags win)
+        with db_operation(_operation.get() or "iter_rows"):
+            res = query.order(order).range(start, start + page_size - 1).execute()
+        rows = res.data or []
+        yield from rows
+        if len(rows) < page_size: break
+        start += page_size
+
 def create_slug(name, nationality):
     nat_str = nationality if nationality and nationality.lower() != "none" else "unk"
     raw_string = f"{name} {nat_str}"
@@ -27,9 +521,20 @@ def create_slug(name, nationality):
     slug = re.sub(r'[\s]+', '-', slug)
     return slug
 
-def upsert_entity(data_or_name, nationality=None, discipline=None):
+def discipline_details_key(discipline_clean):
+    # Basic key cleaning for DB column compatibility
+    return discipline_clean.lower().replace(" ", "").replace("shorttrack", "").replace(",", "")
+
+def discipline_placeholders(discipline_clean):
+    """The points_/ranking_ keys every athlete with a result in a discipline gets ("N/A" until ranked)."""
+    if not discipline_clean: return {}
+    key = discipline_details_key(discipline_clean)
+    return {f"points_{key}": "N/A", f"ranking_{key}": "N/A"}
+
+def _prepare_entity_record(data_or_name, nationality=None, discipline=None):
     """
-    Smart Upsert with 'UNK' merging logic.
+    Normalizes the two call styles of upsert_entity into one record.
+    `discipline` (or a "discipline" key) adds that discipline's placeholders where details lack them.
     """
     if isinstance(data_or_name, dict):
         athlete_data = data_or_name
@@ -37,6 +542,7 @@ def upsert_entity(data_or_name, nationality=None, discipline=None):
         nationality = athlete_data.get("nationality")
         gender = athlete_data.get("gender", "male")
         dob = athlete_data.get("date_of_birth") or athlete_data.get("dob")
+        discipline = athlete_data.get("discipline") or discipline
     else:
         name = data_or_name
         gender = "male"
@@ -45,28 +551,290 @@ def upsert_entity(data_or_name, nationality=None, discipline=None):
     if nationality in ["UNK", "None", ""]: 
         nationality = None
 
-    target_slug = create_slug(name, nationality) 
-    fallback_slug = create_slug(name, "unk")     
-    
     new_details = {}
     if isinstance(data_or_name, dict) and "details" in data_or_name:
          new_details = data_or_name["details"]
 
-    entity_id = None
+    return {
+        "name": name,
+        "nationality": nationality,
+        "gender": gender,
+        "dob": dob,
+        "details": new_details,
+        "defaults": discipline_placeholders(discipline),
+        "target_slug": create_slug(name, nationality),
+        "fallback_slug": create_slug(name, "unk"),
+    }
+
+def _merge_entity_update(existing_data, new_details, dob, defaults=None):
+    """
+    Merges incoming details/DOB into an existing row; `defaults` only fill keys that are missing.
+    Returns the UPDATE payload (empty dict if nothing changed).
+    """
+    current_details = dict(existing_data.get("details") or {})
+    needs_update = False
+    for k, v in new_details.items():
+        if k not in current_details or current_details[k] != v:
+            current_details[k] = v
+            needs_update = True
+    for k, v in (defaults or {}).items():
+        if k not in current_details:
+            current_details[k] = v
+            needs_update = True
+    update_payload = {}
+    if needs_update: update_payload["details"] = current_details
+    if dob and not existing_data.get("date_of_birth"): update_payload["date_of_birth"] = dob
+    return update_payload
+
+def _new_entity_payload(record):
+    return {
+        "name": record["name"],
+        "slug": record["target_slug"],
+        "category": "Sport",
+        "subcategory": "Athletics",
+        "nationality": record["nationality"] or "UNK",
+        "gender": record["gender"],
+        "details": {**record["defaults"], **record["details"]},
+        "date_of_birth": record["dob"]
+    }
+
+# --- 3. ENTITY IDENTITY CACHE ---
+# Only the columns upsert_entity needs (also enough to re-send a full row in a bulk upsert)
+ENTITY_COLUMNS = "id,slug,name,nationality,gender,category,subcategory,details,date_of_birth"
+
+class EntityCache:
+    """
+    In-process slug -> entity row cache (LRU + TTL).
+    Every entity write in this module goes through it, so cached rows stay current for this process.
+    """
+    def __init__(self, max_size=50000, ttl_seconds=6 * 3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._rows = OrderedDict()  # slug -> (expires_at, row)
+        self._lock = threading.Lock()
+
+    def get(self, slug):
+        with self._lock:
+            entry = self._rows.get(slug)
+            if entry and entry[0] > time.monotonic():
+                self._rows.move_to_end(slug)
+                self.hits += 1
+                return entry[1]
+            if entry: del self._rows[slug]
+            self.misses += 1
+            return None
+
+    def put(self, row):
+        if not row or not row.get("slug"): return
+        with self._lock:
+            self._rows[row["slug"]] = (time.monotonic() + self.ttl_seconds, row)
+            self._rows.move_to_end(row["slug"])
+            while len(self._rows) > self.max_size:
+                self._rows.popitem(last=False)
+
+    def discard(self, slug):
+        with self._lock:
+            self._rows.pop(slug, None)
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._rows), "hits": self.hits, "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+entity_cache = EntityCache()
+
+@tracked_operation()
+def warm_entity_cache(page_size=1000):
+    """Pre-loads the cache with a streaming projection of `entities` (stops at max_size)."""
+    loaded = 0
+    for row in iter_rows("entities", ENTITY_COLUMNS, page_size=page_size):
+        entity_cache.put(row)
+        loaded += 1
+        if loaded >= entity_cache.max_size: break
+    print(f"🧠 Entity cache warmed with {loaded} athletes.")
+    return loaded
+
+def entity_cache_stats():
+    return entity_cache.stats()
+
+def _cache_written_row(existing_data, payload, old_slug=None):
+    row = {**existing_data, **payload}
+    if old_slug and old_slug != row.get("slug"): entity_cache.discard(old_slug)
+    entity_cache.put(row)
+
+# 🟢 Optional athlete identity index (utils/identity_index.py), loaded with EVERY entity.
+# When it proves neither the target nor the '-unk' slug exists, upsert_entity skips both
+# SELECTs and inserts straight away. A stale index only costs a failed insert + normal lookup.
+identity_index = None
+
+def attach_identity_index(index):
+    """e.g. attach_identity_index(IdentityIndex.from_rows(iter_rows("entities", "id,name,nationality")))"""
+    global identity_index
+    identity_index = index
+
+def _index_rules_out(record):
+    if identity_index is None: return False
+    slugs = (record["target_slug"], record["fallback_slug"])
+    for pos in identity_index.candidates(record["name"], kind="slug"):
+        if create_slug(identity_index.name(pos), identity_index.nationality(pos)) in slugs: return False
+    return True
+
+# 🟢 Optional write-hash sidecar (utils/write_hashes.py): writes whose content hash matches the
+# last successful one are skipped without a request. write_stats counts what happened to each row
+# ("inserted" means new to the sidecar / cache; a plain upsert can't tell us more).
+write_hashes = None
+
+def use_write_hashes(store):
+    """e.g. use_write_hashes(WriteHashStore()); None turns change detection off."""
+    global write_hashes
+    write_hashes = store
+
+class WriteStats:
+    def __init__(self):
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, table, outcome, n=1):
+        if not n: return
+        with self._lock:
+            self._counts[(table, outcome)] += n
+
+    def get(self, table, outcome):
+        return self._counts.get((table, outcome), 0)
+
+    def summary(self):
+        with self._lock:
+            out = {}
+            for (table, outcome), n in sorted(self._counts.items()):
+                out.setdefault(table, {})[outcome] = n
+            return out
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+write_stats = WriteStats()
+
+def _entity_hash(record):
+    # Only what upsert_entity actually merges from the incoming data
+    return content_hash([record["name"], record["nationality"], record["gender"], record["dob"], record["details"], record["defaults"]])
+
+def _unchanged_entity_id(record):
+    """Id of the entity when this exact record was already merged into it, else None."""
+    if write_hashes is None: return None
+    entry = write_hashes.get("entities", record["target_slug"])
+    if entry and entry[0] == _entity_hash(record):
+        write_stats.add("entities", "skipped")
+        return entry[1]
+    return None
+
+def _remember_entity_hashes(records, slug_to_id):
+    if write_hashes is None: return
+    write_hashes.put_many("entities", [
+        (r["target_slug"], _entity_hash(r), slug_to_id[r["target_slug"]]) for r in records if r["target_slug"] in slug_to_id
+    ])
+
+def _skip_unchanged_entities(records):
+    """Splits collapsed records into (records to upsert, {slug: id} of ones the sidecar proves unchanged)."""
+    if write_hashes is None: return records, {}
+    pending, known = [], {}
+    for record in records:
+        entity_id = _unchanged_entity_id(record)
+        if entity_id is not None: known[record["target_slug"]] = entity_id
+        else: pending.append(record)
+    return pending, known
+
+def _event_hash(payload):
+    return content_hash(payload)
+
+def _unchanged_event(payload):
+    if write_hashes is None: return False
+    entry = write_hashes.get("events", _event_hash_key(payload))
+    return bool(entry) and entry[0] == _event_hash(payload)
+
+def _event_hash_key(payload):
+    return f"{payload['entity_id']}|{payload['event_key']}"
+
+def _count_event_writes(payloads):
+    """Counts a batch of written events as inserted / updated and records their hashes."""
+    if write_hashes is None:
+        write_stats.add("events", "upserted", len(payloads))
+        return
+    items = []
+    for payload in payloads:
+        key = _event_hash_key(payload)
+        write_stats.add("events", "updated" if write_hashes.get("events", key) else "inserted")
+        items.append((key, payload.get("_hash") or _event_hash(payload)))
+    write_hashes.put_many("events", items)
+
+def forget_event_writes(rows):
+    """Drops the sidecar hashes of events changed outside upsert_event (e.g. the combined-events linker)."""
+    if write_hashes is None: return
+    for row in rows:
+        write_hashes.discard("events", _event_hash_key(row))
+
+def _insert_entity(record):
+    insert_res = supabase.table("entities").insert(_new_entity_payload(record)).execute()
+    row = insert_res.data[0]
+    _cache_written_row(row, {})
+    if identity_index is not None:
+        identity_index.add(row["id"], row.get("name"), row.get("nationality"), row.get("date_of_birth"))
+    return row["id"]
+
+@tracked_operation()
+def upsert_entity(data_or_name, nationality=None, discipline=None):
+    """
+    Smart Upsert with 'UNK' merging logic.
+    """
+    record = _prepare_entity_record(data_or_name, nationality, discipline)
+    nationality = record["nationality"]
+    target_slug = record["target_slug"]
+    fallback_slug = record["fallback_slug"]
+
+    entity_id = _unchanged_entity_id(record)
+    if entity_id is not None: return entity_id
     existing_data = None
     
+    existing_data = entity_cache.get(target_slug)
+    if not existing_data and _index_rules_out(record):
+        try:
+            entity_id = _insert_entity(record)
+            write_stats.add("entities", "inserted")
+            _remember_entity_hashes([record], {target_slug: entity_id})
+            return entity_id
+        except Exception as e:
+            # Index was stale (row created elsewhere): fall back to the lookups below
+            if not is_unique_violation(e): raise
+
     try:
-        response = supabase.table("entities").select("*").eq("slug", target_slug).execute()
-        if response.data:
-            existing_data = response.data[0]
-        elif nationality:
-            response_fallback = supabase.table("entities").select("*").eq("slug", fallback_slug).execute()
-            if response_fallback.data:
-                existing_data = response_fallback.data[0]
-                supabase.table("entities").update({
-                    "slug": target_slug,
-                    "nationality": nationality
-                }).eq("id", existing_data["id"]).execute()
+        if not existing_data:
+            response = supabase.table("entities").select(ENTITY_COLUMNS).eq("slug", target_slug).execute()
+            if response.data:
+                existing_data = response.data[0]
+            elif nationality:
+                existing_data = entity_cache.get(fallback_slug)
+                if not existing_data:
+                    response_fallback = supabase.table("entities").select(ENTITY_COLUMNS).eq("slug", fallback_slug).execute()
+                    existing_data = response_fallback.data[0] if response_fallback.data else None
+                if existing_data:
+                    rename = {"slug": target_slug, "nationality": nationality}
+                    supabase.table("entities").update(rename).eq("id", existing_data["id"]).execute()
+                    existing_data = {**existing_data, **rename}
+                    entity_cache.discard(fallback_slug)
+            entity_cache.put(existing_data)
 
     except Exception as e:
         print(f"Error querying Supabase: {e}")
@@ -74,73 +842,259 @@ def upsert_entity(data_or_name, nationality=None, discipline=None):
 
     if existing_data:
         entity_id = existing_data["id"]
-        current_details = existing_data.get("details") or {}
-        needs_update = False
-        for k, v in new_details.items():
-            if k not in current_details or current_details[k] != v:
-                current_details[k] = v
-                needs_update = True
-        update_payload = {}
-        if needs_update: update_payload["details"] = current_details
-        if dob and not existing_data.get("date_of_birth"): update_payload["date_of_birth"] = dob
+        update_payload = _merge_entity_update(existing_data, record["details"], record["dob"], record["defaults"])
         if update_payload:
             supabase.table("entities").update(update_payload).eq("id", entity_id).execute()
-        return entity_id
+            _cache_written_row(existing_data, update_payload)
+        write_stats.add("entities", "updated" if update_payload else "unchanged")
     else:
-        payload = {
-            "name": name,
-            "slug": target_slug,
-            "category": "Sport",
-            "subcategory": "Athletics",
-            "nationality": nationality or "UNK",
-            "gender": gender,
-            "details": new_details,
-            "date_of_birth": dob
-        }
-        insert_res = supabase.table("entities").insert(payload).execute()
-        return insert_res.data[0]["id"]
+        entity_id = _insert_entity(record)
+        write_stats.add("entities", "inserted")
+    _remember_entity_hashes([record], {target_slug: entity_id})
+    return entity_id
+
+# 🟢 NEW: Batch version of upsert_entity (one SELECT + at most two writes per chunk)
+ENTITY_BULK_CHUNK = 200
+
+def _collapse_entity_records(records):
+    # Collapse repeats of the same athlete (later records win, like sequential calls)
+    prepared = {}
+    for data in records:
+        record = _prepare_entity_record(data)
+        if not record["name"]: continue
+        seen = prepared.get(record["target_slug"])
+        if seen:
+            seen["details"] = {**seen["details"], **record["details"]}
+            seen["defaults"] = {**seen["defaults"], **record["defaults"]}
+            seen["dob"] = seen["dob"] or record["dob"]
+        else:
+            prepared[record["target_slug"]] = record
+    return list(prepared.values())
+
+def _cached_entity_rows(chunk):
+    """Returns (rows found in the cache by slug, slugs that still need a query)."""
+    by_slug = {}
+    lookup = set()
+    for record in chunk:
+        cached = entity_cache.get(record["target_slug"])
+        if cached:
+            by_slug[record["target_slug"]] = cached
+            continue
+        lookup.add(record["target_slug"])
+        if record["nationality"]:
+            cached = entity_cache.get(record["fallback_slug"])
+            if cached: by_slug[record["fallback_slug"]] = cached
+            else: lookup.add(record["fallback_slug"])
+    return by_slug, lookup
+
+def _plan_entity_writes(chunk, by_slug):
+    """
+    Merges a chunk against the rows found for it.
+    Returns (updates as (row, payload) pairs, insert payloads, {slug: id} of existing rows).
+    """
+    updates = []
+    inserts = []
+    slug_to_id = {}
+    claimed_fallbacks = set()
+    for record in chunk:
+        target_slug = record["target_slug"]
+        existing_data = by_slug.get(target_slug)
+        update_payload = {}
+        if not existing_data and record["nationality"] and record["fallback_slug"] not in claimed_fallbacks:
+            existing_data = by_slug.get(record["fallback_slug"])
+            if existing_data:
+                # The first athlete to claim an '-unk' row takes it over
+                claimed_fallbacks.add(record["fallback_slug"])
+                update_payload = {"slug": target_slug, "nationality": record["nationality"]}
+
+        if existing_data:
+            update_payload.update(_merge_entity_update(existing_data, record["details"], record["dob"], record["defaults"]))
+            if update_payload:
+                updates.append((existing_data, update_payload))
+            slug_to_id[target_slug] = existing_data["id"]
+        else:
+            inserts.append(_new_entity_payload(record))
+    return updates, inserts, slug_to_id
+
+def _entity_update_rows(updates):
+    # Full projected rows, so the upsert never needs missing NOT NULL columns
+    columns = ENTITY_COLUMNS.split(",")
+    return [{c: {**row, **payload}.get(c) for c in columns} for row, payload in updates]
+
+def _cache_entity_writes(updates, inserted_rows, slug_to_id):
+    for row, payload in updates:
+        _cache_written_row(row, payload, old_slug=row["slug"])
+    for row in inserted_rows or []:
+        slug_to_id[row["slug"]] = row["id"]
+        entity_cache.put(row)
+
+def _count_entity_writes(chunk, updates, inserted_rows, slug_to_id):
+    inserted = len(inserted_rows or [])
+    write_stats.add("entities", "inserted", inserted)
+    write_stats.add("entities", "updated", len(updates))
+    write_stats.add("entities", "unchanged", len(chunk) - inserted - len(updates))
+    _remember_entity_hashes(chunk, slug_to_id)
+
+@tracked_operation()
+def upsert_entities_bulk(records, chunk_size=ENTITY_BULK_CHUNK):
+    """
+    Bulk Upsert with the same 'UNK' merging and details/DOB rules as upsert_entity.
+    Accepts the same dicts upsert_entity does and returns {slug: entity_id},
+    keyed by create_slug(name, nationality) of each record.
+    """
+    pending, slug_to_id = _skip_unchanged_entities(_collapse_entity_records(records))
+
+    for i in range(0, len(pending), chunk_size):
+        chunk = pending[i:i + chunk_size]
+
+        # 1. Resolve target + fallback slugs: cache first, then one query for the rest
+        by_slug, lookup = _cached_entity_rows(chunk)
+        if lookup:
+            try:
+                res = supabase.table("entities").select(ENTITY_COLUMNS).in_("slug", list(lookup)).execute()
+            except Exception as e:
+                print(f"Error querying Supabase: {e}")
+                continue
+            for row in res.data or []:
+                by_slug[row["slug"]] = row
+                entity_cache.put(row)
+
+        # 2. Merge in memory
+        updates, inserts, found = _plan_entity_writes(chunk, by_slug)
+        slug_to_id.update(found)
+
+        # 3. Write back
+        try:
+            if updates:
+                supabase.table("entities").upsert(_entity_update_rows(updates), on_conflict="id").execute()
+            inserted = []
+            if inserts:
+                inserted = supabase.table("entities").upsert(inserts, on_conflict="slug").execute().data
+            _cache_entity_writes(updates, inserted, slug_to_id)
+            _count_entity_writes(chunk, updates, inserted, slug_to_id)
+        except Exception as e:
+            print(f"Error bulk upserting entities: {e}")
+
+    return slug_to_id
+
+def _athlete_image_payload(entity_id, public_url):
+    return {
+        "entity_id": entity_id,
+        "image_url": public_url,
+        "updated_at": "now()"
+    }
 
+@tracked_operation()
 def upsert_athlete_image(entity_id, public_url):
     try:
-        supabase.table("entity_images").upsert({
-            "entity_id": entity_id,
-            "image_url": public_url,
-            "updated_at": "now()"
-        }, on_conflict="entity_id").execute()
+        supabase.table("entity_images").upsert(
+            _athlete_image_payload(entity_id, public_url), on_conflict="entity_id"
+        ).execute()
     except Exception as e:
         print(f"   ❌ Database update failed: {e}")
 
-# 🟢 NEW: Find or Create the Main 'Decathlon' Card
-def get_or_create_parent_event(entity_id, meet_name, date_iso, combined_type):
+# --- 4. COMBINED-EVENT PARENT RESOLVER ---
+def _parent_event_key(combined_type, meet_name):
     # Unique key for the summary card: "Decathlon|Overall|Meet Name"
-    parent_key = f"{combined_type}|Overall|{meet_name}"
-    
-    # 1. Check if it exists
-    res = supabase.table("events").select("id").match({
-        "entity_id": entity_id,
-        "event_key": parent_key
-    }).execute()
-    
-    if res.data:
-        return res.data[0]['id']
+    return f"{combined_type}|Overall|{meet_name}"
 
-    # 2. Create if missing
-    new_parent = {
-        "entity_id": entity_id,
-        "title": combined_type, # Just "Decathlon"
-        "start_time": f"{date_iso}T00:00:00Z",
-        "category": "Athletics",
-        "status": "completed",
-        "event_key": parent_key,
-        "is_parent": True,
-        "result": {"status": "Aggregated"} 
-    }
-    
-    ins = supabase.table("events").insert(new_parent).execute()
-    return ins.data[0]['id']
+class ParentEventResolver:
+    """
+    Run-scoped cache of parent ('Decathlon') card ids keyed by (entity_id, parent_key).
+    Misses are looked up together and the missing cards are created in one bulk upsert,
+    whose response already carries the new ids.
+    """
+    def __init__(self, chunk_size=200):
+        self.chunk_size = chunk_size
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def remember(self, entity_id, parent_key, event_id):
+        with self._lock:
+            self._ids[(entity_id, parent_key)] = event_id
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+
+    def resolve(self, entity_id, meet_name, date_iso, combined_type):
+        key = (entity_id, _parent_event_key(combined_type, meet_name))
+        return self.resolve_many([(entity_id, meet_name, date_iso, combined_type)]).get(key)
+
+    def split(self, requests):
+        """Returns ({key: id} already cached, {key: new parent payload} still to resolve)."""
+        resolved = {}
+        missing = {}
+        for entity_id, meet_name, date_iso, combined_type in requests:
+            key = (entity_id, _parent_event_key(combined_type, meet_name))
+            if key in self._ids:
+                resolved[key] = self._ids[key]
+            elif key not in missing:
+                missing[key] = {
+                    "entity_id": entity_id,
+                    "title": combined_type, # Just "Decathlon"
+                    "start_time": f"{date_iso}T00:00:00Z",
+                    "category": "Athletics",
+                    "status": "completed",
+                    "event_key": key[1],
+                    "is_parent": True,
+                    "result": {"status": "Aggregated"}
+                }
+        return resolved, missing
+
+    def absorb(self, rows, chunk, resolved):
+        """Records returned rows as resolved and drops them from `chunk`."""
+        for row in rows or []:
+            key = (row["entity_id"], row["event_key"])
+            if key in chunk:
+                self.remember(*key, row["id"])
+                resolved[key] = row["id"]
+                del chunk[key]
+
+    def resolve_many(self, requests):
+        """
+        requests: iterable of (entity_id, meet_name, date_iso, combined_type).
+        Returns {(entity_id, parent_key): parent_id}.
+        """
+        resolved, missing = self.split(requests)
+
+        pending = list(missing.items())
+        for i in range(0, len(pending), self.chunk_size):
+            chunk = dict(pending[i:i + self.chunk_size])
+
+            # 1. Which of these cards already exist? (never overwrite a real summary result)
+            self.absorb(self._existing(chunk).data, chunk, resolved)
+
+            # 2. Create the rest in one upsert. ignore_duplicates leaves a card another writer
+            # created in the meantime untouched; it comes back without a row, so look it up again
+            if chunk:
+                ins = supabase.table("events").upsert(
+                    list(chunk.values()), on_conflict="entity_id,event_key", ignore_duplicates=True
+                ).execute()
+                self.absorb(ins.data, chunk, resolved)
+            if chunk:
+                self.absorb(self._existing(chunk).data, chunk, resolved)
+        return resolved
+
+    def _existing(self, chunk):
+        return supabase.table("events").select("id, entity_id, event_key")\
+            .in_("entity_id", list({k[0] for k in chunk}))\
+            .in_("event_key", list({k[1] for k in chunk}))\
+            .execute()
+
+parent_resolver = ParentEventResolver()
+
+# 🟢 NEW: Find or Create the Main 'Decathlon' Card
+@tracked_operation()
+def get_or_create_parent_event(entity_id, meet_name, date_iso, combined_type):
+    return parent_resolver.resolve(entity_id, meet_name, date_iso, combined_type)
 
 # 🟢 UPDATED: Handles Parent/Child Linking
-def upsert_event(entity_id, event_data, combined_context=None):
+def build_event_payload(entity_id, event_data, combined_context=None, defer_parent=False):
+    """
+    With defer_parent=True a sub-event's parent is not resolved here; the payload carries a
+    "_parent" request instead, which EventBuffer resolves for a whole flush at once.
+    """
     iso_timestamp = f"{event_data['date']}T00:00:00Z"
     full_title = event_data["meet_name"]
 
@@ -156,6 +1110,7 @@ def upsert_event(entity_id, event_data, combined_context=None):
             event_key = f"{disc}|{rnd}".strip("|") if (disc or rnd) else full_title
 
     parent_id = None
+    parent_request = None
     is_parent = False
     
     # Logic: If this is a Decathlon sub-event, link it to the main card
@@ -164,10 +1119,13 @@ def upsert_event(entity_id, event_data, combined_context=None):
         
         if combined_context['is_child']:
             # Find/Create the Parent Card
-            parent_id = get_or_create_parent_event(entity_id, full_title, event_data['date'], c_type)
+            if defer_parent:
+                parent_request = (entity_id, full_title, event_data['date'], c_type)
+            else:
+                parent_id = get_or_create_parent_event(entity_id, full_title, event_data['date'], c_type)
         else:
             # This IS the Summary Card
-            event_key = f"{c_type}|Overall|{full_title}"
+            event_key = _parent_event_key(c_type, full_title)
             is_parent = True
             full_title = c_type 
 
@@ -182,74 +1140,153 @@ def upsert_event(entity_id, event_data, combined_context=None):
         "parent_event_id": parent_id,
         "is_parent": is_parent
     }
+    if parent_request: payload["_parent"] = parent_request
+    return payload
+
+def _remember_parent_rows(rows):
+    # Summary cards written by us seed the resolver, so their sub-events never look them up
+    for row in rows or []:
+        if row.get("is_parent") and row.get("id"):
+            parent_resolver.remember(row["entity_id"], row["event_key"], row["id"])
+
+@tracked_operation()
+def upsert_event(entity_id, event_data, combined_context=None):
+    buffer = _active_event_buffer
+    payload = build_event_payload(entity_id, event_data, combined_context, defer_parent=buffer is not None)
+
+    # 🟢 Same content as the last successful write: nothing to send
+    if _unchanged_event(payload):
+        write_stats.add("events", "skipped")
+        return
+
+    # 🟢 Inside `with EventBuffer():` the write is queued and sent in bulk
+    if buffer is not None:
+        buffer.add(payload)
+        return
 
     try:
-        supabase.table("events").upsert(
+        res = supabase.table("events").upsert(
             payload,
             on_conflict="entity_id,event_key"
         ).execute()
+        _remember_parent_rows(res.data)
+        _count_event_writes([payload])
     except Exception as e:
         print(f"Error upserting event: {e}")
 
-def standardize_event_name(name):
+# --- 5. WRITE-BEHIND EVENT BUFFER ---
+_active_event_buffer = None
+
+class EventBuffer:
     """
-    Centralized logic to clean event names from any source (URL slugs, Result tables, CSVs).
-    Input examples: "shot-put", "Women's 100m Final", "10000m", "3000mSC"
-    Output examples: "Shot Put", "100m", "10,000m", "3,000mSC"
+    Collects event payloads and writes them with bulk upserts.
+
+        with EventBuffer(chunk_size=500) as events:
+            ... upsert_event(...) calls are queued here ...
+
+    Payloads are deduped on (entity_id, event_key) so the last write wins.
+    Transient failures are retried by execute_request. A chunk rejected outright (bad row,
+    constraint violation) is split in half until the bad rows are isolated; those end up in
+    `failed_rows` instead of taking the whole chunk down.
     """
-    if not name: return ""
-    
-    # 1. Normalize basic text
-    name = name.lower()
-    name = name.replace("short track", "")
-    name = name.replace("cross country", "XC")
-    # Remove noise words often found in result tables
-    name = re.sub(r"\b(women's|men's|women|men|final|heats|heat|semi-final|round \d+|qualification|group [a-z]|senior race|u20 race|race)\b", "", name)
-    name = re.sub(r"\s+", " ", name).strip()
-    
-    # 2. Map Common Shortcodes & Slugs
-    slug_map = {
-        "sp": "Shot Put", "shotput": "Shot Put", "shot-put": "Shot Put",
-        "dt": "Discus", "discus": "Discus", "discus-throw": "Discus",
-        "jt": "Javelin", "javelin": "Javelin", "javelin-throw": "Javelin",
-        "ht": "Hammer Throw", "hammer": "Hammer Throw", "hammer-throw": "Hammer Throw",
-        "lj": "Long Jump", "longjump": "Long Jump", "long-jump": "Long Jump",
-        "tj": "Triple Jump", "triplejump": "Triple Jump", "triple-jump": "Triple Jump",
-        "hj": "High Jump", "highjump": "High Jump", "high-jump": "High Jump",
-        "pv": "Pole Vault", "polevault": "Pole Vault", "pole-vault": "Pole Vault",
-        "wt": "Weight Throw", "weightthrow": "Weight Throw", "weight-throw": "Weight Throw",
-        "dec": "Decathlon", "hep": "Heptathlon", "pen": "Pentathlon"
-    }
-    if name in slug_map:
-        return slug_map[name]
+    def __init__(self, chunk_size=500, flush_interval=30.0):
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.stats = {"queued": 0, "written": 0, "failed": 0, "requests": 0}
+        self.failed_rows = []
+        self._pending = OrderedDict()
+        self._hashes = {}  # (entity_id, event_key) -> content hash as queued (before parent linking)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._stop = threading.Event()
+        self._ticker = None
+        self._previous = None
 
-    # 3. Hurdles Standardization
-    if "110m" in name and "hurdles" in name: return "110mH"
-    if "100m" in name and "hurdles" in name: return "100mH"
-    if "400m" in name and "hurdles" in name: return "400mH"
-    
-    # 4. Steeplechase
-    if "3000m" in name and "steeplechase" in name: return "3,000mSC"
-    if "2000m" in name and "steeplechase" in name: return "2,000mSC"
-
-    # 5. Walks
-    if "walk" in name:
-        if "20km" in name: return "20km Walk"
-        if "35km" in name: return "35km Walk"
-        if "50km" in name: return "50km Walk"
-        if "10000" in name: return "10,000m Walk"
-        # Generic fallback
-        return name.replace("walk", " Walk").title()
-
-    # 6. Distance Formatting (Add commas: 10000m -> 10,000m)
-    # Fix spacing first: "10000 m" -> "10000m"
-    name = name.replace("metres", "m").replace("meters", "m")
-    name = re.sub(r"(\d)\s+m\b", r"\1m", name)
-    
-    match = re.match(r"^(\d+)m$", name)
-    if match:
-        dist = int(match.group(1))
-        return f"{dist:,}m"
+    def add(self, payload):
+        key = (payload["entity_id"], payload["event_key"])
+        digest = _event_hash(payload) if write_hashes is not None else None
+        with self._lock:
+            if digest is not None: self._hashes[key] = digest
+            self._pending.pop(key, None)
+            self._pending[key] = payload
+            self.stats["queued"] += 1
+            due = len(self._pending) >= self.chunk_size
+        if due: self.flush()
+
+    def __len__(self):
+        return len(self._pending)
+
+    @tracked_operation("EventBuffer.flush")
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                rows = list(self._pending.values())
+                self._pending.clear()
+                self._last_flush = time.monotonic()
+            self._link_parents(rows)
+            for i in range(0, len(rows), self.chunk_size):
+                self._write_chunk(rows[i:i + self.chunk_size])
+
+    def _link_parents(self, rows):
+        children = [r for r in rows if "_parent" in r]
+        if not children: return
+        try:
+            parent_ids = parent_resolver.resolve_many(r["_parent"] for r in children)
+        except Exception as e:
+            # Children still get written; the combined-events fix links them afterwards
+            print(f"Error resolving parent events: {e}")
+            parent_ids = {}
+        for row in children:
+            entity_id, meet_name, _, c_type = row.pop("_parent")
+            row["parent_event_id"] = parent_ids.get((entity_id, _parent_event_key(c_type, meet_name)))
+
+    def _take_hashes(self, rows):
+        with self._lock:
+            return [self._hashes.pop((row["entity_id"], row["event_key"]), None) for row in rows]
+
+    def _write_chunk(self, rows):
+        self.stats["requests"] += 1
+        try:
+            # Transient errors were already retried (with backoff and the breaker) in execute_request
+            res = supabase.table("events").upsert(rows, on_conflict="entity_id,event_key").execute()
+        except Exception as e:
+            if len(rows) > 1 and not is_retryable_error(e):
+                # Bisect: the backend rejected something in this chunk, isolate the bad rows
+                mid = len(rows) // 2
+                self._write_chunk(rows[:mid])
+                self._write_chunk(rows[mid:])
+                return
+            self._take_hashes(rows)
+            self.stats["failed"] += len(rows)
+            self.failed_rows.extend(rows)
+            label = rows[0].get("event_key") if len(rows) == 1 else f"chunk of {len(rows)}"
+            print(f"Error upserting event {label}: {e}")
+            return
+        _remember_parent_rows(res.data)
+        self.stats["written"] += len(rows)
+        _count_event_writes([{**row, "_hash": digest} for row, digest in zip(rows, self._take_hashes(rows))])
+
+    def _tick(self):
+        while not self._stop.wait(min(self.flush_interval, 1.0)):
+            if self._pending and time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def __enter__(self):
+        global _active_event_buffer
+        self._previous = _active_event_buffer
+        _active_event_buffer = self
+        if self.flush_interval:
+            self._stop.clear()
+            self._ticker = threading.Thread(target=self._tick, daemon=True)
+            self._ticker.start()
+        return self
 
-    # 7. Fallback Title Case
-    return name.title()
\ No newline at end of file
+    def __exit__(self, exc_type, exc, tb):
+        global _active_event_buffer
+        self._stop.set()
+        if self._ticker: self._ticker.join()
+        _active_event_buffer = self._previous
+        self.flush()
+        print(f"📦 Event buffer: {self.stats['written']} written in {self.stats['requests']} requests, {self.stats['failed']} failed.")
+        return False
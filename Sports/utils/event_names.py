@@ -0,0 +1,93 @@
+import re
+from functools import lru_cache
+
+# ==========================================
+# 🏷️ EVENT NAME NORMALIZATION
+# ==========================================
+# Same rules as the original standardize_event_name, with the regexes and the slug map built
+# once at import time. Results/rankings tables repeat the same few dozen labels thousands of
+# times, so the scalar entry point is memoized and the column version normalizes each distinct
+# label only once. audits/audit_event_names.py checks the output against the original function.
+
+# Remove noise words often found in result tables
+_NOISE_WORDS = re.compile(r"\b(women's|men's|women|men|final|heats|heat|semi-final|round \d+|qualification|group [a-z]|senior race|u20 race|race)\b")
+_WHITESPACE = re.compile(r"\s+")
+_SPACED_METRES = re.compile(r"(\d)\s+m\b")
+_PLAIN_DISTANCE = re.compile(r"^(\d+)m$")
+
+# Common Shortcodes & Slugs
+SLUG_MAP = {
+    "sp": "Shot Put", "shotput": "Shot Put", "shot-put": "Shot Put",
+    "dt": "Discus", "discus": "Discus", "discus-throw": "Discus",
+    "jt": "Javelin", "javelin": "Javelin", "javelin-throw": "Javelin",
+    "ht": "Hammer Throw", "hammer": "Hammer Throw", "hammer-throw": "Hammer Throw",
+    "lj": "Long Jump", "longjump": "Long Jump", "long-jump": "Long Jump",
+    "tj": "Triple Jump", "triplejump": "Triple Jump", "triple-jump": "Triple Jump",
+    "hj": "High Jump", "highjump": "High Jump", "high-jump": "High Jump",
+    "pv": "Pole Vault", "polevault": "Pole Vault", "pole-vault": "Pole Vault",
+    "wt": "Weight Throw", "weightthrow": "Weight Throw", "weight-throw": "Weight Throw",
+    "dec": "Decathlon", "hep": "Heptathlon", "pen": "Pentathlon"
+}
+
+# (distance, keyword) -> label, checked in this order
+_HURDLES = (("110m", "110mH"), ("100m", "100mH"), ("400m", "400mH"))
+_STEEPLECHASE = (("3000m", "3,000mSC"), ("2000m", "2,000mSC"))
+_WALKS = (("20km", "20km Walk"), ("35km", "35km Walk"), ("50km", "50km Walk"), ("10000", "10,000m Walk"))
+
+@lru_cache(maxsize=8192)
+def standardize_event_name(name):
+    """
+    Centralized logic to clean event names from any source (URL slugs, Result tables, CSVs).
+    Input examples: "shot-put", "Women's 100m Final", "10000m", "3000mSC"
+    Output examples: "Shot Put", "100m", "10,000m", "3,000mSC"
+    """
+    if not name: return ""
+
+    # 1. Normalize basic text
+    name = name.lower().replace("short track", "").replace("cross country", "XC")
+    name = _WHITESPACE.sub(" ", _NOISE_WORDS.sub("", name)).strip()
+
+    # 2. Map Common Shortcodes & Slugs
+    mapped = SLUG_MAP.get(name)
+    if mapped: return mapped
+
+    # 3. Hurdles Standardization
+    if "hurdles" in name:
+        for dist, label in _HURDLES:
+            if dist in name: return label
+
+    # 4. Steeplechase
+    if "steeplechase" in name:
+        for dist, label in _STEEPLECHASE:
+            if dist in name: return label
+
+    # 5. Walks
+    if "walk" in name:
+        for dist, label in _WALKS:
+            if dist in name: return label
+        # Generic fallback
+        return name.replace("walk", " Walk").title()
+
+    # 6. Distance Formatting (Add commas: 10000m -> 10,000m)
+    # Fix spacing first: "10000 m" -> "10000m"
+    name = _SPACED_METRES.sub(r"\1m", name.replace("metres", "m").replace("meters", "m"))
+
+    match = _PLAIN_DISTANCE.match(name)
+    if match:
+        return f"{int(match.group(1)):,}m"
+
+    # 7. Fallback Title Case
+    return name.title()
+
+def standardize_event_names(values):
+    """
+    Column version of standardize_event_name.
+    A pandas Series comes back as a Series on the same index (missing values -> ""),
+    any other iterable as a list. Each distinct label is normalized once.
+    """
+    if hasattr(values, "map") and hasattr(values, "unique"):
+        mapping = {v: standardize_event_name(v) for v in values.dropna().unique()}
+        return values.map(mapping, na_action="ignore").fillna("")
+    values = list(values)
+    mapping = {v: standardize_event_name(v) for v in set(values) if v is not None}
+    return [mapping.get(v, "") if v is not None else "" for v in values]
@@ -0,0 +1,221 @@
+import re
+import sys
+import unicodedata
+from array import array
+from datetime import date
+
+# ==========================================
+# 🪪 ATHLETE IDENTITY INDEX
+# ==========================================
+# Compact in-memory index of (id, name, nationality, DOB) for the whole `entities` table.
+#   - Names live in one UTF-8 blob (+ offsets), nationality codes are interned into a small
+#     table, DOBs are day ordinals and ids are packed into an array when they are integers.
+#   - Every athlete gets one entry per blocking key kind (see KINDS). Entries are chained in an
+#     open-addressing hash table made of arrays, so candidate lookup is O(1) without a dict of
+#     lists per key. A few hundred thousand athletes take tens of MB.
+#
+#   index = IdentityIndex.from_rows(iter_rows("entities", "id,name,nationality,date_of_birth"))
+#   index.candidates("THOMPSON Kishane", kind="tokens")  -> [positions]
+#   index.groups("name")                                 -> [[positions], ...] (duplicate names)
+
+KINDS = (
+    "name",             # name.strip().lower() -- what the duplicate audits have always grouped on
+    "slug",             # create_slug() of the name alone -- rows sharing it share a slug per nationality
+    "folded",           # accents folded to ASCII, punctuation dropped: "José O'Neil" -> "jose o neil"
+    "tokens",           # sorted folded tokens: "THOMPSON Kishane" == "Kishane THOMPSON"
+    "surname_initial",  # surname (UPPERCASE part on World Athletics, else last word) + first initial
+)
+_K = len(KINDS)
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_SLUG_STRIP = re.compile(r"[^a-z0-9\s-]")
+_SLUG_SPACES = re.compile(r"[\s]+")
+
+def fold_ascii(text):
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii").lower()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+def blocking_key(kind, name):
+    name = (name or "").strip()
+    if kind == "name": return name.lower()
+    if kind == "slug":
+        # Exactly create_slug(name, nat) minus its "-<nat>" suffix, whatever punctuation the name ends on
+        return _SLUG_SPACES.sub("-", _SLUG_STRIP.sub("", f"{name} x".lower()))[:-2]
+    if kind == "folded": return fold_ascii(name)
+    if kind == "tokens": return " ".join(sorted(fold_ascii(name).split()))
+    if kind == "surname_initial":
+        parts = name.split()
+        if not parts: return ""
+        surname = [p for p in parts if len(p) > 1 and p.isupper()] or parts[-1:]
+        given = [p for p in parts if p not in surname]
+        initial = fold_ascii(given[0])[:1] if given else ""
+        return f"{fold_ascii(' '.join(surname))} {initial}".strip()
+    raise ValueError(f"Unknown blocking key kind: {kind}")
+
+def _key_hash(kind_no, key):
+    return (hash((kind_no, key)) & 0x7FFFFFFFFFFFFFFF) or 1
+
+def _dob_ordinal(value):
+    try: return date.fromisoformat(str(value)[:10]).toordinal() if value else 0
+    except ValueError: return 0
+
+class IdentityIndex:
+    def __init__(self, expected_size=1024):
+        self._names = bytearray()
+        self._name_ends = array("I")
+        self._int_ids = array("q")
+        self._obj_ids = None          # switches to a list if an id is not an int (uuid, ...)
+        self._nat = array("H")
+        self._nat_codes = [None]
+        self._nat_lookup = {None: 0}
+        self._dob = array("i")
+        self._id_positions = None     # built lazily by position_of()
+        # Hash table: one entry per (position, kind); entry e belongs to position e // _K
+        self._entry_next = array("i")
+        self._alloc_slots(expected_size * _K)
+
+    def _alloc_slots(self, entries):
+        capacity = 1 << max(10, (entries * 4 // 3).bit_length())
+        self._slot_hash = array("q", bytes(8 * capacity))
+        self._slot_head = array("i", [-1]) * capacity
+        self._mask = capacity - 1
+        self._used = 0
+
+    def __len__(self):
+        return len(self._name_ends)
+
+    # --- building ---
+    @classmethod
+    def from_rows(cls, rows, expected_size=1024):
+        """rows: dicts with id, name and optionally nationality / date_of_birth (any iterable, streamed)."""
+        index = cls(expected_size)
+        for row in rows:
+            index.add(row["id"], row.get("name"), row.get("nationality"), row.get("date_of_birth"))
+        return index
+
+    def add(self, entity_id, name, nationality=None, date_of_birth=None):
+        pos = len(self._name_ends)
+        self._names += (name or "").encode("utf-8")
+        self._name_ends.append(len(self._names))
+        if self._obj_ids is None and isinstance(entity_id, int) and not isinstance(entity_id, bool):
+            self._int_ids.append(entity_id)
+        else:
+            if self._obj_ids is None: self._obj_ids = list(self._int_ids)
+            self._obj_ids.append(sys.intern(entity_id) if isinstance(entity_id, str) else entity_id)
+        code = nationality or None
+        if code not in self._nat_lookup:
+            self._nat_lookup[code] = len(self._nat_codes)
+            self._nat_codes.append(code)
+        self._nat.append(self._nat_lookup[code])
+        self._dob.append(_dob_ordinal(date_of_birth))
+        self._id_positions = None
+
+        for kind_no, kind in enumerate(KINDS):
+            self._link(pos * _K + kind_no, _key_hash(kind_no, blocking_key(kind, name)))
+        if self._used * 4 > (self._mask + 1) * 3:
+            self._rehash()
+        return pos
+
+    def _find_slot(self, h):
+        i = h & self._mask
+        slot_hash = self._slot_hash
+        while slot_hash[i] and slot_hash[i] != h:
+            i = (i + 1) & self._mask
+        return i
+
+    def _link(self, entry, h):
+        i = self._find_slot(h)
+        if not self._slot_hash[i]:
+            self._slot_hash[i] = h
+            self._used += 1
+        if entry == len(self._entry_next): self._entry_next.append(self._slot_head[i])
+        else: self._entry_next[entry] = self._slot_head[i]
+        self._slot_head[i] = entry
+
+    def _rehash(self):
+        # Key hashes are not stored (saves 8 bytes per entry); they are recomputed from the names
+        self._alloc_slots(len(self._entry_next) * 2)
+        for pos in range(len(self)):
+            name = self.name(pos)
+            for kind_no, kind in enumerate(KINDS):
+                self._link(pos * _K + kind_no, _key_hash(kind_no, blocking_key(kind, name)))
+
+    # --- reading ---
+    def name(self, pos):
+        start = self._name_ends[pos - 1] if pos else 0
+        return self._names[start:self._name_ends[pos]].decode("utf-8")
+
+    def entity_id(self, pos):
+        return self._obj_ids[pos] if self._obj_ids is not None else self._int_ids[pos]
+
+    def nationality(self, pos):
+        return self._nat_codes[self._nat[pos]]
+
+    def date_of_birth(self, pos):
+        ordinal = self._dob[pos]
+        return date.fromordinal(ordinal).isoformat() if ordinal else None
+
+    def record(self, pos):
+        return {"id": self.entity_id(pos), "name": self.name(pos),
+                "nationality": self.nationality(pos), "date_of_birth": self.date_of_birth(pos)}
+
+    def position_of(self, entity_id):
+        if self._id_positions is None:
+            ids = self._obj_ids if self._obj_ids is not None else self._int_ids
+            self._id_positions = {v: p for p, v in enumerate(ids)}
+        return self._id_positions.get(entity_id)
+
+    # --- lookups ---
+    def candidates(self, name, kind="tokens", nationality=None):
+        """Positions whose `kind` blocking key equals that of `name` (optionally same nationality)."""
+        kind_no = KINDS.index(kind)
+        key = blocking_key(kind, name)
+        if not key: return []
+        wanted = nationality or "UNK"
+        i = self._find_slot(_key_hash(kind_no, key))
+        out = []
+        entry = self._slot_head[i] if self._slot_hash[i] else -1
+        while entry != -1:
+            pos = entry // _K
+            if entry % _K == kind_no and blocking_key(kind, self.name(pos)) == key:
+                if nationality is None or (self.nationality(pos) or "UNK") == wanted:
+                    out.append(pos)
+            entry = self._entry_next[entry]
+        out.reverse()
+        return out
+
+    def find(self, name, nationality=None, kinds=KINDS):
+        """Union of candidates over several kinds, strongest kind first, without repeats."""
+        seen, out = set(), []
+        for kind in kinds:
+            for pos in self.candidates(name, kind, nationality):
+                if pos not in seen:
+                    seen.add(pos)
+                    out.append(pos)
+        return out
+
+    def groups(self, kind="name", min_size=2):
+        """Every bucket of `kind` holding at least min_size athletes, in order of first appearance."""
+        kind_no = KINDS.index(kind)
+        out = []
+        for i in range(self._mask + 1):
+            if not self._slot_hash[i]: continue
+            entry = self._slot_head[i]
+            if entry == -1 or entry % _K != kind_no: continue
+            members = []
+            while entry != -1:
+                members.append(entry // _K)
+                entry = self._entry_next[entry]
+            if len(members) < min_size or not blocking_key(kind, self.name(members[0])): continue
+            # Split the (astronomically rare) 63-bit hash collisions back apart
+            by_key = {}
+            for pos in reversed(members):
+                by_key.setdefault(blocking_key(kind, self.name(pos)), []).append(pos)
+            out.extend(g for g in by_key.values() if len(g) >= min_size)
+        out.sort(key=lambda g: g[0])
+        return out
+
+    def memory_bytes(self):
+        arrays = (self._name_ends, self._int_ids, self._nat, self._dob, self._entry_next, self._slot_hash, self._slot_head)
+        total = len(self._names) + sum(a.itemsize * len(a) for a in arrays)
+        if self._obj_ids is not None: total += sum(sys.getsizeof(v) + 8 for v in self._obj_ids)
+        return total
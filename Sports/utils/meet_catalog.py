@@ -0,0 +1,271 @@
+import os
+import csv
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+# ==========================================
+# 📅 MEET CATALOG
+# ==========================================
+# Every meet the calendar scraper (WorldAthleticsEvents.py) has ever seen, in one SQLite file:
+# one row per meet keyed by its results URL, however many calendar pulls or competition groups
+# listed it. Groups are merged, dates / venue / status follow the latest pull. Meets without a
+# results link yet are kept under a name|start|venue key until the link shows up.
+#
+#   catalog = MeetCatalog()                          # data/meet_catalog.sqlite
+#   catalog.upsert_many([{"result_url": ..., "name": ..., "start_date": ..., "end_date": ...,
+#                         "venue": ..., "country": ..., "discipline": ..., "group": ...}])
+#   catalog.pending(until="2025-08-31", progress_path=progress.path)   # [(url, start_date, rescrape)]
+#
+# Older world_athletics_events*.csv pulls are merged in by import_csvs() (each file once).
+#
+# Incremental sync: sync(meets, windows) diffs a harvest against the catalog and records only
+# what is new, changed or cancelled (gone from a window we re-read) in the `changes` feed and in
+# meets.changed_at; pending() hands changed meets back to the results scraper. Watermarks such
+# as the last sync and the season-sweep cursor live in `sync_state` (get_state / set_state).
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CATALOG_PATH = os.path.abspath(os.path.join(BASE_DIR, "..", "data", "meet_catalog.sqlite"))
+DATA_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "data"))
+GROUP_SEPARATOR = "; "
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+def _placeholder_key(meet):
+    return f"{meet.get('name') or ''}|{meet.get('start_date') or ''}|{meet.get('venue') or ''}"
+
+def meet_key(meet):
+    return meet.get("result_url") or _placeholder_key(meet)
+
+class MeetCatalog:
+    COLUMNS = ("name", "raw_date", "start_date", "end_date", "venue", "country", "discipline")
+
+    def __init__(self, path=DEFAULT_CATALOG_PATH):
+        if path != ":memory:": os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meets (meet_key TEXT PRIMARY KEY, result_url TEXT UNIQUE, name TEXT, "
+            "raw_date TEXT, start_date TEXT, end_date TEXT, venue TEXT, country TEXT, discipline TEXT, "
+            "groups TEXT, status TEXT, first_seen TEXT, last_seen TEXT, changed_at TEXT)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(meets)")}
+        if "changed_at" not in columns: self._conn.execute("ALTER TABLE meets ADD COLUMN changed_at TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS meets_end_date ON meets (end_date)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS meets_start_date ON meets (start_date)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS imports (path TEXT PRIMARY KEY, mtime REAL, rows INTEGER)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS changes (id INTEGER PRIMARY KEY AUTOINCREMENT, meet_key TEXT, change TEXT, "
+            "fields TEXT, at TEXT)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+
+    def upsert_many(self, meets):
+        """Merges calendar rows in. Returns the number of distinct meets touched."""
+        merged = {}
+        for meet in meets:
+            key = meet_key(meet)
+            groups = {g for g in (meet.get("group") or "").split(GROUP_SEPARATOR) if g}
+            if key in merged:
+                merged[key]["groups"] |= groups
+                merged[key].update({k: v for k, v in meet.items() if v and k != "group"})
+            else:
+                merged[key] = {**{k: v for k, v in meet.items() if k != "group"}, "groups": groups}
+        if not merged: return 0
+
+        now = _now()
+        with self._lock:
+            existing = {}
+            keys = list(merged)
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT meet_key, groups FROM meets WHERE meet_key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                existing.update(rows)
+
+            self._conn.execute("BEGIN")
+            try:
+                for key, meet in merged.items():
+                    groups = meet["groups"] | set(filter(None, (existing.get(key) or "").split(GROUP_SEPARATOR)))
+                    values = [meet.get(c) or None for c in self.COLUMNS]
+                    self._conn.execute(
+                        f"INSERT INTO meets (meet_key, result_url, {', '.join(self.COLUMNS)}, groups, status, first_seen, last_seen) "
+                        f"VALUES (?, ?, {', '.join('?' * len(self.COLUMNS))}, ?, ?, ?, ?) "
+                        f"ON CONFLICT(meet_key) DO UPDATE SET "
+                        + ", ".join(f"{c} = COALESCE(excluded.{c}, {c})" for c in self.COLUMNS)
+                        + ", groups = excluded.groups, status = excluded.status, last_seen = excluded.last_seen",
+                        [key, meet.get("result_url") or None, *values, GROUP_SEPARATOR.join(sorted(groups)),
+                         "results" if meet.get("result_url") else "upcoming", now, now]
+                    )
+                    if meet.get("result_url"):
+                        # The meet got its results link: drop the row it was listed under before
+                        self._conn.execute("DELETE FROM meets WHERE meet_key = ?", (_placeholder_key(meet),))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(merged)
+
+    def import_csv(self, path):
+        """Merges one calendar CSV (WorldAthleticsEvents.py format). Returns the number of meets."""
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            meets = [{
+                "result_url": (row.get("Result Link") or "").strip(), "name": row.get("Event Name"),
+                "raw_date": row.get("Raw Date"), "start_date": row.get("Start Date"), "end_date": row.get("End Date"),
+                "venue": row.get("Venue"), "country": row.get("Country"), "discipline": row.get("Discipline"),
+                "group": row.get("Competition Group"),
+            } for row in csv.DictReader(f)]
+        for meet in meets:
+            url = meet["result_url"]
+            if url and not url.startswith("http"): meet["result_url"] = f"https://worldathletics.org{url}"
+        return self.upsert_many(meets)
+
+    def import_csvs(self, data_dir=DATA_DIR, prefix="world_athletics_events"):
+        """Merges every calendar CSV not imported yet (or changed since). Returns how many files were read."""
+        if not os.path.isdir(data_dir): return 0
+        with self._lock:
+            seen = dict(self._conn.execute("SELECT path, mtime FROM imports").fetchall())
+        read = 0
+        for name in sorted(os.listdir(data_dir)):
+            if not (name.startswith(prefix) and name.endswith(".csv")): continue
+            path = os.path.join(data_dir, name)
+            mtime = os.path.getmtime(path)
+            if seen.get(path) == mtime: continue
+            rows = self.import_csv(path)
+            with self._lock:
+                self._conn.execute("INSERT OR REPLACE INTO imports VALUES (?, ?, ?)", (path, mtime, rows))
+            read += 1
+        return read
+
+    # --- incremental sync ---
+    DIFF_FIELDS = ("result_url", "name", "start_date", "end_date", "venue", "country", "discipline")
+
+    def _rows(self, where, params):
+        cursor = self._conn.execute(
+            f"SELECT meet_key, status, groups, raw_date, {', '.join(self.DIFF_FIELDS)} FROM meets WHERE {where}", params
+        )
+        names = [d[0] for d in cursor.description]
+        return {row[0]: dict(zip(names, row)) for row in cursor.fetchall()}
+
+    def diff(self, meets, windows):
+        """
+        [(change, meet_key, fields, meet)] of a harvest against the catalog: "new", "changed" (fields that
+        differ, incl. a results link appearing) and "cancelled" (catalogued with a start date in one
+        of the harvested (start, end) windows but no longer listed).
+        """
+        incoming = {}
+        for meet in meets:
+            incoming.setdefault(meet_key(meet), meet)
+        with self._lock:
+            known = {}
+            keys = list(incoming) + [_placeholder_key(m) for m in incoming.values() if m.get("result_url")]
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                known.update(self._rows(f"meet_key IN ({','.join('?' * len(chunk))})", chunk))
+            listed = {}
+            for start, end in windows:
+                listed.update(self._rows("start_date >= ? AND start_date <= ? AND status != 'cancelled'", (start, end)))
+
+        changes, seen = [], set()
+        for key, meet in incoming.items():
+            old = known.get(key)
+            if old is None and meet.get("result_url"):
+                old = known.get(_placeholder_key(meet))
+            if old is None:
+                changes.append(("new", key, [], meet))
+                continue
+            seen.add(old["meet_key"])
+            fields = [f for f in self.DIFF_FIELDS if (meet.get(f) or None) not in (None, old[f])]
+            if old["status"] == "cancelled": fields.append("status")
+            if fields: changes.append(("changed", key, fields, meet))
+        for key, old in listed.items():
+            if key not in seen and key not in incoming:
+                changes.append(("cancelled", key, [], {**old, "group": old.pop("groups")}))
+        return changes
+
+    def sync(self, meets, windows):
+        """Upserts a harvest of `windows` and records its diff. Returns the changes."""
+        changes = self.diff(meets, windows)
+        self.upsert_many(meets)
+        now = _now()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for change, key, fields, _ in changes:
+                    if change == "cancelled":
+                        self._conn.execute("UPDATE meets SET status = 'cancelled', changed_at = ? WHERE meet_key = ?", (now, key))
+                    else:
+                        self._conn.execute("UPDATE meets SET changed_at = ? WHERE meet_key = ?", (now, key))
+                self._conn.executemany(
+                    "INSERT INTO changes (meet_key, change, fields, at) VALUES (?, ?, ?, ?)",
+                    [(key, change, ",".join(fields), now) for change, key, fields, _ in changes]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return changes
+
+    def changes_since(self, after_id=0):
+        """[(id, meet_key, change, fields, at)] from the change feed, oldest first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, meet_key, change, fields, at FROM changes WHERE id > ? ORDER BY id", (after_id,)
+            ).fetchall()
+
+    def get_state(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_state(self, key, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (key, value))
+
+    def pending(self, since=None, until=None, progress_path=None, max_attempts=None):
+        """
+        [(result_url, start_date, rescrape)] of meets with results that ended in [since, until] and
+        are not done in the ScrapeProgress file at `progress_path` (nor failed `max_attempts` times).
+        A meet that changed in the calendar after its scrape comes back with rescrape=True.
+        """
+        query = "SELECT m.result_url, m.start_date, 0 FROM meets m"
+        where, params = ["m.result_url IS NOT NULL", "m.status != 'cancelled'"], []
+        if since:
+            where.append("m.end_date >= ?")
+            params.append(since)
+        if until:
+            where.append("m.end_date <= ?")
+            params.append(until)
+        with self._lock:
+            if progress_path and os.path.exists(progress_path):
+                self._conn.execute("ATTACH DATABASE ? AS progress", (progress_path,))
+                # Only a meet the calendar changed after its last scrape attempt is flagged for a reset;
+                # a failed, unchanged meet keeps its checkpoints and attempt count
+                query = query.replace(", 0 FROM", ", COALESCE(m.changed_at > p.updated_at, 0) FROM")
+                query += " LEFT JOIN progress.meets p ON p.url = m.result_url"
+                where.append(
+                    "(p.url IS NULL OR m.changed_at > p.updated_at OR (p.status != 'done'"
+                    + (" AND p.attempts < ?))" if max_attempts else "))")
+                )
+                if max_attempts: params.append(max_attempts)
+            try:
+                rows = self._conn.execute(
+                    f"{query} WHERE {' AND '.join(where)} ORDER BY m.end_date, m.result_url", params
+                ).fetchall()
+            finally:
+                if progress_path and os.path.exists(progress_path):
+                    self._conn.execute("DETACH DATABASE progress")
+        return rows
+
+    def summary(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM meets GROUP BY status").fetchall())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,121 @@
+import time
+import threading
+from contextlib import contextmanager
+
+# ==========================================
+# 🚰 STAGE PIPELINE COUNTERS
+# ==========================================
+# Throughput counters for thread pipelines whose stages are connected by bounded queues.
+# Each stage records how long it spent working ("busy"), waiting for input ("starved": the
+# stage upstream is slower) and waiting on a full output queue ("blocked": the stage downstream
+# is slower). Under load the stage with the highest busy % is the bottleneck. Items a stage had
+# to drop are counted by reason (skip()), so nothing goes missing without a trace.
+#
+#   pipeline = Pipeline()
+#   parse = pipeline.stage("parse", in_queue=page_queue)
+#   item = parse.get(page_queue)
+#   with parse.work(): out = handle(item)
+#   parse.put(parsed_queue, out)
+#   pipeline.print_summary()
+
+def timed_call(fn, *args):
+    """(fn(*args), seconds): lets work done in a process pool still be counted by its stage."""
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+class StageStats:
+    def __init__(self, name, workers=1, in_queue=None):
+        self.name = name
+        self.workers = workers
+        self.in_queue = in_queue
+        self.items = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self.peak_depth = 0
+        self.skipped = {}
+        self._lock = threading.Lock()
+
+    def _add(self, field, seconds):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + seconds)
+
+    def get(self, q, timeout=None):
+        """q.get() that counts the wait as starved time (raises queue.Empty like q.get)."""
+        started = time.perf_counter()
+        try:
+            return q.get(timeout=timeout)
+        finally:
+            self._add("starved", time.perf_counter() - started)
+            depth = q.qsize()
+            if depth > self.peak_depth: self.peak_depth = depth
+
+    def put(self, q, item):
+        """q.put() that counts the wait on a full queue as blocked time."""
+        started = time.perf_counter()
+        q.put(item)
+        self._add("blocked", time.perf_counter() - started)
+
+    def record(self, n, seconds):
+        with self._lock:
+            self.items += n
+            self.busy += seconds
+
+    def skip(self, reason, n=1):
+        with self._lock:
+            self.skipped[reason] = self.skipped.get(reason, 0) + n
+
+    @contextmanager
+    def work(self, n=1):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(n, time.perf_counter() - started)
+
+class Pipeline:
+    def __init__(self):
+        self.stages = []
+        self.started = time.perf_counter()
+
+    def stage(self, name, workers=1, in_queue=None):
+        stats = StageStats(name, workers, in_queue)
+        self.stages.append(stats)
+        return stats
+
+    def summary(self):
+        wall = max(time.perf_counter() - self.started, 1e-9)
+        out = []
+        for s in self.stages:
+            capacity = wall * s.workers
+            out.append({
+                "stage": s.name, "workers": s.workers, "items": s.items,
+                "items_per_s": round(s.items / wall, 2),
+                "busy_pct": round(100 * s.busy / capacity, 1),
+                "starved_pct": round(100 * s.starved / capacity, 1),
+                "blocked_pct": round(100 * s.blocked / capacity, 1),
+                "queue": s.in_queue.qsize() if s.in_queue is not None else None,
+                "peak_queue": s.peak_depth if s.in_queue is not None else None,
+                "skipped": dict(s.skipped),
+            })
+        return out
+
+    def brief(self):
+        """Current input-queue depths, e.g. for a progress bar postfix."""
+        return " ".join(f"{s.name}:{s.in_queue.qsize()}" for s in self.stages if s.in_queue is not None)
+
+    def print_summary(self, printer=print):
+        lines = self.summary()
+        if not lines: return
+        bottleneck = max(lines, key=lambda line: line["busy_pct"])
+        printer(f"🚰 Pipeline stages (bottleneck: {bottleneck['stage']}):")
+        printer(f"   {'stage':<12} {'workers':>7} {'items':>7} {'items/s':>8} {'busy %':>7} {'starved %':>9} {'blocked %':>9} {'queue':>6} {'peak':>5}")
+        for line in lines:
+            queue_now = "-" if line["queue"] is None else line["queue"]
+            peak = "-" if line["peak_queue"] is None else line["peak_queue"]
+            printer(f"   {line['stage'][:12]:<12} {line['workers']:>7} {line['items']:>7} {line['items_per_s']:>8} "
+                    f"{line['busy_pct']:>7} {line['starved_pct']:>9} {line['blocked_pct']:>9} {queue_now:>6} {peak:>5}")
+        for line in lines:
+            if line["skipped"]:
+                printer(f"   ⚠️ {line['stage']} skipped: " + ", ".join(f"{n} {reason}" for reason, n in line["skipped"].items()))
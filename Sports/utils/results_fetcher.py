@@ -0,0 +1,78 @@
+import time
+
+from utils.results_parser import parse_meet_page, has_results
+
+# ==========================================
+# 🌐 HTTP-FIRST RESULTS FETCHER
+# ==========================================
+# worldathletics.org results pages are server-rendered Next.js pages: a plain GET returns the
+# rendered results tables without starting Chrome. fetch_day()
+# returns the same record parse_meet_page() builds from a browser's page_source, or None when
+# the response holds no results (blocked, client-only render, ...) and the browser is needed.
+#
+#   fetcher = ResultsFetcher()
+#   page = fetcher.fetch_day(url, day="2")  # {"meet_name", "date_text", "days", "tables"}
+#   html = fetcher.fetch_day_html(url, day="2")  # raw page, for callers that parse elsewhere
+
+USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/144.0.0.0 Safari/537.36")
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class ResultsFetcher:
+    def __init__(self, timeout=20, attempts=3, pool_size=4, page_limiter=None):
+        self.timeout = timeout
+        self.attempts = attempts
+        self.pool_size = pool_size
+        self.page_limiter = page_limiter
+        self.stats = {"http": 0, "fallback": 0}
+        self._session = None
+
+    @property
+    def session(self):
+        # Built on first use: one pooled, keep-alive session per fetcher (one per worker thread)
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            self._session = requests.Session()
+            self._session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en"})
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+        return self._session
+
+    def get_html(self, url):
+        """Page HTML, or None after `attempts` failures (429 / 5xx are retried with backoff)."""
+        for attempt in range(self.attempts):
+            if self.page_limiter:
+                wait = self.page_limiter.reserve()
+                if wait: time.sleep(wait)
+            try:
+                r = self.session.get(url, timeout=self.timeout)
+            except Exception:
+                time.sleep(2 ** attempt)
+                continue
+            if r.status_code == 200: return r.text
+            if r.status_code not in RETRY_STATUSES: return None
+            try: wait_time = float(r.headers.get("Retry-After", 2 ** attempt))
+            except ValueError: wait_time = 2 ** attempt
+            time.sleep(min(wait_time, 60))
+        return None
+
+    def fetch_day(self, url, day=None):
+        html = self.fetch_day_html(url, day)
+        return parse_meet_page(html) if html else None
+
+    def fetch_day_html(self, url, day=None):
+        """Raw HTML of one meet-day when it carries results (checked without a full parse), else None."""
+        full_url = f"{url}?day={day}" if day and day != "1" else url
+        html = self.get_html(full_url)
+        if not has_results(html):
+            self.stats["fallback"] += 1
+            return None
+        self.stats["http"] += 1
+        return html
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
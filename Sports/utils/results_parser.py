@@ -0,0 +1,288 @@
+import re
+import json
+from html.parser import HTMLParser
+
+# ==========================================
+# 🧾 WORLD ATHLETICS RESULTS PAGE PARSER
+# ==========================================
+# Pure function over one `driver.page_source` snapshot: no WebDriver round trips per table,
+# row or cell. Mirrors what the old Selenium lookups returned:
+#   event name  -> text of the nearest preceding <h2>                  (./preceding::h2[1])
+#   round label -> <strong> in the EventResults_eventMeta span before the table's tableWrap div,
+#                  else any such span in the enclosing EventResults_eventResult section
+#   rows        -> tbody tr with at least 5 td: place, name (first line), -, nationality, mark
+# Built on the standard library html.parser, so it runs anywhere (and on saved HTML in tests):
+#
+#   for table in parse_results_page(driver.page_source):
+#       table["event_name_raw"], table["round_label"], table["rows"]  # [(place, name, nat, mark)]
+#
+# parse_meet_page() adds the page header (meet name, date, day options). Results always come
+# from the rendered tables, whether the HTML is a plain HTTP response (utils/results_fetcher.py)
+# or a browser's page_source: headings and round labels feed the event keys, and the labels
+# in the __NEXT_DATA__ payload are not guaranteed to match the rendered text ("Final" vs
+# "Final A", case, spacing). The payload only fills in header fields the HTML lacks.
+# meet_days() and has_results() answer what the scraper's navigation stage needs to know
+# without building the tree, so the full parse can run in its own stage.
+
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+_SKIP_TAGS = {"script", "style", "noscript", "template"}
+# Tags Selenium's .text puts on their own line
+_BLOCK_TAGS = {"address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "fieldset", "figure", "footer",
+               "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre",
+               "section", "table", "tbody", "thead", "tfoot", "tr", "ul"}
+# Starting one of these closes an open element of the listed kinds (HTML's implied end tags),
+# searching no further out than the listed scope
+_IMPLIED_CLOSE = {
+    "td": ({"td", "th"}, {"tr", "table"}), "th": ({"td", "th"}, {"tr", "table"}),
+    "tr": ({"tr"}, {"tbody", "thead", "tfoot", "table"}),
+    "tbody": ({"tbody", "thead"}, {"table"}), "tfoot": ({"tbody", "thead"}, {"table"}),
+    "li": ({"li"}, {"ul", "ol"}), "option": ({"option"}, {"select"}),
+}
+_SPACES = re.compile(r"[ \t\r\f\v ]+")
+
+class Node:
+    __slots__ = ("tag", "attrs", "classes", "children", "parent", "order")
+
+    def __init__(self, tag, attrs, parent, order):
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = attrs.get("class") or ""
+        self.children = []
+        self.parent = parent
+        self.order = order
+
+    def iter(self, tag=None):
+        """Descendants in document order."""
+        for child in self.children:
+            if isinstance(child, Node):
+                if tag is None or child.tag == tag: yield child
+                yield from child.iter(tag)
+
+    def find(self, tag, class_part=None):
+        for node in self.iter(tag):
+            if class_part is None or class_part in node.classes: return node
+        return None
+
+    def ancestors(self):
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+    def text(self):
+        """Approximates WebElement.text: whitespace collapsed, block elements on their own lines."""
+        parts = []
+        self._collect(parts)
+        lines = (_SPACES.sub(" ", line).strip() for line in "".join(parts).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+    def _collect(self, parts):
+        for child in self.children:
+            if isinstance(child, str):
+                parts.append(child.replace("\n", " "))
+            elif child.tag == "br":
+                parts.append("\n")
+            elif child.tag in _BLOCK_TAGS:
+                parts.append("\n")
+                child._collect(parts)
+                parts.append("\n")
+            elif child.tag in ("td", "th"):
+                child._collect(parts)
+                parts.append(" ")
+            else:
+                child._collect(parts)
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {}, None, 0)
+        self._stack = [self.root]
+        self._order = 0
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._skipping or tag in _SKIP_TAGS:
+            if tag in _SKIP_TAGS: self._skipping += 1
+            return
+        if tag in _IMPLIED_CLOSE:
+            closes, scope = _IMPLIED_CLOSE[tag]
+            for i in range(len(self._stack) - 1, 0, -1):
+                open_tag = self._stack[i].tag
+                if open_tag in closes:
+                    del self._stack[i:]
+                    break
+                if open_tag in scope: break
+        self._order += 1
+        parent = self._stack[-1]
+        node = Node(tag, dict(attrs), parent, self._order)
+        parent.children.append(node)
+        if tag not in _VOID_TAGS: self._stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS and not self._skipping and self._stack[-1].tag == tag: self._stack.pop()
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            if self._skipping: self._skipping -= 1
+            return
+        if self._skipping: return
+        for i in range(len(self._stack) - 1, 0, -1):
+            if self._stack[i].tag == tag:
+                del self._stack[i:]
+                return
+
+    def handle_data(self, data):
+        if not self._skipping: self._stack[-1].children.append(data)
+
+def parse_html(html):
+    builder = _TreeBuilder()
+    builder.feed(html or "")
+    builder.close()
+    return builder.root
+
+def _label(node):
+    return " ".join(node.text().split())
+
+def _round_label(table):
+    # 1. The meta span right before the table's wrapper div
+    for ancestor in table.ancestors():
+        if ancestor.tag != "div" or "EventResults_tableWrap" not in ancestor.classes: continue
+        siblings = ancestor.parent.children
+        for sibling in reversed(siblings[:siblings.index(ancestor)]):
+            if isinstance(sibling, Node) and sibling.tag == "span" and "EventResults_eventMeta" in sibling.classes:
+                strong = sibling.find("strong")
+                if strong is not None: return _label(strong)
+                break
+        break
+    # 2. Any meta span in the enclosing result section (outermost match first, like find_element)
+    sections = [a for a in table.ancestors() if a.tag == "section" and "EventResults_eventResult" in a.classes]
+    for section in reversed(sections):
+        for span in section.iter("span"):
+            if "EventResults_eventMeta" in span.classes:
+                strong = span.find("strong")
+                if strong is not None: return _label(strong)
+    return ""
+
+def _table_rows(table):
+    rows = []
+    for body in table.iter("tbody"):
+        for tr in body.iter("tr"):
+            cols = [c for c in tr.children if isinstance(c, Node) and c.tag == "td"]
+            if len(cols) < 5: continue
+            place = cols[0].text()
+            if place.lower() == "pos": continue
+            name = cols[1].text().split("\n")[0].strip()
+            rows.append((place, name, cols[3].text(), cols[4].text()))
+    return rows
+
+def parse_results_page(html):
+    """
+    Every results table on the page, in page order, as
+    {"event_name_raw": str, "round_label": str, "rows": [(place, name, nationality, mark), ...]}.
+    Tables with no heading before them are skipped, like the Selenium loop did.
+    """
+    return _results_tables(parse_html(html))
+
+def _results_tables(root):
+    headings = list(root.iter("h2"))
+    tables = []
+    h = -1
+    for table in root.iter("table"):
+        while h + 1 < len(headings) and headings[h + 1].order < table.order: h += 1
+        ancestors = set(table.ancestors())
+        heading = next((headings[i] for i in range(h, -1, -1) if headings[i] not in ancestors), None)
+        if heading is None: continue
+        tables.append({
+            "event_name_raw": heading.text().strip(),
+            "round_label": _round_label(table),
+            "rows": _table_rows(table),
+        })
+    return tables
+
+def _header(root):
+    h1 = root.find("h1")
+    date = root.find(None, "competitions-header__date")
+    days = []
+    for select in root.iter("select"):
+        if select.attrs.get("name") != "day-select": continue
+        days = [o.attrs.get("value") for o in select.iter("option") if o.attrs.get("value")]
+        break
+    return {
+        "meet_name": h1.text().strip() if h1 is not None else None,
+        "date_text": date.text().strip() if date is not None else None,
+        "days": days,
+    }
+
+# --- __NEXT_DATA__ ---
+_NEXT_DATA = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+
+def extract_next_data(html):
+    """The JSON Next.js embeds in the page, or None."""
+    match = _NEXT_DATA.search(html or "")
+    if not match: return None
+    try: return json.loads(match.group(1))
+    except ValueError: return None
+
+def _find_key(value, key):
+    """First dict (depth first) that has `key`."""
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            if key in item: return item
+            stack.extend(reversed(list(item.values())))
+        elif isinstance(item, list):
+            stack.extend(reversed(item))
+    return None
+
+def _cell(value):
+    return "" if value is None else " ".join(str(value).split())
+
+def next_data_header(data):
+    """
+    {"meet_name", "days"} from the payload, the only fields parse_meet_page() and meet_days()
+    take from it (results always come from the rendered tables). None without a payload.
+    """
+    if not isinstance(data, dict): return None
+    competition = (_find_key(data, "competition") or {}).get("competition") or {}
+    options = (_find_key(data, "options") or {}).get("options") or {}
+    days = [str(d.get("day")) for d in (options.get("days") or []) if isinstance(d, dict) and d.get("day") is not None]
+    return {"meet_name": _cell(competition.get("name")) or None, "days": days}
+
+# --- cheap pre-checks (no tree build) for the navigation stage ---
+_DAY_SELECT = re.compile(r'<select[^>]*name=["\']day-select["\'][^>]*>(.*?)</select>', re.S)
+_OPTION_VALUE = re.compile(r'<option[^>]*value=["\']([^"\']+)["\']')
+
+def meet_days(html):
+    """The page's day options, the same ones parse_meet_page() reports."""
+    match = _DAY_SELECT.search(html or "")
+    days = _OPTION_VALUE.findall(match.group(1)) if match else []
+    if days: return days
+    embedded = next_data_header(extract_next_data(html))
+    return embedded["days"] if embedded else []
+
+def has_results(html):
+    """
+    Whether the page carries rendered results tables without a browser. Rows that exist only in
+    __NEXT_DATA__ don't count: the rendered headings are the event-key source, so such a page
+    goes to the browser. Errs towards False (browser fallback).
+    """
+    if not html: return False
+    wrap = html.find("EventResults_tableWrap")
+    return wrap >= 0 and html.find("<td", wrap) >= 0
+
+def parse_meet_page(html):
+    """
+    Header + results of one meet-day page: {"meet_name", "date_text", "days", "tables"}.
+    Tables (and the <h1>) always come from the rendered HTML, so a page with or without
+    __NEXT_DATA__ gives the same records and event keys; the payload only fills in a
+    missing meet name or day list.
+    """
+    root = parse_html(html)
+    page = dict(_header(root), tables=_results_tables(root))
+    embedded = next_data_header(extract_next_data(html))
+    if embedded is not None:
+        page["meet_name"] = page["meet_name"] or embedded["meet_name"]
+        page["days"] = page["days"] or embedded["days"]
+    return page
@@ -0,0 +1,125 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+# ==========================================
+# 📍 SCRAPE PROGRESS STATE
+# ==========================================
+# Replaces the append-only scraped_log.txt with a small SQLite file that any number of workers
+# can update at once: one row per meet URL with its status ("done" / "failed"), attempts and
+# last error. An existing scraped_log.txt is imported as "done" the first time it is opened.
+#
+# Below the meet level, checkpoint "units" record each (meet, day, results table) with a status
+# and row count; unit "" stands for a whole day. A restart skips every completed unit, so a
+# crash on day 5 only redoes day 5, and a failed table is retried without its neighbours.
+#
+#   progress = ScrapeProgress()
+#   if not progress.is_done(url): ... progress.mark_done(url)
+#   done = progress.done_units(url)                      # {(day, unit)}
+#   progress.mark_unit(url, "2", event_key, "done", rows=8)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PROGRESS_PATH = os.path.abspath(os.path.join(BASE_DIR, "..", "data", "scrape_progress.sqlite"))
+LEGACY_LOG_PATH = os.path.abspath(os.path.join(BASE_DIR, "..", "data", "scraped_log.txt"))
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+class ScrapeProgress:
+    def __init__(self, path=DEFAULT_PROGRESS_PATH, legacy_log=LEGACY_LOG_PATH):
+        if path != ":memory:": os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meets (url TEXT PRIMARY KEY, status TEXT, attempts INTEGER DEFAULT 0, "
+            "error TEXT, updated_at TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS units (url TEXT, day TEXT, unit TEXT, status TEXT, rows INTEGER DEFAULT 0, "
+            "attempts INTEGER DEFAULT 0, error TEXT, updated_at TEXT, PRIMARY KEY (url, day, unit))"
+        )
+        if legacy_log: self._import_legacy_log(legacy_log)
+
+    def _import_legacy_log(self, legacy_log):
+        if not os.path.exists(legacy_log): return
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM meets LIMIT 1").fetchone(): return
+            with open(legacy_log) as f:
+                urls = {line.strip() for line in f if line.strip()}
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO meets (url, status, updated_at) VALUES (?, 'done', ?)", [(u, _now()) for u in urls]
+            )
+        if urls: print(f"📍 Imported {len(urls)} meets from {os.path.basename(legacy_log)}.")
+
+    def done_urls(self):
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT url FROM meets WHERE status = 'done'")}
+
+    def meet_states(self):
+        """{url: (status, attempts)} for every meet seen so far."""
+        with self._lock:
+            return {row[0]: (row[1], row[2]) for row in self._conn.execute("SELECT url, status, attempts FROM meets")}
+
+    def is_done(self, url):
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM meets WHERE url = ?", (url,)).fetchone()
+        return bool(row) and row[0] == "done"
+
+    def _set(self, url, status, error=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO meets (url, status, attempts, error, updated_at) VALUES (?, ?, 1, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET status = excluded.status, attempts = attempts + 1, "
+                "error = excluded.error, updated_at = excluded.updated_at",
+                (url, status, error, _now())
+            )
+
+    def mark_done(self, url):
+        self._set(url, "done")
+
+    def mark_failed(self, url, error):
+        self._set(url, "failed", str(error)[:500])
+
+    # --- day / table checkpoints ---
+    def done_units(self, url):
+        with self._lock:
+            return {(day, unit) for day, unit in self._conn.execute(
+                "SELECT day, unit FROM units WHERE url = ? AND status = 'done'", (url,))}
+
+    def mark_unit(self, url, day, unit, status, rows=0, error=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO units (url, day, unit, status, rows, attempts, error, updated_at) VALUES (?, ?, ?, ?, ?, 1, ?, ?) "
+                "ON CONFLICT(url, day, unit) DO UPDATE SET status = excluded.status, rows = excluded.rows, "
+                "attempts = attempts + 1, error = excluded.error, updated_at = excluded.updated_at",
+                (url, str(day), unit or "", status, rows, str(error)[:500] if error else None, _now())
+            )
+
+    def failed_units(self, url=None):
+        """[(url, day, unit, attempts, error)] of units whose last attempt failed."""
+        query = "SELECT url, day, unit, attempts, error FROM units WHERE status = 'failed'"
+        with self._lock:
+            if url: return self._conn.execute(query + " AND url = ?", (url,)).fetchall()
+            return self._conn.execute(query).fetchall()
+
+    def reset(self, url=None):
+        """Forgets one meet (or all of them), checkpoints included, so it is scraped again."""
+        with self._lock:
+            if url:
+                self._conn.execute("DELETE FROM meets WHERE url = ?", (url,))
+                self._conn.execute("DELETE FROM units WHERE url = ?", (url,))
+            else:
+                self._conn.execute("DELETE FROM meets")
+                self._conn.execute("DELETE FROM units")
+
+    def summary(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM meets GROUP BY status").fetchall())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
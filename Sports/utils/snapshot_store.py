@@ -0,0 +1,108 @@
+import os
+import gzip
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+# ==========================================
+# 🗃️ RAW PAGE SNAPSHOT STORE
+# ==========================================
+# Every results page body we fetch is kept on disk, so a parser change can be re-run over a
+# whole season from local files instead of re-driving Chrome over every meet.
+#   objects/ab/cdef....html.gz   gzip'd page, named by the sha256 of its content (identical
+#                                re-fetches are stored once)
+#   index.sqlite                 (url, day, fetched_at) -> hash, plus the meet date we knew
+#
+#   store = SnapshotStore()                      # data/snapshots/
+#   store.put(url, html, day="2", meet_date="2025-08-01")
+#   store.latest_days(url)                       # {"1": hash, "2": hash} (newest fetch per day)
+#   store.read(hash)
+#
+#   python scrapers/WorldAthleticsResults.py --from-snapshots [--since 2025-01-01]
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SNAPSHOT_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "data", "snapshots"))
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+def _day_order(day):
+    return (0, int(day), "") if str(day).isdigit() else (1, 0, str(day))
+
+class SnapshotStore:
+    def __init__(self, root=DEFAULT_SNAPSHOT_DIR, compress_level=6):
+        self.root = root
+        self.compress_level = compress_level
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.sqlite"), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT, day TEXT, "
+            "fetched_at TEXT, hash TEXT, size INTEGER, meet_date TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS snapshots_url_day ON snapshots (url, day, fetched_at)")
+
+    def _path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest[2:] + ".html.gz")
+
+    def put(self, url, html, day="", meet_date=None):
+        """Stores one fetched page body and indexes it. Returns its content hash."""
+        raw = (html or "").encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(gzip.compress(raw, compresslevel=self.compress_level))
+            os.replace(tmp, path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO snapshots (url, day, fetched_at, hash, size, meet_date) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, str(day or ""), _now(), digest, len(raw), meet_date)
+            )
+        return digest
+
+    def read(self, digest):
+        with open(self._path(digest), "rb") as f:
+            return gzip.decompress(f.read()).decode("utf-8")
+
+    def latest_days(self, url):
+        """{day: hash} of the newest snapshot of each day of a meet, in day order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day, hash FROM snapshots WHERE url = ? ORDER BY fetched_at, id", (url,)
+            ).fetchall()
+        latest = dict(rows)
+        return {day: latest[day] for day in sorted(latest, key=_day_order)}
+
+    def latest(self, url, day=""):
+        digest = self.latest_days(url).get(str(day or ""))
+        return self.read(digest) if digest else None
+
+    def urls(self, prefix=None, since=None, until=None):
+        """[(url, meet_date)] of every snapshotted meet, optionally by URL prefix / meet date range."""
+        query = "SELECT url, MAX(meet_date) FROM snapshots"
+        where, params = [], []
+        if prefix:
+            where.append("substr(url, 1, ?) = ?")
+            params.extend([len(prefix), prefix])
+        if where: query += " WHERE " + " AND ".join(where)
+        query += " GROUP BY url ORDER BY url"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [(url, meet_date) for url, meet_date in rows
+                if (not since or (meet_date or "") >= since) and (not until or (meet_date or "9999") <= until)]
+
+    def stats(self):
+        with self._lock:
+            snapshots, objects, raw_bytes = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT hash), COALESCE(SUM(size), 0) FROM snapshots"
+            ).fetchone()
+        return {"snapshots": snapshots, "objects": objects, "raw_bytes": raw_bytes}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,686 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+# ==========================================
+# 🗄️ LOCAL STORAGE BACKEND (SQLite + filesystem)
+# ==========================================
+# Implements the slice of the supabase-py surface our scripts use:
+#   .table(name).select/insert/upsert/update/delete + eq/neq/lt/lte/gt/gte/like/ilike/is_/in_/match/or_
+#               + order/limit/range/single/maybe_single, .execute() -> .data / .count
+#   .rpc("merge_entities", {...}).execute()
+#   .storage.from_(bucket).upload/list/remove/download/get_public_url, .storage.get_bucket(...)
+# Point db_utils at it with DB_BACKEND=sqlite (see db_utils.get_client) or db_utils.use_backend().
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SQLITE_PATH = os.path.abspath(os.path.join(BASE_DIR, "..", "data", "local_staging.sqlite"))
+DEFAULT_STORAGE_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "data", "local_storage"))
+
+# Columns the code reads/writes today. Anything else written later is added on the fly.
+SCHEMA = {
+    "entities": {
+        "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "slug": "TEXT UNIQUE",
+        "name": "TEXT",
+        "category": "TEXT",
+        "subcategory": "TEXT",
+        "nationality": "TEXT",
+        "gender": "TEXT",
+        "details": "JSON",
+        "date_of_birth": "TEXT",
+        "audit_meta": "JSON",
+        "name_audited": "BOOLEAN",
+        "image_source": "TEXT",
+        "image_pending_download": "BOOLEAN",
+        "image_scrape_status": "TEXT",
+        "image_checked_at": "TEXT",
+        "image_audited": "BOOLEAN",
+        "created_at": "TEXT DEFAULT CURRENT_TIMESTAMP",
+    },
+    "events": {
+        "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "entity_id": "INTEGER",
+        "title": "TEXT",
+        "start_time": "TEXT",
+        "category": "TEXT",
+        "status": "TEXT",
+        "result": "JSON",
+        "event_key": "TEXT",
+        "parent_event_id": "INTEGER",
+        "is_parent": "BOOLEAN",
+        "created_at": "TEXT DEFAULT CURRENT_TIMESTAMP",
+    },
+    "entity_images": {
+        "entity_id": "INTEGER PRIMARY KEY",
+        "image_url": "TEXT",
+        "updated_at": "TEXT",
+    },
+}
+
+INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS events_entity_key ON events (entity_id, event_key)",
+    "CREATE INDEX IF NOT EXISTS events_start_time ON events (start_time)",
+    "CREATE INDEX IF NOT EXISTS events_parent ON events (parent_event_id)",
+    "CREATE INDEX IF NOT EXISTS entities_name ON entities (name)",
+]
+
+_FILTER_OPS = {"eq": "=", "neq": "!=", "lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+_OR_TERM = re.compile(r"^(.+?)\.(not\.)?(eq|neq|lt|lte|gt|gte|like|ilike|is|in)\.(.*)$")
+
+class BackendError(Exception):
+    """Raised for malformed queries; carries a PostgREST-style dict like postgrest's APIError."""
+    def __init__(self, message, code="PGRST000"):
+        super().__init__({"message": message, "code": code})
+
+class BackendResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+def _split_top_level(text):
+    parts, depth, current = [], 0, ""
+    for ch in text:
+        if ch == "(": depth += 1
+        elif ch == ")": depth -= 1
+        if ch == "," and depth == 0:
+            parts.append(current)
+            current = ""
+        else:
+            current += ch
+    if current: parts.append(current)
+    return [p.strip() for p in parts if p.strip()]
+
+class SQLiteQuery:
+    def __init__(self, backend, table):
+        self._backend = backend
+        self._table = table
+        self._op = "select"
+        self._columns = "*"
+        self._count = None
+        self._head = False
+        self._where = []
+        self._params = []
+        self._order = []
+        self._limit = None
+        self._offset = None
+        self._single = None
+        self._payload = None
+        self._on_conflict = None
+        self._ignore_duplicates = False
+
+    # --- verbs ---
+    def select(self, *columns, count=None, head=False):
+        self._op = "select"
+        self._columns = ",".join(columns) if columns else "*"
+        self._count = count
+        self._head = head
+        return self
+
+    def insert(self, json_data, **kwargs):
+        self._op = "insert"
+        self._payload = json_data
+        return self
+
+    def upsert(self, json_data, on_conflict="", ignore_duplicates=False, **kwargs):
+        self._op = "upsert"
+        self._payload = json_data
+        self._on_conflict = on_conflict
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, json_data, **kwargs):
+        self._op = "update"
+        self._payload = json_data
+        return self
+
+    def delete(self, **kwargs):
+        self._op = "delete"
+        return self
+
+    # --- filters ---
+    def _add(self, sql, *params):
+        self._where.append(sql)
+        self._params.extend(params)
+        return self
+
+    def eq(self, column, value): return self._cmp(column, "eq", value)
+    def neq(self, column, value): return self._cmp(column, "neq", value)
+    def lt(self, column, value): return self._cmp(column, "lt", value)
+    def lte(self, column, value): return self._cmp(column, "lte", value)
+    def gt(self, column, value): return self._cmp(column, "gt", value)
+    def gte(self, column, value): return self._cmp(column, "gte", value)
+
+    def _cmp(self, column, op, value):
+        sql, params = self._backend._condition(self._table, column, op, value)
+        return self._add(sql, *params)
+
+    def like(self, column, pattern):
+        sql, params = self._backend._condition(self._table, column, "like", pattern)
+        return self._add(sql, *params)
+
+    def ilike(self, column, pattern):
+        sql, params = self._backend._condition(self._table, column, "ilike", pattern)
+        return self._add(sql, *params)
+
+    def is_(self, column, value):
+        sql, params = self._backend._condition(self._table, column, "is", value)
+        return self._add(sql, *params)
+
+    def in_(self, column, values):
+        sql, params = self._backend._condition(self._table, column, "in", list(values))
+        return self._add(sql, *params)
+
+    def match(self, query):
+        for column, value in query.items(): self.eq(column, value)
+        return self
+
+    def or_(self, filters, reference_table=None):
+        sql, params = self._backend._parse_or(self._table, filters)
+        return self._add(sql, *params)
+
+    def order(self, column, desc=False, nullsfirst=None, **kwargs):
+        self._order.append(f"{self._backend._column_sql(self._table, column)} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, size, **kwargs):
+        self._limit = size
+        return self
+
+    def range(self, start, end, **kwargs):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def single(self):
+        self._single = "single"
+        return self
+
+    def maybe_single(self):
+        self._single = "maybe"
+        return self
+
+    def execute(self):
+        return self._backend._execute(self)
+
+class LocalBucket:
+    def __init__(self, root, bucket_id):
+        self.root = os.path.join(root, bucket_id)
+        self.bucket_id = bucket_id
+
+    def _path(self, path):
+        full = os.path.abspath(os.path.join(self.root, path))
+        if not full.startswith(os.path.abspath(self.root)): raise BackendError(f"Invalid path: {path}")
+        return full
+
+    def upload(self, path, file, file_options=None):
+        full = self._path(path)
+        upsert = str((file_options or {}).get("x-upsert", "false")).lower() == "true"
+        if os.path.exists(full) and not upsert: raise BackendError("The resource already exists", code="409")
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        data = file if isinstance(file, (bytes, bytearray)) else open(file, "rb").read() if isinstance(file, str) else file.read()
+        with open(full, "wb") as f: f.write(data)
+        return {"path": path, "Key": f"{self.bucket_id}/{path}"}
+
+    def download(self, path):
+        with open(self._path(path), "rb") as f: return f.read()
+
+    def list(self, path=None, options=None):
+        folder = self._path(path or "")
+        if not os.path.isdir(folder): return []
+        entries = []
+        for name in sorted(os.listdir(folder)):
+            stat = os.stat(os.path.join(folder, name))
+            stamp = datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
+            entries.append({"name": name, "id": name, "created_at": stamp, "updated_at": stamp,
+                            "metadata": {"size": stat.st_size}})
+        limit = (options or {}).get("limit")
+        return entries[:limit] if limit else entries
+
+    def remove(self, paths):
+        removed = []
+        for path in paths:
+            full = self._path(path)
+            if os.path.isfile(full):
+                os.remove(full)
+                removed.append({"name": path})
+        return removed
+
+    def get_public_url(self, path, options=None):
+        return "file://" + self._path(path)
+
+class LocalStorage:
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def from_(self, bucket_id):
+        return LocalBucket(self.root, bucket_id)
+
+    def get_bucket(self, bucket_id):
+        if not os.path.isdir(os.path.join(self.root, bucket_id)): raise BackendError("Bucket not found", code="404")
+        return {"id": bucket_id, "name": bucket_id}
+
+    def create_bucket(self, bucket_id, name=None, options=None):
+        os.makedirs(os.path.join(self.root, bucket_id), exist_ok=True)
+        return {"name": bucket_id}
+
+    def list_buckets(self):
+        return [{"id": b, "name": b} for b in sorted(os.listdir(self.root))]
+
+class SQLiteBackend:
+    """A local, single-file stand-in for the Supabase project."""
+    def __init__(self, path=DEFAULT_SQLITE_PATH, storage_dir=DEFAULT_STORAGE_DIR):
+        if path != ":memory:": os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.RLock()
+        self._types = {}
+        self._rpcs = {"merge_entities": _rpc_merge_entities}
+        self.storage = LocalStorage(storage_dir)
+        self._create_schema()
+
+    # --- public surface ---
+    def table(self, name):
+        self._ensure_table(name)
+        return SQLiteQuery(self, name)
+
+    def from_(self, name):
+        return self.table(name)
+
+    def rpc(self, fn, params=None, **kwargs):
+        backend = self
+        class _Call:
+            def execute(self_inner):
+                if fn not in backend._rpcs: raise BackendError(f"Could not find the function {fn}", code="PGRST202")
+                with backend._lock:
+                    return BackendResponse(backend._rpcs[fn](backend, **(params or {})))
+        return _Call()
+
+    def register_rpc(self, name, fn):
+        """fn(backend, **params) -> data"""
+        self._rpcs[name] = fn
+
+    def close(self):
+        self._conn.close()
+
+    # --- schema ---
+    def _create_schema(self):
+        with self._lock:
+            for table, columns in SCHEMA.items():
+                cols = ", ".join(f"{c} {t}" for c, t in columns.items())
+                self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({cols})")
+            for sql in INDEXES: self._conn.execute(sql)
+            for table in SCHEMA: self._load_types(table)
+
+    def _load_types(self, table):
+        info = self._conn.execute(f"PRAGMA table_info({table})").fetchall()
+        self._types[table] = {row["name"]: (row["type"] or "").upper() for row in info}
+
+    def _ensure_table(self, table):
+        if table in self._types: return
+        if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", table): raise BackendError(f"Invalid table: {table}")
+        with self._lock:
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY AUTOINCREMENT)")
+            self._load_types(table)
+
+    def _ensure_columns(self, table, rows):
+        known = self._types[table]
+        for row in rows:
+            for column, value in row.items():
+                if column in known: continue
+                if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", column): raise BackendError(f"Invalid column: {column}")
+                col_type = "JSON" if isinstance(value, (dict, list)) else "BOOLEAN" if isinstance(value, bool) else ""
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+                known[column] = col_type
+
+    # --- value conversion ---
+    def _to_db(self, table, column, value):
+        col_type = self._types[table].get(column, "")
+        if value == "now()": return _now_iso()
+        if col_type == "JSON" and value is not None and not isinstance(value, str): return json.dumps(value)
+        if col_type == "BOOLEAN" and isinstance(value, str):
+            return {"true": 1, "false": 0}.get(value.lower(), value)
+        if isinstance(value, (dict, list)): return json.dumps(value)
+        return value
+
+    def _from_db(self, table, row):
+        out = {}
+        types = self._types[table]
+        for column in row.keys():
+            value = row[column]
+            col_type = types.get(column, "")
+            if value is not None and col_type == "JSON":
+                try: value = json.loads(value)
+                except (TypeError, ValueError): pass
+            elif value is not None and col_type == "BOOLEAN":
+                value = bool(value)
+            out[column] = value
+        return out
+
+    def _column_sql(self, table, column):
+        # PostgREST JSON paths: details->>points_100m / details->points_100m
+        m = re.match(r"^([A-Za-z_][A-Za-z0-9_]*)\s*->>?\s*([A-Za-z0-9_]+)$", column.strip())
+        if m: return f"json_extract({m.group(1)}, '$.{m.group(2)}')"
+        column = column.strip()
+        if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", column): raise BackendError(f"Invalid column: {column}")
+        if column not in self._types[table]:
+            raise BackendError(f"column {table}.{column} does not exist", code="42703")
+        return column
+
+    def _select_sql(self, table, column):
+        col_sql = self._column_sql(table, column)
+        if col_sql.startswith("json_extract"): col_sql += " AS " + re.split(r"->>?", column)[-1].strip()
+        return col_sql
+
+    def _base_column(self, column):
+        return re.split(r"\s*->", column.strip())[0]
+
+    def _condition(self, table, column, op, value, negate=False):
+        col_sql = self._column_sql(table, column)
+        base = self._base_column(column)
+        convert = (lambda v: v) if col_sql.startswith("json_extract") else (lambda v: self._to_db(table, base, v))
+        if op in _FILTER_OPS:
+            sql, params = f"{col_sql} {_FILTER_OPS[op]} ?", [convert(value)]
+        elif op in ("like", "ilike"):
+            pattern = str(value).replace("*", "%")
+            if op == "ilike": sql, params = f"{col_sql} LIKE ?", [pattern]
+            else: sql, params = f"{col_sql} GLOB ?", [pattern.replace("%", "*").replace("_", "?")]
+        elif op == "is":
+            token = str(value).lower()
+            if value is None or token == "null": sql, params = f"{col_sql} IS NULL", []
+            elif token in ("true", "false"): sql, params = f"{col_sql} = ?", [1 if token == "true" else 0]
+            else: raise BackendError(f"Invalid is_ value: {value}")
+        elif op == "in":
+            values = value if isinstance(value, list) else [v.strip().strip('"') for v in str(value).strip("()").split(",")]
+            if not values: sql, params = "0", []
+            else: sql, params = f"{col_sql} IN ({', '.join('?' for _ in values)})", [convert(v) for v in values]
+        else:
+            raise BackendError(f"Unsupported operator: {op}")
+        if negate: sql = f"NOT ({sql})"
+        return sql, params
+
+    def _parse_or(self, table, filters):
+        clauses, params = [], []
+        for term in _split_top_level(filters):
+            if term.startswith("and(") and term.endswith(")"):
+                sub = [self._parse_term(table, t) for t in _split_top_level(term[4:-1])]
+                clauses.append("(" + " AND ".join(s for s, _ in sub) + ")")
+                for _, p in sub: params.extend(p)
+                continue
+            sql, p = self._parse_term(table, term)
+            clauses.append(sql)
+            params.extend(p)
+        return "(" + " OR ".join(clauses) + ")", params
+
+    def _parse_term(self, table, term):
+        m = _OR_TERM.match(term)
+        if not m: raise BackendError(f"Could not parse filter: {term}")
+        column, negate, op, value = m.groups()
+        return self._condition(table, column, op, value, negate=bool(negate))
+
+    # --- execution ---
+    def _execute(self, q):
+        with self._lock:
+            if q._op == "select": return self._run_select(q)
+            if q._op in ("insert", "upsert"): return self._run_insert(q)
+            if q._op == "update": return self._run_update(q)
+            if q._op == "delete": return self._run_delete(q)
+            raise BackendError(f"Unsupported operation: {q._op}")
+
+    def _where_sql(self, q):
+        return (" WHERE " + " AND ".join(q._where)) if q._where else ""
+
+    def _shape(self, q, rows):
+        if q._single == "single":
+            if len(rows) != 1: raise BackendError("JSON object requested, multiple (or no) rows returned", code="PGRST116")
+            return rows[0]
+        if q._single == "maybe":
+            return rows[0] if rows else None
+        return rows
+
+    def _run_select(self, q):
+        where = self._where_sql(q)
+        count = None
+        if q._count:
+            count = self._conn.execute(f"SELECT COUNT(*) FROM {q._table}{where}", q._params).fetchone()[0]
+        if q._head: return BackendResponse([], count)
+
+        columns = [c.strip() for c in q._columns.split(",") if c.strip()]
+        col_sql = "*" if columns == ["*"] else ", ".join(self._select_sql(q._table, c) for c in columns)
+        sql = f"SELECT {col_sql} FROM {q._table}{where}"
+        if q._order: sql += " ORDER BY " + ", ".join(q._order)
+        if q._limit is not None: sql += f" LIMIT {int(q._limit)}"
+        if q._offset: sql += (" LIMIT -1" if q._limit is None else "") + f" OFFSET {int(q._offset)}"
+        rows = [self._from_db(q._table, r) for r in self._conn.execute(sql, q._params).fetchall()]
+        return BackendResponse(self._shape(q, rows), count)
+
+    def _run_insert(self, q):
+        rows = q._payload if isinstance(q._payload, list) else [q._payload]
+        if not rows: return BackendResponse([])
+        self._ensure_columns(q._table, rows)
+        columns = list(dict.fromkeys(c for row in rows for c in row))
+        sql = f"INSERT INTO {q._table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        if q._op == "upsert":
+            target = [c.strip() for c in (q._on_conflict or self._primary_key(q._table)).split(",")]
+            if q._ignore_duplicates:
+                sql += f" ON CONFLICT ({', '.join(target)}) DO NOTHING"
+            else:
+                updates = [c for c in columns if c not in target] or target[:1]
+                sql += f" ON CONFLICT ({', '.join(target)}) DO UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in updates)
+        sql += " RETURNING *"
+        out = []
+        self._conn.execute("BEGIN")
+        try:
+            for row in rows:
+                params = [self._to_db(q._table, c, row.get(c)) for c in columns]
+                out.extend(self._from_db(q._table, r) for r in self._conn.execute(sql, params).fetchall())
+            self._conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            self._conn.execute("ROLLBACK")
+            raise BackendError(str(e), code="23505" if "UNIQUE" in str(e) else "PGRST000")
+        return BackendResponse(out)
+
+    def _primary_key(self, table):
+        info = self._conn.execute(f"PRAGMA table_info({table})").fetchall()
+        return ",".join(r["name"] for r in info if r["pk"]) or "id"
+
+    def _run_update(self, q):
+        if not q._payload: return BackendResponse([])
+        self._ensure_columns(q._table, [q._payload])
+        assignments = ", ".join(f"{c} = ?" for c in q._payload)
+        params = [self._to_db(q._table, c, v) for c, v in q._payload.items()] + q._params
+        try:
+            rows = self._conn.execute(f"UPDATE {q._table} SET {assignments}{self._where_sql(q)} RETURNING *", params).fetchall()
+        except sqlite3.Error as e:
+            raise BackendError(str(e), code="23505" if "UNIQUE" in str(e) else "PGRST000")
+        return BackendResponse(self._shape(q, [self._from_db(q._table, r) for r in rows]))
+
+    def _run_delete(self, q):
+        rows = self._conn.execute(f"DELETE FROM {q._table}{self._where_sql(q)} RETURNING *", q._params).fetchall()
+        return BackendResponse(self._shape(q, [self._from_db(q._table, r) for r in rows]))
+
+def _rpc_merge_entities(backend, master_id, duplicate_id):
+    """Local version of the merge_entities SQL function: moves events/images/details onto the master."""
+    conn = backend._conn
+    conn.execute("BEGIN")
+    try:
+        # Events whose key the master already has are dropped, the rest move over
+        conn.execute("""DELETE FROM events WHERE entity_id = ? AND event_key IN
+                        (SELECT event_key FROM events WHERE entity_id = ?)""", (duplicate_id, master_id))
+        conn.execute("UPDATE events SET entity_id = ? WHERE entity_id = ?", (master_id, duplicate_id))
+        if conn.execute("SELECT 1 FROM entity_images WHERE entity_id = ?", (master_id,)).fetchone():
+            conn.execute("DELETE FROM entity_images WHERE entity_id = ?", (duplicate_id,))
+        else:
+            conn.execute("UPDATE entity_images SET entity_id = ? WHERE entity_id = ?", (master_id, duplicate_id))
+
+        rows = {r["id"]: r for r in conn.execute("SELECT id, details, date_of_birth FROM entities WHERE id IN (?, ?)",
+                                                  (master_id, duplicate_id)).fetchall()}
+        if master_id in rows and duplicate_id in rows:
+            master_details = json.loads(rows[master_id]["details"] or "{}")
+            dup_details = json.loads(rows[duplicate_id]["details"] or "{}")
+            conn.execute("UPDATE entities SET details = ?, date_of_birth = COALESCE(date_of_birth, ?) WHERE id = ?",
+                         (json.dumps({**dup_details, **master_details}), rows[duplicate_id]["date_of_birth"], master_id))
+        conn.execute("DELETE FROM entities WHERE id = ?", (duplicate_id,))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return None
+
+class AsyncBackendAdapter:
+    """Async face of a sync backend (each execute runs in a worker thread), for async_db_utils."""
+    def __init__(self, backend):
+        self.backend = backend
+
+    def table(self, name):
+        return _AsyncQuery(self.backend.table(name))
+
+    def rpc(self, fn, params=None, **kwargs):
+        return _AsyncQuery(self.backend.rpc(fn, params, **kwargs))
+
+class _AsyncQuery:
+    def __init__(self, query):
+        self._query = query
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if not callable(attr): return attr
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return _AsyncQuery(result) if hasattr(result, "execute") else result
+        return chained
+
+    async def execute(self):
+        import asyncio
+        return await asyncio.to_thread(self._query.execute)
+
+# ==========================================
+# 🔁 BULK SYNC: local staging -> Supabase
+# ==========================================
+# Values a partial local run writes before it knows better ("N/A" = not ranked yet)
+_PLACEHOLDER_VALUES = (None, "", "N/A")
+
+def _merge_remote_entity(remote_row, local_row):
+    """
+    The remote row with a local one merged in, by the same rules as db_utils._merge_entity_update:
+    details key by key (a placeholder never replaces a real value), and every other column (gender,
+    name, date_of_birth, ...) only fills a remote value that is missing. Returns None if the remote
+    row already has everything.
+    """
+    merged = dict(remote_row)
+    for k, v in local_row.items():
+        if k in ("id", "created_at", "details") or v in _PLACEHOLDER_VALUES: continue
+        if merged.get(k) in _PLACEHOLDER_VALUES: merged[k] = v
+    details = dict(remote_row.get("details") or {})
+    for k, v in (local_row.get("details") or {}).items():
+        if v in _PLACEHOLDER_VALUES and details.get(k) not in _PLACEHOLDER_VALUES: continue
+        details[k] = v
+    merged["details"] = details
+    return None if merged == remote_row else merged
+
+def sync_to_remote(local, remote, chunk_size=500):
+    """
+    Pushes a staging database into another client (normally the live Supabase one).
+    Local ids mean nothing remotely, so entities are matched on slug and events on
+    (entity_id, event_key); parent links and images are re-pointed at the remote ids.
+    """
+    def chunks(rows):
+        for i in range(0, len(rows), chunk_size): yield rows[i:i + chunk_size]
+
+    def all_rows(table):
+        rows, start = [], 0
+        while True:
+            page = local.table(table).select("*").order("id" if table != "entity_images" else "entity_id")\
+                .range(start, start + 999).execute().data
+            rows.extend(page)
+            if len(page) < 1000: return rows
+            start += 1000
+
+    # 1. Entities: new slugs are inserted, existing remote rows are merged into (never overwritten
+    # wholesale, so a partial local run can't blank out what only the remote knows)
+    entity_map = {}
+    local_entities = all_rows("entities")
+    for part in chunks(local_entities):
+        existing = {r["slug"]: r for r in remote.table("entities").select("*")
+                    .in_("slug", [row["slug"] for row in part]).execute().data or []}
+        inserts = [{k: v for k, v in row.items() if k not in ("id", "created_at")}
+                   for row in part if row["slug"] not in existing]
+        updates = [merged for merged in (_merge_remote_entity(existing[row["slug"]], row)
+                                         for row in part if row["slug"] in existing) if merged]
+        remote_ids = {slug: r["id"] for slug, r in existing.items()}
+        for payload in (inserts, updates):
+            if not payload: continue
+            res = remote.table("entities").upsert(payload, on_conflict="slug").execute()
+            remote_ids.update({r["slug"]: r["id"] for r in res.data or []})
+        for row in part:
+            if row["slug"] in remote_ids: entity_map[row["id"]] = remote_ids[row["slug"]]
+    print(f"   -> Synced {len(entity_map)} entities.")
+
+    # 2. Events: parents first so children can point at their remote ids
+    local_events = all_rows("events")
+    event_map = {}
+    synced = 0
+    for parents_pass in (True, False):
+        batch = [e for e in local_events if bool(e.get("is_parent")) == parents_pass and e["entity_id"] in entity_map]
+        for part in chunks(batch):
+            payload = []
+            for row in part:
+                item = {k: v for k, v in row.items() if k not in ("id", "created_at")}
+                item["entity_id"] = entity_map[row["entity_id"]]
+                # An unlinked local child must not clear a link the remote linker already set
+                parent_id = event_map.get(row.get("parent_event_id"))
+                if parent_id: item["parent_event_id"] = parent_id
+                else: item.pop("parent_event_id", None)
+                payload.append(item)
+            # Linked and unlinked rows go separately: a bulk upsert sends the union of keys, which
+            # would write null into the rows that left parent_event_id out
+            remote_ids = {}
+            for group in ([p for p in payload if "parent_event_id" in p], [p for p in payload if "parent_event_id" not in p]):
+                if not group: continue
+                res = remote.table("events").upsert(group, on_conflict="entity_id,event_key").execute()
+                remote_ids.update({(r["entity_id"], r["event_key"]): r["id"] for r in res.data or []})
+            for row in part:
+                rid = remote_ids.get((entity_map[row["entity_id"]], row["event_key"]))
+                if rid: event_map[row["id"]] = rid
+            synced += len(part)
+    print(f"   -> Synced {synced} events.")
+
+    # 3. Images
+    images = [dict(r, entity_id=entity_map[r["entity_id"]]) for r in all_rows("entity_images") if r["entity_id"] in entity_map]
+    for part in chunks(images):
+        remote.table("entity_images").upsert(part, on_conflict="entity_id").execute()
+    print(f"   -> Synced {len(images)} images.")
+    return {"entities": len(entity_map), "events": synced, "images": len(images)}
+
+def copy_storage_to_remote(local_storage_dir, remote, bucket, prefix=""):
+    """Uploads every file of a local bucket folder to a remote bucket (same relative paths)."""
+    root = os.path.join(local_storage_dir, bucket)
+    uploaded = 0
+    for folder, _, files in os.walk(os.path.join(root, prefix)):
+        for name in files:
+            full = os.path.join(folder, name)
+            rel = os.path.relpath(full, root).replace(os.sep, "/")
+            with open(full, "rb") as f:
+                remote.storage.from_(bucket).upload(path=rel, file=f.read(), file_options={"x-upsert": "true"})
+            uploaded += 1
+    return uploaded
+
+if __name__ == "__main__":
+    # Usage: python utils/storage_backends.py  -> pushes data/local_staging.sqlite into Supabase
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from utils.db_utils import get_credentials, ManagedClient
+    from supabase import create_client
+
+    local_path = os.getenv("SQLITE_DB_PATH", DEFAULT_SQLITE_PATH)
+    print(f"🔁 Syncing {local_path} -> Supabase...")
+    stats = sync_to_remote(SQLiteBackend(local_path), ManagedClient(create_client(*get_credentials())))
+    print(f"✅ Sync Complete. {stats}")
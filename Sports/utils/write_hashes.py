@@ -0,0 +1,83 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+
+# ==========================================
+# #️⃣ WRITE HASH SIDECAR
+# ==========================================
+# Remembers a content hash of the last payload we successfully wrote for each event
+# (entity_id + event_key) and of the last incoming data merged into each entity (slug).
+# db_utils skips a write whose hash matches, so a FORCE_RESCRAPE or a rankings re-sync of
+# unchanged data costs no requests at all. Kept in a local SQLite file rather than a DB column,
+# so the check needs no read either.
+#
+#   from utils.db_utils import use_write_hashes
+#   use_write_hashes(WriteHashStore())            # data/write_hashes.sqlite
+#
+# The sidecar only knows about writes made through db_utils. After editing rows by other means
+# (audits, a restore), clear it: WriteHashStore().clear("events"). The combined-events linker
+# drops the hashes of the rows it changes itself.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HASH_DB_PATH = os.path.abspath(os.path.join(BASE_DIR, "..", "data", "write_hashes.sqlite"))
+
+def content_hash(value):
+    """Stable 64-bit hex digest of any JSON-able value (dict key order does not matter)."""
+    raw = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+class WriteHashStore:
+    def __init__(self, path=DEFAULT_HASH_DB_PATH, commit_every=500):
+        if path != ":memory:": os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.commit_every = commit_every
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS write_hashes (tbl TEXT, key TEXT, hash TEXT, ref, PRIMARY KEY (tbl, key))"
+        )
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+
+    def get(self, table, key):
+        """Returns (hash, ref) for a key, or None. `ref` is whatever was stored with it (e.g. the row id)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT hash, ref FROM write_hashes WHERE tbl = ? AND key = ?", (table, str(key))
+            ).fetchone()
+        return row
+
+    def put_many(self, table, items):
+        """items: iterable of (key, hash) or (key, hash, ref)."""
+        rows = [(table, str(item[0]), item[1], item[2] if len(item) > 2 else None) for item in items]
+        if not rows: return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO write_hashes VALUES (?, ?, ?, ?)", rows)
+            self._uncommitted += len(rows)
+            if self._uncommitted >= self.commit_every: self._commit()
+
+    def put(self, table, key, h, ref=None):
+        self.put_many(table, [(key, h, ref)])
+
+    def discard(self, table, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM write_hashes WHERE tbl = ? AND key = ?", (table, str(key)))
+            self._uncommitted += 1
+
+    def clear(self, table=None):
+        with self._lock:
+            if table: self._conn.execute("DELETE FROM write_hashes WHERE tbl = ?", (table,))
+            else: self._conn.execute("DELETE FROM write_hashes")
+            self._commit()
+
+    def _commit(self):
+        self._conn.commit()
+        self._uncommitted = 0
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._conn.close()
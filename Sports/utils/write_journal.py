@@ -0,0 +1,210 @@
+import os
+import json
+import threading
+
+# ==========================================
+# 📓 DURABLE WRITE JOURNAL
+# ==========================================
+# In journal mode a scraper appends every entity / event write it *intends* to make to a local
+# JSONL file (one numbered entry per line) instead of calling the DB. Scraping runs at browser
+# speed and a slow or dead Supabase loses nothing; `replay` later applies the entries in large
+# batches through the normal bulk paths (upsert_entities_bulk + EventBuffer), which are keyed
+# upserts, so replaying an entry twice is harmless.
+#
+#   journal = WriteJournal()                       # data/write_journal.jsonl
+#   journal.entity({"name": ..., "nationality": ..., "gender": ...})
+#   journal.event(create_slug(name, nat), event_data, combined_context)
+#
+#   python -m utils.write_journal replay [path]    # from the Sports/ folder
+#
+# Progress is kept in "<journal>.cursor" (last applied seq). A batch only advances the cursor once
+# all of its writes went through, so an interrupted or failed replay simply resumes there.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_JOURNAL_PATH = os.path.abspath(os.path.join(BASE_DIR, "..", "data", "write_journal.jsonl"))
+REPLAY_BATCH_SIZE = 2000
+
+class WriteJournal:
+    def __init__(self, path=DEFAULT_JOURNAL_PATH, fsync_every=200):
+        self.path = path
+        self.fsync_every = fsync_every
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.last_seq = max((entry["seq"] for entry in read_journal(path)), default=0)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, op, **data):
+        with self._lock:
+            self.last_seq += 1
+            self._file.write(json.dumps({"seq": self.last_seq, "op": op, **data}, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every: self._sync()
+            return self.last_seq
+
+    def entity(self, record):
+        """Same dicts upsert_entity / upsert_entities_bulk accept."""
+        return self.append("entity", record=record)
+
+    def details_defaults(self, slug, defaults):
+        """Keys to add to an entity's details only where missing (never overwrites)."""
+        return self.append("details_defaults", slug=slug, defaults=defaults)
+
+    def event(self, entity_slug, event_data, combined_context=None):
+        """An upsert_event call whose entity is named by slug (its id is resolved at replay)."""
+        return self.append("event", slug=entity_slug, event=event_data, combined_context=combined_context)
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        with self._lock:
+            if self._file.closed: return
+            self._sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def read_journal(path, after_seq=0):
+    """Yields journal entries with seq > after_seq. A torn last line (crash mid-write) is skipped."""
+    if not os.path.exists(path): return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try: entry = json.loads(line)
+            except ValueError: continue
+            if entry.get("seq", 0) > after_seq: yield entry
+
+def _cursor_path(path):
+    return path + ".cursor"
+
+def load_cursor(path):
+    try:
+        with open(_cursor_path(path)) as f: return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+def save_cursor(path, seq):
+    tmp = _cursor_path(path) + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(str(seq))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, _cursor_path(path))
+
+# --- REPLAY ---
+
+def _apply_details_defaults(slug_to_defaults, slug_to_id, chunk_size=200):
+    from utils.db_utils import supabase, ENTITY_COLUMNS, _entity_update_rows, _cache_written_row
+    by_id = {}
+    for slug, defaults in slug_to_defaults.items():
+        by_id.setdefault(slug_to_id[slug], {}).update(defaults)
+    ids = list(by_id)
+    for i in range(0, len(ids), chunk_size):
+        res = supabase.table("entities").select(ENTITY_COLUMNS).in_("id", ids[i:i + chunk_size]).execute()
+        updates = []
+        for row in res.data or []:
+            current = row.get("details") or {}
+            missing = {k: v for k, v in by_id[row["id"]].items() if k not in current}
+            if missing: updates.append((row, {"details": {**current, **missing}}))
+        if updates:
+            supabase.table("entities").upsert(_entity_update_rows(updates), on_conflict="id").execute()
+            for row, payload in updates: _cache_written_row(row, payload)
+
+def apply_batch(entries):
+    """Applies one batch of journal entries. Raises if any write could not be made."""
+    from utils.db_utils import upsert_entities_bulk, create_slug, EventBuffer, upsert_event
+
+    records = [e["record"] for e in entries if e["op"] == "entity"]
+    slug_to_id = upsert_entities_bulk(records) if records else {}
+    written = {create_slug(r.get("name"), r.get("nationality")) for r in records if r.get("name")}
+    missing = written - set(slug_to_id)
+    if missing:
+        raise RuntimeError(f"{len(missing)} entities were not written (e.g. {sorted(missing)[0]})")
+
+    # Entities journaled in an earlier batch are looked up (cheaply, via the cache) like any other
+    wanted = {e["slug"] for e in entries if e["op"] in ("event", "details_defaults")} - set(slug_to_id)
+    if wanted: slug_to_id.update(_lookup_entity_ids(wanted))
+    unresolved = wanted - set(slug_to_id)
+    if unresolved:
+        raise RuntimeError(f"{len(unresolved)} entities referenced by the journal do not exist (e.g. {sorted(unresolved)[0]})")
+
+    defaults = {}
+    for e in entries:
+        if e["op"] == "details_defaults":
+            defaults.setdefault(e["slug"], {}).update(e["defaults"])
+    if defaults: _apply_details_defaults(defaults, slug_to_id)
+
+    with EventBuffer(flush_interval=0) as buffer:
+        for e in entries:
+            if e["op"] == "event":
+                upsert_event(slug_to_id[e["slug"]], e["event"], e.get("combined_context"))
+    if buffer.failed_rows:
+        raise RuntimeError(f"{len(buffer.failed_rows)} events failed to upsert")
+    return len(entries)
+
+def _lookup_entity_ids(slugs, chunk_size=200):
+    from utils.db_utils import supabase, entity_cache
+    found = {}
+    rest = []
+    for slug in slugs:
+        row = entity_cache.get(slug)
+        if row: found[slug] = row["id"]
+        else: rest.append(slug)
+    for i in range(0, len(rest), chunk_size):
+        res = supabase.table("entities").select("id,slug").in_("slug", rest[i:i + chunk_size]).execute()
+        found.update((row["slug"], row["id"]) for row in res.data or [])
+    return found
+
+def replay_journal(path=DEFAULT_JOURNAL_PATH, batch_size=REPLAY_BATCH_SIZE):
+    """Applies every entry after the cursor, batch by batch. Returns the number of entries applied."""
+    cursor = load_cursor(path)
+    applied = 0
+    batch = []
+    for entry in read_journal(path, after_seq=cursor):
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            applied += _replay_batch(path, batch)
+            batch = []
+    if batch: applied += _replay_batch(path, batch)
+    print(f"📓 Replayed {applied} journal entries (cursor at {load_cursor(path)}).")
+    return applied
+
+def _replay_batch(path, batch):
+    apply_batch(batch)
+    save_cursor(path, batch[-1]["seq"])
+    print(f"   -> Applied up to #{batch[-1]['seq']}")
+    return len(batch)
+
+def compact_journal(path=DEFAULT_JOURNAL_PATH):
+    """Drops entries that were already replayed (keeps the sequence numbers of the rest). Not while scraping."""
+    cursor = load_cursor(path)
+    remaining = list(read_journal(path, after_seq=cursor))
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for entry in remaining: f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    os.replace(tmp, path)
+    return len(remaining)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Apply or inspect the local write journal.")
+    parser.add_argument("command", choices=["replay", "status", "compact"])
+    parser.add_argument("path", nargs="?", default=DEFAULT_JOURNAL_PATH)
+    parser.add_argument("--batch-size", type=int, default=REPLAY_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.command == "replay":
+        replay_journal(args.path, args.batch_size)
+    elif args.command == "status":
+        cursor = load_cursor(args.path)
+        pending = sum(1 for _ in read_journal(args.path, after_seq=cursor))
+        print(f"📓 {args.path}: cursor at {cursor}, {pending} entries pending.")
+    else:
+        print(f"📓 Compacted: {compact_journal(args.path)} entries kept.")